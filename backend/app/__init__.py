@@ -7,6 +7,7 @@ from flask_login import LoginManager
 from flask_cors import CORS 
 
 from .config import Config
+from .hashing import UploadRequest
 
 # Extensions
 db = SQLAlchemy()
@@ -17,6 +18,7 @@ login_manager = LoginManager()
 def create_app(test_config: dict = None):
     # 1) Basis-Config laden
     app = Flask(__name__)
+    app.request_class = UploadRequest
     CORS(app, 
          supports_credentials=True,
          origins=["http://localhost:5173"])
@@ -36,10 +38,45 @@ def create_app(test_config: dict = None):
     login_manager.init_app(app)
     login_manager.login_view = "auth.login"
 
+    # Metriken (Route-Latenzen, DB-Queries, Uploads; RPC-Calls über die Web3-Middleware)
+    if app.config["METRICS_ENABLED"]:
+        from .metrics import init_metrics
+        init_metrics(app)
+
+    # Profiling einzelner Requests (pstats + Collapsed Stacks), nur wenn eingeschaltet
+    if app.config["PROFILING_ENABLED"]:
+        from .profiling import init_profiling
+        init_profiling(app)
+
+    # Login-Drosselung je Account/IP
+    from .credentials import LoginLimiter
+    app.extensions["login_limiter"] = LoginLimiter(
+        window=app.config["LOGIN_WINDOW_SECONDS"],
+        per_account=app.config["LOGIN_MAX_ATTEMPTS_PER_ACCOUNT"],
+        per_ip=app.config["LOGIN_MAX_ATTEMPTS_PER_IP"]
+    )
+
+    # Chain-Client registrieren – verbindet sich erst beim ersten Zugriff
+    from .web3utils import init_chain
+    init_chain(app)
+
+    # Ersetzt der Sender-Pool eine hängende Transaktion, führen Jobs und Anker-Batches den Hash nach
+    from functools import partial
+    from .jobs import record_replacement as job_tx_replaced
+    from .anchoring import record_replacement as batch_tx_replaced
+    app.extensions["chain"].replacement_listeners += [partial(job_tx_replaced, app),
+                                                      partial(batch_tx_replaced, app)]
+
+    # Chain-Follower + Verteilung an die SSE-Clients (startet mit dem ersten Client)
+    from .events import init_events
+    init_events(app)
+
     @login_manager.user_loader
     def load_user(user_id):
+        from sqlalchemy.orm import joinedload
         from .models import User
-        return User.query.get(int(user_id))
+        # User + Organisation in einer Query (get_user_org_address, /user/profile)
+        return db.session.get(User, int(user_id), options=[joinedload(User.organization)])
 
     # Blueprints importieren und registrieren (deferred Imports verhindern Zirkuläre Abhängigkeiten)
     from .routes import bp as notary_bp
@@ -48,4 +85,11 @@ def create_app(test_config: dict = None):
     app.register_blueprint(notary_bp, url_prefix="/api")
     app.register_blueprint(auth_bp)
 
+    from .indexer import index_sync_command
+    from .anchoring import anchor_flush_command
+    from .prefilter import prefilter_snapshot_command
+    app.cli.add_command(index_sync_command)
+    app.cli.add_command(anchor_flush_command)
+    app.cli.add_command(prefilter_snapshot_command)
+
     return app
@@ -0,0 +1,361 @@
+"""
+Async-Modus (ASGI) für die Notary-Endpunkte mit hohem Chain-Anteil:
+
+    POST /api/verify, /api/verify/batch, /api/notarize, /api/notarize/hash
+
+Die Handler laufen auf einer Quart-App mit AsyncWeb3 (ein aiohttp-Pool je
+Prozess); unabhängige RPC-Reads laufen per asyncio.gather parallel, und das
+Warten auf Receipts belegt keinen Thread. Blockierende Teile (SQLAlchemy,
+Senden über den Sender-Pool mit seinen Nonces) laufen in Worker-Threads im
+App-Kontext der Flask-App. Alle übrigen Routen (Login, Stats, Events, …)
+reicht der Router an die Flask-App weiter; Session-Cookie und Antworten
+sind identisch.
+
+Start (aus backend/):  hypercorn asgi:app --bind 0.0.0.0:5001
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+from hypercorn.middleware import AsyncioWSGIMiddleware
+from quart import Quart, g, jsonify, request, session
+from web3 import AsyncHTTPProvider, AsyncWeb3, Web3
+from web3.exceptions import ContractLogicError
+from web3.providers.eth_tester import AsyncEthereumTesterProvider
+
+from . import db
+from .anchoring import anchored_proof, find_anchored
+from .hashing import keccak_file
+from .jobs import create_job, track_receipt
+from .metrics import HTTP_REQUEST_SECONDS, UPLOAD_BYTES, RpcMetricsMiddleware
+from .routes import (anchored_originals, anchored_result, batch_candidates, batch_result,
+                     hash_list_items, notarize_hash_input, notarize_upload_error,
+                     precheck_errors, revert_message)
+from .rpc import AsyncMultiEndpointProvider, MultiEndpointProvider, redact_url
+from .senders import NoSenderError
+from .web3utils import get_user_org_address, notarization_candidates
+
+# Pfade, die der Router an die Quart-App gibt (alle Methoden außer OPTIONS;
+# CORS-Preflights beantwortet weiter Flask-CORS)
+ASYNC_PATHS = {"/api/verify", "/api/verify/batch", "/api/notarize", "/api/notarize/hash"}
+
+class AsyncChainClient:
+    """
+    AsyncWeb3-Gegenstück zum ChainClient: gleicher Contract, gleicher
+    Read-Cache. Verbindet sich wie dieser erst beim ersten Zugriff (im
+    Event-Loop des ASGI-Servers).
+    """
+    def __init__(self, chain):
+        self.chain = chain
+        self.config = chain.config
+        self.w3 = None
+        self.contract = None
+        self._session = None
+        self._lock = asyncio.Lock()
+
+    async def connect(self):
+        if self.w3 is None:
+            async with self._lock:
+                if self.w3 is None:
+                    await self._connect()
+
+    async def _connect(self):
+        # Contract-Adresse/ABI bzw. In-Process-Deploy über den synchronen Client
+        contract = await asyncio.to_thread(lambda: self.chain.contract)
+        if self.config["CHAIN_BACKEND"] == "memory":
+            # Dieselbe In-Process-Chain wie der synchrone Client
+            provider = AsyncEthereumTesterProvider()
+            provider.ethereum_tester = self.chain.w3.provider.ethereum_tester
+        else:
+            request_kwargs = {
+                "timeout": aiohttp.ClientTimeout(sock_connect=self.config["RPC_CONNECT_TIMEOUT"],
+                                                 sock_read=self.config["RPC_READ_TIMEOUT"])
+            }
+            if isinstance(self.chain.w3.provider, MultiEndpointProvider):
+                # Gleiche Nodes, Latenzen und Health-Probes wie der synchrone Client
+                provider = AsyncMultiEndpointProvider(self.chain.w3.provider.endpoints, request_kwargs)
+            else:
+                provider = AsyncHTTPProvider(self.config["RPC_URL"], request_kwargs=request_kwargs)
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.config["ASYNC_RPC_POOL_SIZE"])
+            )
+            await provider.cache_async_session(self._session)
+        w3 = AsyncWeb3(provider)
+        w3.middleware_onion.add(RpcMetricsMiddleware, "rpc_metrics")
+        if not await w3.is_connected():
+            raise ConnectionError(f"Cannot connect to {', '.join(map(redact_url, self.chain.rpc_urls))}")
+        self.w3 = w3
+        self.contract = w3.eth.contract(address=contract.address, abi=contract.abi)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
+    async def cached_call(self, fn_name, *args):
+        """contract.functions.<fn_name>(*args).call() über den gemeinsamen Read-Cache."""
+        found, value = self.chain.read_cache.get(fn_name, *args)
+        if found:
+            return value
+        await self.connect()
+        value = await self.contract.functions[fn_name](*args).call()
+        self.chain.read_cache.put(fn_name, args, value)
+        return value
+
+    async def gather_calls(self, calls):
+        """Mehrere view-Calls [(fn_name, args), ...] gleichzeitig; Ergebnisse in Reihenfolge."""
+        return await asyncio.gather(*(self.cached_call(fn_name, *args) for fn_name, args in calls))
+
+def create_async_app(flask_app):
+    """Quart-App mit den async Notary-Endpunkten, an flask_app gekoppelt."""
+    aio = Quart(__name__)
+    # Gleicher SECRET_KEY → Quart liest das Session-Cookie von Flask-Login
+    aio.config.update(
+        SECRET_KEY=flask_app.config["SECRET_KEY"],
+        MAX_CONTENT_LENGTH=flask_app.config["MAX_CONTENT_LENGTH"]
+    )
+    config = flask_app.config
+    chain = AsyncChainClient(flask_app.extensions["chain"])
+    aio.extensions["chain"] = chain
+
+    async def in_app(fn, *args):
+        """fn(*args) in einem Worker-Thread im App-Kontext der Flask-App."""
+        def run():
+            with flask_app.app_context():
+                try:
+                    return fn(*args)
+                finally:
+                    db.session.remove()
+        return await asyncio.to_thread(run)
+
+    @aio.before_serving
+    async def _executor():
+        # Worker-Threads für DB, Hashing, Senden und die Flask-Routen; jeder
+        # SSE-Stream (/api/events läuft über Flask) belegt einen davon dauerhaft
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(
+            max_workers=config["ASYNC_WORKER_THREADS"] + config["SSE_MAX_CLIENTS"],
+            thread_name_prefix="asgi-worker"
+        ))
+
+    @aio.after_serving
+    async def _close():
+        await chain.close()
+
+    if config["METRICS_ENABLED"]:
+        # Gleiche Histogramme wie init_metrics (SQL-Statements laufen in Threads
+        # und werden nur global gezählt)
+        @aio.before_request
+        async def _start_timer():
+            g.request_started = time.perf_counter()
+
+        @aio.after_request
+        async def _observe(response):
+            route = request.url_rule.rule if request.url_rule else "unmatched"
+            HTTP_REQUEST_SECONDS.labels(request.method, route, response.status_code).observe(
+                time.perf_counter() - g.request_started
+            )
+            if request.content_length:
+                UPLOAD_BYTES.labels(route).observe(request.content_length)
+            return response
+
+    @aio.after_request
+    async def _cors(response):
+        # Wie Flask-CORS in create_app
+        origin = request.headers.get("Origin")
+        if origin == "http://localhost:5173":
+            response.headers["Access-Control-Allow-Origin"] = origin
+            response.headers["Access-Control-Allow-Credentials"] = "true"
+            response.headers["Vary"] = "Origin"
+        return response
+
+    @aio.errorhandler(413)
+    async def _too_large(_):
+        return jsonify({"error": "Datei zu groß"}), 413
+
+    def _load_identity(user_id):
+        # Derselbe user_loader wie bei Flask-Login in den synchronen Routen
+        user = flask_app.login_manager._user_callback(user_id)
+        if user is None:
+            return None
+        return user.organization_id, get_user_org_address(user)
+
+    async def current_identity():
+        """(organization_id, org_address) des eingeloggten Nutzers oder None."""
+        user_id = session.get("_user_id")
+        if not user_id:
+            return None
+        return await in_app(_load_identity, user_id)
+
+    async def hash_upload(file):
+        return await asyncio.to_thread(keccak_file, file, config["HASH_CHUNK_SIZE"])
+
+    @aio.route("/api/verify", methods=["POST"])
+    async def verify():
+        if await current_identity() is None:
+            return jsonify({"error": "Nicht eingeloggt"}), 401
+        file = (await request.files).get("file")
+        if not file:
+            return jsonify({"error": "No file provided"}), 400
+        doc_hash = await hash_upload(file)
+
+        # Prefilter und Merkle-Anker-Suche in der DB gleichzeitig; eth_call nur
+        # für Hashes, die laut Prefilter notarisiert sein können
+        candidates, anchored = await asyncio.gather(
+            in_app(notarization_candidates, [doc_hash]),
+            in_app(_anchored_lookup, doc_hash)
+        )
+        ts = await chain.cached_call("fileTimestamps", doc_hash) if candidates else 0
+        if ts != 0:
+            return jsonify({"verified": True, "timestamp": ts}), 200
+
+        if anchored:
+            proof, result = anchored
+            await chain.connect()
+            ts = await chain.contract.functions.verifyAnchored(*proof).call()
+            if ts != 0:
+                return jsonify({**result, "timestamp": ts}), 200
+
+        return jsonify({"verified": False}), 404
+
+    @aio.route("/api/verify/batch", methods=["POST"])
+    async def verify_batch():
+        if await current_identity() is None:
+            return jsonify({"error": "Nicht eingeloggt"}), 401
+
+        # 1) Eingabe lesen: vorberechnete Hashes oder Dateien
+        if request.is_json:
+            items = hash_list_items(await request.get_json(silent=True))
+            if items is None:
+                return jsonify({"error": "No hashes provided"}), 400
+        else:
+            files = (await request.files).getlist("file")
+            if not files:
+                return jsonify({"error": "No file provided"}), 400
+            hashes = await asyncio.gather(*(hash_upload(file) for file in files))
+            items = [(file.filename, doc_hash) for file, doc_hash in zip(files, hashes)]
+
+        if len(items) > config["VERIFY_BATCH_MAX_ITEMS"]:
+            return jsonify({"error": "Zu viele Dokumente in einem Batch"}), 413
+
+        # 2) fileTimestamps der laut Prefilter möglichen Hashes gleichzeitig
+        #    (Cache + aiohttp-Pool); die übrigen sind sicher 0
+        valid, candidates = await in_app(batch_candidates, items)
+        stamps = await chain.gather_calls([("fileTimestamps", (h,)) for h in candidates])
+
+        # 3) Nicht einzeln notarisierte Hashes gegen Merkle-Anker prüfen
+        return jsonify(await in_app(batch_result, items, valid, dict(zip(candidates, stamps)))), 200
+
+    @aio.route("/api/notarize", methods=["POST"])
+    async def notarize():
+        identity = await current_identity()
+        if identity is None:
+            return jsonify({"error": "Nicht eingeloggt"}), 401
+        file = (await request.files).get("file")
+        doc_id = (await request.form).get("documentId")
+        error = notarize_upload_error(file, doc_id)
+        if error:
+            return jsonify({"error": error}), 400
+        return await notarize_hash_for(identity, doc_id, await hash_upload(file))
+
+    @aio.route("/api/notarize/hash", methods=["POST"])
+    async def notarize_hash():
+        identity = await current_identity()
+        if identity is None:
+            return jsonify({"error": "Nicht eingeloggt"}), 401
+        doc_id, doc_hash, error = notarize_hash_input((await request.get_json(silent=True)) or {})
+        if error:
+            return jsonify({"error": error}), 400
+        return await notarize_hash_for(identity, doc_id, doc_hash)
+
+    async def notarize_hash_for(identity, doc_id, doc_hash):
+        organization_id, org_address = identity
+        doc_hash = bytes(doc_hash)
+        id_hash = Web3.keccak(text=doc_id)
+        pairs = [(id_hash, doc_hash)]
+
+        # Pre-Checks: originalHash on-chain und Merkle-Anker in der DB gleichzeitig
+        original, anchored = await asyncio.gather(
+            chain.cached_call("originalHash", id_hash),
+            in_app(anchored_originals, pairs)
+        )
+        error = precheck_errors(pairs, [original], anchored)[0]
+        if error:
+            return jsonify({"error": error}), 400
+
+        # Senden über den Sender-Pool (Nonces, Gas-Schätzung, Gebühren) im Thread
+        sender_pool = await asyncio.to_thread(lambda: chain.chain.sender_pool)
+        try:
+            tx_hash, _ = await asyncio.to_thread(
+                sender_pool.send,
+                chain.chain.contract.functions.storeDocumentHash(id_hash, doc_hash),
+                None, org_address
+            )
+        except (ContractLogicError, NoSenderError) as exc:
+            return jsonify({"error": revert_message(exc)}), 400
+
+        # Job-Modus: sofort 202, den Receipt trägt der Tracker nach
+        if request.args.get("async", "").lower() in ("1", "true"):
+            job = await in_app(lambda: create_job(organization_id, doc_id, id_hash, doc_hash, tx_hash).to_dict())
+            track_receipt(flask_app, job["jobId"], tx_hash)
+            return jsonify(job), 202, {"Location": f"/api/jobs/{job['jobId']}"}
+
+        # Sonst auf den Receipt warten – ohne dabei einen Thread zu belegen
+        await chain.connect()
+        receipt = await chain.w3.eth.wait_for_transaction_receipt(
+            tx_hash, timeout=config["RECEIPT_TIMEOUT"]
+        )
+        if receipt.status == 1:
+            chain.chain.invalidate_document(id_hash, doc_hash)
+        return jsonify({
+            "txHash": receipt.transactionHash.hex(),
+            "blockNumber": receipt.blockNumber
+        }), 200
+
+    return aio
+
+def _anchored_lookup(doc_hash):
+    """
+    ((leaf, proof, root), /verify-Antwort ohne Zeitstempel) eines per
+    Merkle-Root verankerten Dokuments oder None.
+    """
+    doc = find_anchored(doc_hash)
+    if doc is None:
+        return None
+    return anchored_proof(doc), anchored_result(doc, None)
+
+def _nonempty_body(wsgi_app):
+    """
+    Hypercorns WSGI-Adapter sendet den Response-Start erst mit dem ersten
+    Body-Chunk – leere Antworten (CORS-Preflight, 204) bekommen einen.
+    """
+    def app(environ, start_response):
+        body = wsgi_app(environ, start_response)
+        def chunks():
+            try:
+                empty = True
+                for chunk in body:
+                    empty = False
+                    yield chunk
+                if empty:
+                    yield b""
+            finally:
+                if hasattr(body, "close"):
+                    body.close()
+        return chunks()
+    return app
+
+def create_asgi_app(flask_app):
+    """
+    ASGI-Anwendung: die async Notary-Endpunkte über Quart, alles andere über
+    die (in Threads laufende) Flask-App.
+    """
+    aio = create_async_app(flask_app)
+    wsgi = AsyncioWSGIMiddleware(_nonempty_body(flask_app), max_body_size=flask_app.config["MAX_CONTENT_LENGTH"])
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan" or (
+                scope["type"] == "http" and scope["path"] in ASYNC_PATHS and scope["method"] != "OPTIONS"):
+            await aio(scope, receive, send)
+        else:
+            await wsgi(scope, receive, send)
+    return app
@@ -0,0 +1,414 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import click
+from flask import current_app
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from web3.exceptions import ContractLogicError, TimeExhausted, TransactionNotFound
+
+from . import db
+from .models import AnchorBatch, AnchoredDocument
+from .merkle import leaf_hash, build_tree, get_proof, verify_proof
+from .senders import NoSenderError
+from .web3utils import get_chain, batch_calls
+
+# Ein Timer je Prozess, der das Zeitfenster für wartende Dokumente schließt
+_timer_lock = threading.Lock()
+_timer = None
+_timer_due = None  # time.monotonic(), wann _timer feuert; None, solange er flusht
+# Aufeinanderfolgende fehlgeschlagene Flushes (Backoff in _run_scheduled_flush)
+_failures = 0
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def submit_document(id_hash, doc_hash, org_address):
+    """
+    Reiht (id_hash, doc_hash) für das nächste Anker-Fenster der Org ein.
+    Liefert (AnchoredDocument, None) oder (None, Fehlermeldung).
+    """
+    doc = AnchoredDocument(
+        id_hash=id_hash.hex(),
+        document_hash=doc_hash.hex(),
+        org_address=org_address
+    )
+    db.session.add(doc)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Paralleler Request mit derselben ID war schneller (Vorprüfung bestanden)
+        db.session.rollback()
+        existing = AnchoredDocument.query.filter_by(id_hash=id_hash.hex()).first()
+        if existing and existing.document_hash != doc_hash.hex():
+            return None, "Dokument darf nicht geändert werden"
+        return None, "Schon notariell hinterlegt"
+    return doc, None
+
+def _waiting():
+    """Dokumente, die auf ein Anker-Fenster warten (nicht in einem Batch, nicht geparkt)."""
+    return AnchoredDocument.query.filter(AnchoredDocument.batch_id.is_(None),
+                                         AnchoredDocument.error.is_(None))
+
+def pending_count(org_address):
+    return _waiting().filter_by(org_address=org_address).count()
+
+def due_org_addresses(force=False):
+    """
+    Orgs, deren Fenster voll (ANCHOR_BATCH_MAX_SIZE) oder abgelaufen
+    (ANCHOR_WINDOW_SECONDS) ist; mit force=True alle mit wartenden Dokumenten.
+    """
+    cutoff = _utcnow() - timedelta(seconds=current_app.config["ANCHOR_WINDOW_SECONDS"])
+    rows = (db.session.query(AnchoredDocument.org_address,
+                             func.count(AnchoredDocument.id),
+                             func.min(AnchoredDocument.submitted_at))
+            .filter(AnchoredDocument.batch_id.is_(None), AnchoredDocument.error.is_(None))
+            .group_by(AnchoredDocument.org_address)
+            .all())
+    return [
+        org for org, count, oldest in rows
+        if force or count >= current_app.config["ANCHOR_BATCH_MAX_SIZE"] or oldest <= cutoff
+    ]
+
+def flush_anchor_batch(org_address):
+    """
+    Baut den Merkle-Baum über die wartenden Dokumente der Org, speichert die
+    Proofs und verankert die Root per anchorRoot. Liefert den AnchorBatch
+    oder None, wenn nichts wartet, die Transaktion noch nicht gemined ist
+    (recover_batches schließt sie später ab) oder die Dokumente wegen eines
+    Reverts geparkt wurden. Verbindungsfehler beim Senden geben die
+    Dokumente frei und werden weitergereicht.
+    """
+    # 1) Wartende Dokumente beanspruchen (skip_locked: parallele Worker
+    #    verankern nie dieselben Dokumente)
+    pending = (_waiting()
+               .filter_by(org_address=org_address)
+               .order_by(AnchoredDocument.id)
+               .limit(current_app.config["ANCHOR_BATCH_MAX_SIZE"])
+               .with_for_update(skip_locked=True)
+               .all())
+    if not pending:
+        db.session.rollback()
+        return None
+
+    # 2) Merkle-Baum bauen und Proofs ablegen
+    leaves = [leaf_hash(bytes.fromhex(d.id_hash), bytes.fromhex(d.document_hash)) for d in pending]
+    levels = build_tree(leaves)
+    root = levels[-1][0]
+
+    batch = AnchorBatch(org_address=org_address, merkle_root=root.hex(), leaf_count=len(pending))
+    db.session.add(batch)
+    for i, doc in enumerate(pending):
+        doc.batch = batch
+        doc.leaf_index = i
+        doc.proof = json.dumps([p.hex() for p in get_proof(levels, i)])
+    db.session.commit()
+
+    # 3) Nur die Root on-chain speichern; der Tx-Hash wird vor dem Warten
+    #    gespeichert, damit ein Timeout oder Absturz den Batch nicht verliert
+    chain = get_chain()
+    batch.sent_block = chain.w3.eth.block_number
+    db.session.commit()
+    try:
+        tx_hash, _ = chain.sender_pool.send(
+            chain.contract.functions.anchorRoot(root, len(pending)),
+            org_address=org_address
+        )
+    except (ContractLogicError, NoSenderError) as exc:
+        # Revert schon bei der Gas-Schätzung – außer "Root bereits verankert"
+        # (früherer Versuch doch gemined) dauerhaft, z. B. "Nicht Org-Admin"
+        # oder kein vom Node verwalteter Admin-Account der Org
+        if _adopt(batch, from_block=current_app.config["INDEX_START_BLOCK"]):
+            return batch
+        from .routes import revert_message  # routes importiert anchoring
+        _release(batch, error=revert_message(exc))
+        return None
+    except Exception:
+        # Dokumente wieder freigeben → nächstes Fenster verankert sie erneut
+        _release(batch)
+        raise
+    batch.tx_hash = tx_hash.hex()
+    db.session.commit()
+
+    try:
+        receipt = chain.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=current_app.config["RECEIPT_TIMEOUT"])
+    except TimeExhausted:
+        return None
+    return _settle(batch, receipt)
+
+def _release(batch, error=None):
+    """Gibt die Dokumente des Batches frei bzw. parkt sie mit error und löscht ihn."""
+    if error:
+        current_app.logger.warning("Merkle-Root %s: %d Dokumente geparkt (%s)",
+                                   batch.merkle_root, batch.leaf_count, error)
+    # Kopie: doc.batch = None entfernt das Dokument aus batch.documents
+    for doc in list(batch.documents):
+        doc.batch = None
+        doc.leaf_index = None
+        doc.proof = None
+        doc.error = error
+    db.session.delete(batch)
+    db.session.commit()
+
+def _settle(batch, receipt):
+    """Übernimmt den Receipt der Anker-Transaktion; revertiert → Dokumente parken."""
+    chain = get_chain()
+    if receipt.status == 1:
+        ev = chain.contract.events.RootAnchored().process_receipt(receipt)[0]
+        batch.tx_hash = receipt.transactionHash.hex()
+        batch.block_number = receipt.blockNumber
+        batch.anchored_at = ev.args.timestamp
+        db.session.commit()
+        return batch
+    if _adopt(batch, from_block=current_app.config["INDEX_START_BLOCK"]):
+        return batch
+    _release(batch, error=f"anchorRoot revertiert: {receipt.transactionHash.hex()}")
+    return None
+
+def _adopt(batch, from_block=None):
+    """
+    Ist die Root schon on-chain verankert (Transaktion eines früheren,
+    abgebrochenen Versuchs), übernimmt der Batch deren RootAnchored-Event.
+    Gesucht wird ab from_block (Standard: sent_block des Batches) vom Head
+    rückwärts in Chunks über fetch_logs – der Treffer ist meist jung.
+    """
+    from .indexer import fetch_logs  # indexer importiert web3utils
+
+    chain = get_chain()
+    root = bytes.fromhex(batch.merkle_root)
+    if chain.contract.functions.rootTimestamps(root).call() == 0:
+        return False
+    if from_block is None:
+        from_block = batch.sent_block
+    if from_block is None:
+        from_block = current_app.config["INDEX_START_BLOCK"]
+    chunk = current_app.config["INDEX_LOG_CHUNK_BLOCKS"]
+    end = chain.w3.eth.block_number
+    while end >= from_block:
+        start = max(from_block, end - chunk + 1)
+        for _, logs in fetch_logs(chain.contract.events.RootAnchored, start, end, chunk,
+                                  argument_filters={"root": root}):
+            if logs:
+                batch.tx_hash = logs[0].transactionHash.hex()
+                batch.block_number = logs[0].blockNumber
+                batch.anchored_at = logs[0].args.timestamp
+                db.session.commit()
+                return True
+        end = start - 1
+    return False
+
+def recover_batches():
+    """
+    Schließt Batches ab, die seit ANCHOR_RECOVERY_SECONDS nicht gemined sind:
+    Absturz zwischen Beanspruchen und Senden (tx_hash NULL) oder
+    Receipt-Timeout. Gemined → übernehmen; revertiert → parken; dem Node
+    unbekannt (nie gesendet bzw. verworfen) → Dokumente freigeben; sonst
+    weiter warten. Liefert die abgeschlossenen Batches.
+    """
+    chain = get_chain()
+    cutoff = _utcnow() - timedelta(seconds=current_app.config["ANCHOR_RECOVERY_SECONDS"])
+    stale = (AnchorBatch.query
+             .filter(AnchorBatch.block_number.is_(None), AnchorBatch.created_at <= cutoff)
+             .with_for_update(skip_locked=True)
+             .all())
+    anchored = []
+    for batch in stale:
+        if batch.tx_hash is not None:
+            try:
+                receipt = chain.w3.eth.get_transaction_receipt(batch.tx_hash)
+            except TransactionNotFound:
+                receipt = None
+            if receipt is not None:
+                if _settle(batch, receipt):
+                    anchored.append(batch)
+                continue
+            try:
+                chain.w3.eth.get_transaction(batch.tx_hash)
+                continue  # noch im Mempool
+            except TransactionNotFound:
+                pass
+        if _adopt(batch):
+            anchored.append(batch)
+        else:
+            _release(batch)
+    db.session.commit()
+    return anchored
+
+def record_replacement(app, old_hash, new_hash):
+    """Listener des Sender-Pools: nicht geminte Batches auf den Hash der Ersatz-Transaktion umstellen."""
+    with app.app_context():
+        (AnchorBatch.query
+         .filter(AnchorBatch.tx_hash == old_hash.hex(), AnchorBatch.block_number.is_(None))
+         .update({"tx_hash": new_hash.hex()}))
+        db.session.commit()
+
+def flush_due_batches(force=False):
+    """
+    Schließt liegengebliebene Batches ab und verankert alle fälligen Orgs.
+    Ein Fehler bei einer Org hält die übrigen nicht auf; der erste wird
+    danach weitergereicht.
+    """
+    batches = recover_batches()
+    error = None
+    for org_address in due_org_addresses(force):
+        try:
+            batch = flush_anchor_batch(org_address)
+        except Exception as exc:
+            db.session.rollback()
+            current_app.logger.warning("Merkle-Anker für %s fehlgeschlagen: %s", org_address, exc)
+            error = error or exc
+            continue
+        if batch:
+            batches.append(batch)
+    if error:
+        raise error
+    return batches
+
+def schedule_flush(app, min_delay=0, delay=None):
+    """
+    Plant (einmal je Prozess) einen Flush für den Moment, an dem das
+    Zeitfenster des ältesten wartenden Dokuments abläuft bzw. der älteste
+    nicht gemined Batch nachgeprüft werden soll – frühestens nach
+    min_delay Sekunden (Backoff nach Fehlern). Mit delay (z. B. 0, wenn
+    das Zählfenster voll ist) feste Wartezeit; ein später fälliger Timer
+    wird dann ersetzt.
+    """
+    global _timer, _timer_due
+    with _timer_lock:
+        if _timer is not None and _timer.is_alive():
+            # Flusht gerade (plant danach selbst neu) oder ist früh genug fällig
+            if delay is None or _timer_due is None or _timer_due <= time.monotonic() + delay:
+                return
+            _timer.cancel()
+        if delay is None:
+            now = _utcnow()
+            delays = []
+            oldest = (db.session.query(func.min(AnchoredDocument.submitted_at))
+                      .filter(AnchoredDocument.batch_id.is_(None), AnchoredDocument.error.is_(None))
+                      .scalar())
+            if oldest is not None:
+                due_at = oldest + timedelta(seconds=app.config["ANCHOR_WINDOW_SECONDS"])
+                delays.append((due_at - now).total_seconds())
+                # Zählfenster voll, während der vorige Flush lief → gleich weiter
+                if due_org_addresses():
+                    delays.append(0)
+            unfinished = (db.session.query(func.min(AnchorBatch.created_at))
+                          .filter(AnchorBatch.block_number.is_(None))
+                          .scalar())
+            if unfinished is not None:
+                due_at = unfinished + timedelta(seconds=app.config["ANCHOR_RECOVERY_SECONDS"])
+                # Noch im Mempool → höchstens alle ANCHOR_RETRY_BASE_SECONDS nachfragen
+                delays.append(max((due_at - now).total_seconds(), app.config["ANCHOR_RETRY_BASE_SECONDS"]))
+            if not delays:
+                return
+            delay = max(min(delays), min_delay, 0)
+        _timer = threading.Timer(delay, _run_scheduled_flush, args=(app,))
+        _timer.daemon = True
+        _timer_due = time.monotonic() + delay
+        _timer.start()
+
+def _run_scheduled_flush(app):
+    global _timer, _timer_due, _failures
+    with _timer_lock:
+        if _timer is threading.current_thread():
+            _timer_due = None
+    with app.app_context():
+        try:
+            flush_due_batches()
+            _failures = 0
+        except Exception:
+            _failures += 1
+            app.logger.exception("Merkle-Anker konnte nicht verankert werden (Versuch %d)", _failures)
+        with _timer_lock:
+            # Ein inzwischen gestarteter Ersatz-Timer bleibt eingetragen
+            if _timer is threading.current_thread():
+                _timer = None
+        # Nach Fehlern exponentiell länger warten, statt den Node im Takt zu fragen
+        backoff = 0
+        if _failures:
+            backoff = min(app.config["ANCHOR_RETRY_BASE_SECONDS"] * 2 ** (_failures - 1),
+                          app.config["ANCHOR_RETRY_MAX_SECONDS"])
+        # Inzwischen eingereichte Dokumente bekommen ihr eigenes Fenster
+        schedule_flush(app, backoff)
+        db.session.remove()
+
+def find_anchored(doc_hash):
+    """Verankertes (gemintes) Dokument mit diesem Dateihash oder None."""
+    return (AnchoredDocument.query
+            .join(AnchorBatch)
+            .filter(AnchoredDocument.document_hash == doc_hash.hex(),
+                    AnchorBatch.block_number.isnot(None))
+            .first())
+
+def anchored_timestamp(doc):
+    """
+    Prüft Blatt + Proof gegen die on-chain Root (verifyAnchored) und liefert
+    den Anker-Zeitstempel oder 0.
+    """
+    return get_chain().contract.functions.verifyAnchored(*anchored_proof(doc)).call()
+
+def anchored_proof(doc):
+    """(leaf, proof, root) eines verankerten Dokuments für verifyAnchored."""
+    leaf = leaf_hash(bytes.fromhex(doc.id_hash), bytes.fromhex(doc.document_hash))
+    proof = [bytes.fromhex(p) for p in json.loads(doc.proof)]
+    return leaf, proof, bytes.fromhex(doc.batch.merkle_root)
+
+def anchored_timestamps(doc_hashes):
+    """
+    Bulk-Variante für viele Dateihashes: eine SQL-Query für die Proofs, lokale
+    Proof-Prüfung und rootTimestamps aller betroffenen Roots in einem
+    JSON-RPC-Batch. Liefert {doc_hash_hex: timestamp} für verankerte Hashes.
+    """
+    docs = (AnchoredDocument.query
+            .join(AnchorBatch)
+            .filter(AnchoredDocument.document_hash.in_([h.hex() for h in doc_hashes]),
+                    AnchorBatch.block_number.isnot(None))
+            .all())
+    docs = [
+        doc for doc in docs
+        if verify_proof(leaf_hash(bytes.fromhex(doc.id_hash), bytes.fromhex(doc.document_hash)),
+                        [bytes.fromhex(p) for p in json.loads(doc.proof)],
+                        bytes.fromhex(doc.batch.merkle_root))
+    ]
+    roots = sorted({doc.batch.merkle_root for doc in docs})
+    root_ts = dict(zip(roots, batch_calls([("rootTimestamps", (bytes.fromhex(r),)) for r in roots])))
+
+    found = {}
+    for doc in docs:
+        if root_ts[doc.batch.merkle_root] != 0:
+            found.setdefault(doc.document_hash, root_ts[doc.batch.merkle_root])
+    return found
+
+def anchor_status(doc):
+    status = {
+        "idHash":       doc.id_hash,
+        "documentHash": doc.document_hash,
+        "status":       "pending"
+    }
+    if doc.error:
+        status.update({"status": "failed", "error": doc.error})
+    elif doc.batch and doc.batch.block_number is not None:
+        status.update({
+            "status":      "anchored",
+            "merkleRoot":  doc.batch.merkle_root,
+            "leafIndex":   doc.leaf_index,
+            "proof":       json.loads(doc.proof),
+            "txHash":      doc.batch.tx_hash,
+            "blockNumber": doc.batch.block_number,
+            "timestamp":   doc.batch.anchored_at
+        })
+    return status
+
+@click.command("anchor-flush")
+@click.option("--force", is_flag=True, help="Alle wartenden Dokumente sofort verankern.")
+@click.option("--retry-failed", is_flag=True, help="Wegen eines Reverts geparkte Dokumente wieder einreihen.")
+def anchor_flush_command(force, retry_failed):
+    """Verankert fällige Merkle-Roots (z. B. per Cron)."""
+    if retry_failed:
+        parked = AnchoredDocument.query.filter(AnchoredDocument.error.isnot(None)).update({"error": None})
+        db.session.commit()
+        click.echo(f"{parked} geparkte Dokumente wieder eingereiht")
+    for batch in flush_due_batches(force):
+        click.echo(f"{batch.merkle_root}: {batch.leaf_count} Dokumente in Block {batch.block_number}")
@@ -1,6 +1,8 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_login import login_user, logout_user, login_required, current_user
 from .models import User
+from .credentials import check_login
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from . import db
 import pyotp
 import qrcode
@@ -32,21 +34,42 @@ def login():
         password = request.form.get("password")
         otp      = request.form.get("otp")
 
-    # 2) Benutzer & Passwort prüfen
+    # 2) Drosselung je Account/IP – vor jeder Hash-Berechnung
+    limiter = current_app.extensions["login_limiter"]
+    retry_after = limiter.allow(email, request.remote_addr)
+    if retry_after:
+        return jsonify({"error": "Zu viele Anmeldeversuche"}), 429, {"Retry-After": str(retry_after)}
+
+    # 3) Benutzer & Passwort (+ OTP) im Worker-Pool prüfen
     user = User.query.filter_by(email=email).first()
-    if not user or not user.check_password(password):
+    if not user:
+        return jsonify({"error": "Ungültige E-Mail oder Passwort"}), 401
+    try:
+        result = check_login(current_app, user, password, otp)
+    except FutureTimeoutError:
+        result = None
+    if result is None:
+        return jsonify({"error": "Anmeldung derzeit überlastet"}), 503, {"Retry-After": "1"}
+    password_ok, otp_ok, new_hash = result
+    if not password_ok:
         return jsonify({"error": "Ungültige E-Mail oder Passwort"}), 401
 
-    # 3) 2FA-Flow: fehlt otp?
+    # 4) 2FA-Flow: fehlt otp?
     if user.otp_secret:
         if not otp:
             # kein OTP im Request → OTP erforderlich
             return jsonify({"error": "2FA erforderlich"}), 401
-        if not user.verify_otp(otp):
+        if not otp_ok:
             # falsches OTP
             return jsonify({"error": "Ungültiges OTP"}), 401
 
-    # 4) alles ok → Login
+    # 5) Work-Faktor geändert → Hash beim erfolgreichen Login erneuern
+    if new_hash:
+        user.password_hash = new_hash
+        db.session.commit()
+
+    # 6) alles ok → Login
+    limiter.reset(email)
     login_user(user)
     return jsonify({"message": "Login erfolgreich"}), 200
 
@@ -0,0 +1,120 @@
+import threading
+import time
+from collections import OrderedDict
+
+def _is_zero(value):
+    if isinstance(value, (bytes, bytearray)):
+        return not any(value)
+    if isinstance(value, str):
+        return int(value, 16) == 0
+    return value == 0
+
+class ContractReadCache:
+    """
+    Begrenzter LRU-Cache vor view-Calls des Notary-Contracts.
+
+    Nicht-Null-Ergebnisse (originalHash, timestamps, fileTimestamps, getDocOrg)
+    ändern sich nach den Contract-Regeln praktisch nicht mehr und bleiben bis
+    zur Verdrängung im Cache. Null-Ergebnisse ("noch nicht notarisiert") gelten
+    nur negative_ttl Sekunden. Eigene, bestätigte Notarisierungen entfernen
+    die betroffenen Einträge über invalidate_document().
+    """
+    def __init__(self, max_entries=100_000, negative_ttl=5.0):
+        self.max_entries = max_entries
+        self.negative_ttl = negative_ttl
+        self._entries = OrderedDict()  # (fn_name, args) → (value, expires_at | None)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(fn_name, args):
+        return (fn_name, tuple(bytes(a) if isinstance(a, (bytes, bytearray)) else a for a in args))
+
+    def get(self, fn_name, *args):
+        """Liefert (True, Wert) bei einem gültigen Eintrag, sonst (False, None)."""
+        key = self._key(fn_name, args)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, fn_name, args, value):
+        key = self._key(fn_name, args)
+        expires_at = time.monotonic() + self.negative_ttl if _is_zero(value) else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def call(self, contract, fn_name, *args):
+        """contract.functions.<fn_name>(*args).call() – aus dem Cache, falls möglich."""
+        found, value = self.get(fn_name, *args)
+        if found:
+            return value
+        value = contract.functions[fn_name](*args).call()
+        self.put(fn_name, args, value)
+        return value
+
+    def invalidate(self, fn_name, *args):
+        with self._lock:
+            self._entries.pop(self._key(fn_name, args), None)
+
+    def invalidate_document(self, id_hash, doc_hash, key):
+        """Alle Einträge, die eine Notarisierung von (id_hash, doc_hash) ändert."""
+        self.invalidate("originalHash", id_hash)
+        self.invalidate("getDocOrg", id_hash)
+        self.invalidate("timestamps", key)
+        self.invalidate("fileTimestamps", doc_hash)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits":       self.hits,
+                "misses":     self.misses,
+                "size":       len(self._entries),
+                "maxEntries": self.max_entries
+            }
+
+class TTLCache:
+    """
+    Kleiner thread-sicherer Cache, dessen Einträge nach ttl Sekunden
+    verfallen. Für Werte, die sich selten ändern und bei Änderungen im
+    eigenen Prozess explizit invalidiert werden; andere Prozesse sehen
+    die Änderung spätestens nach ttl Sekunden.
+    """
+    def __init__(self, ttl, max_entries=10_000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key → (value, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Liefert (True, Wert) bei einem gültigen Eintrag, sonst (False, None)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > time.monotonic():
+                    return True, value
+                del self._entries[key]
+            return False, None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
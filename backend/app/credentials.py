@@ -0,0 +1,148 @@
+import multiprocessing
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+
+from .models import User
+
+# Worker-Prozesse für bcrypt/TOTP (einmal je Prozess) und Obergrenze für
+# gleichzeitig laufende bzw. wartende Prüfungen
+_pool = None
+_pool_lock = threading.Lock()
+_slots = None
+
+def _get_pool(app):
+    global _pool, _slots
+    with _pool_lock:
+        if _pool is None:
+            # spawn statt fork: der Web-Prozess hat bereits Threads (Receipt-Tracker, Anker-Timer)
+            _pool = ProcessPoolExecutor(
+                max_workers=app.config["AUTH_WORKERS"],
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        if _slots is None:
+            _slots = threading.BoundedSemaphore(app.config["AUTH_MAX_PENDING"])
+        return _pool, _slots
+
+def _discard_pool(broken):
+    """
+    Verwirft einen kaputten Pool (Worker z. B. vom OOM-Killer beendet); der
+    nächste _get_pool baut einen neuen. Die Slots bleiben: die Futures des
+    alten Pools schlagen fehl und geben ihre Slots dabei frei.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+def hash_rounds(pw_hash):
+    """Work-Faktor eines bcrypt-Hashes ($2b$<rounds>$...) oder None."""
+    try:
+        return int(pw_hash.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+def _check_login(pw_hash, password, otp_secret, otp, rounds):
+    """
+    Läuft im Worker-Prozess: prüft Passwort und ggf. OTP mit denselben
+    Methoden wie das User-Model und erzeugt bei erfolgreichem Login mit
+    veraltetem Work-Faktor einen neuen Hash.
+    Liefert (password_ok, otp_ok, new_hash | None).
+    """
+    # Ungespeicherte Kopie: im Worker gibt es keine DB-Session
+    user = User(password_hash=pw_hash, otp_secret=otp_secret)
+    if not password or not user.check_password(password):
+        return False, False, None
+    otp_ok = not otp_secret or user.verify_otp(otp)
+    new_hash = None
+    if otp_ok and hash_rounds(pw_hash) != rounds:
+        new_hash = bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds)).decode()
+    return True, otp_ok, new_hash
+
+def check_login(app, user, password, otp):
+    """
+    Prüft die Zugangsdaten von user im Worker-Pool (AUTH_WORKERS = 0: im
+    Request-Thread). Liefert (password_ok, otp_ok, new_hash | None) oder
+    None, wenn bereits AUTH_MAX_PENDING Prüfungen laufen.
+    """
+    args = (user.password_hash, password, user.otp_secret, otp, app.config["BCRYPT_LOG_ROUNDS"])
+    if not app.config["AUTH_WORKERS"]:
+        return _check_login(*args)
+
+    pool, slots = _get_pool(app)
+    if not slots.acquire(blocking=False):
+        return None
+    try:
+        try:
+            future = pool.submit(_check_login, *args)
+        except BrokenProcessPool:
+            _discard_pool(pool)
+            pool = _get_pool(app)[0]
+            future = pool.submit(_check_login, *args)
+    except RuntimeError:
+        # Auch der neue Pool ist kaputt oder wurde gerade verworfen
+        slots.release()
+        return None
+    # Slot erst freigeben, wenn der Worker fertig ist: nach einem Timeout
+    # rechnet er weiter und zählt zu den laufenden Prüfungen
+    future.add_done_callback(lambda _: slots.release())
+    try:
+        return future.result(timeout=app.config["AUTH_TIMEOUT"])
+    except FutureTimeoutError:
+        # Noch nicht gestartet → gar nicht erst rechnen
+        future.cancel()
+        raise
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        return None
+
+class LoginLimiter:
+    """
+    Zählt Login-Versuche je Account und je IP in einem gleitenden Fenster und
+    weist Überzählige ab, bevor gehasht wird. Zustand je Prozess.
+    """
+    # Ab so vielen Schlüsseln werden abgelaufene Einträge aller Schlüssel verworfen
+    MAX_KEYS = 100_000
+
+    def __init__(self, window, per_account, per_ip):
+        self.window = window
+        self.limits = {"account": per_account, "ip": per_ip}
+        self._attempts = defaultdict(deque)  # (kind, key) → Zeitpunkte
+        self._lock = threading.Lock()
+
+    def _prune(self, key, now):
+        attempts = self._attempts[key]
+        while attempts and attempts[0] <= now - self.window:
+            attempts.popleft()
+        if not attempts:
+            del self._attempts[key]
+        return attempts
+
+    def allow(self, account, ip):
+        """
+        Registriert einen Versuch. Liefert 0, wenn er zulässig ist, sonst die
+        Sekunden bis zum nächsten zulässigen Versuch.
+        """
+        now = time.monotonic()
+        keys = [("account", (account or "").lower()), ("ip", ip)]
+        with self._lock:
+            if len(self._attempts) > self.MAX_KEYS:
+                for key in list(self._attempts):
+                    self._prune(key, now)
+            for kind, key in keys:
+                attempts = self._prune((kind, key), now)
+                if len(attempts) >= self.limits[kind]:
+                    return int(attempts[0] + self.window - now) + 1
+            for key in keys:
+                self._attempts[key].append(now)
+            return 0
+
+    def reset(self, account):
+        """Nach erfolgreichem Login zählen frühere Fehlversuche des Accounts nicht mehr."""
+        with self._lock:
+            self._attempts.pop(("account", (account or "").lower()), None)
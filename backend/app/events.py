@@ -0,0 +1,189 @@
+import json
+import queue
+import threading
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, or_, tuple_
+
+from . import db
+from .indexer import sync_document_index
+from .models import NotarizationJob, NotarizedDocument
+
+class Subscription:
+    """Ein verbundener SSE-Client: Queue der noch nicht gesendeten Events."""
+    def __init__(self, org_address, organization_id, max_queue):
+        self.org_address = org_address.lower()
+        self.organization_id = organization_id
+        self.queue = queue.Queue(maxsize=max_queue)
+        # Client kam nicht hinterher → Stream wird beendet, EventSource verbindet neu
+        self.overflowed = False
+
+    def push(self, event, data):
+        try:
+            self.queue.put_nowait((event, data))
+        except queue.Full:
+            self.overflowed = True
+
+class EventHub:
+    """
+    Verteilt neue Chain-Ereignisse an die SSE-Clients (/api/events) einer Org.
+
+    Ein Follower-Thread je Prozess (läuft nur, solange Clients verbunden sind)
+    zieht alle SSE_POLL_INTERVAL Sekunden den Event-Index nach und liest dann
+    einmal für alle Clients die neuen Einträge aus notarized_documents und
+    die abgeschlossenen Jobs aus notarization_jobs. Da beide Tabellen
+    geteilt sind, sehen die Clients jedes Workers auch Notarisierungen, die
+    ein anderer Worker gesendet oder indiziert hat.
+    """
+    def __init__(self, app):
+        self.app = app
+        self._lock = threading.Lock()
+        self._subscribers = {}  # org_address → {Subscription}
+        self._thread = None
+        self._stop = threading.Event()
+        self._doc_cursor = None  # (block_number, log_index) des zuletzt verteilten Eintrags
+        self._job_cursor = None  # (updated_at, id) des zuletzt verteilten Jobs
+        self._sent_jobs = set()  # (updated_at, id) im Überlappungsfenster schon verteilter Jobs
+
+    def subscribe(self, org_address, organization_id):
+        """
+        Registriert einen Client (im App-Kontext aufrufen) und startet bei
+        Bedarf den Follower. None, wenn SSE_MAX_CLIENTS erreicht ist.
+        """
+        config = self.app.config
+        with self._lock:
+            if sum(len(subs) for subs in self._subscribers.values()) >= config["SSE_MAX_CLIENTS"]:
+                return None
+            sub = Subscription(org_address, organization_id, config["SSE_QUEUE_SIZE"])
+            self._subscribers.setdefault(sub.org_address, set()).add(sub)
+            follower = None
+            if self._thread is None:
+                self._stop.clear()
+                follower = self._thread = threading.Thread(target=self._run, name="chain-follower",
+                                                           daemon=True)
+        if follower:
+            self._init_cursors()
+            follower.start()
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            subs = self._subscribers.get(sub.org_address)
+            if subs:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.org_address]
+            if not self._subscribers:
+                self._stop.set()
+
+    def publish(self, org_address, event, data):
+        with self._lock:
+            subs = list(self._subscribers.get(org_address.lower(), ()))
+        for sub in subs:
+            sub.push(event, data)
+
+    def _run(self):
+        while True:
+            if self._stop.wait(self.app.config["SSE_POLL_INTERVAL"]):
+                with self._lock:
+                    if not self._subscribers:
+                        # Letzter Client weg → Follower endet bis zum nächsten subscribe()
+                        self._thread = None
+                        return
+                    self._stop.clear()
+                continue
+            with self.app.app_context():
+                try:
+                    self.poll_once()
+                except Exception:
+                    self.app.logger.exception("Chain-Follower fehlgeschlagen")
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+
+    def _init_cursors(self):
+        """Nur Ereignisse nach dem Verbinden verteilen, nicht die Historie."""
+        last = (NotarizedDocument.query
+                .order_by(NotarizedDocument.block_number.desc(), NotarizedDocument.log_index.desc())
+                .first())
+        self._doc_cursor = (last.block_number, last.log_index) if last else (-1, -1)
+        last = (NotarizationJob.query
+                .order_by(NotarizationJob.updated_at.desc(), NotarizationJob.id.desc())
+                .first())
+        self._job_cursor = ((last.updated_at, last.id) if last
+                            else (datetime.now(timezone.utc).replace(tzinfo=None), ""))
+        self._sent_jobs = {(job.updated_at, job.id) for job in self._job_window(NotarizationJob.query)}
+
+    def poll_once(self):
+        """Ein Follower-Durchlauf: Index nachziehen, neue Einträge verteilen."""
+        with self._lock:
+            org_addresses = list(self._subscribers)
+            organization_ids = {sub.organization_id
+                                for subs in self._subscribers.values() for sub in subs}
+        if not org_addresses:
+            return
+
+        try:
+            sync_document_index()
+        except Exception as exc:
+            # Node nicht erreichbar → trotzdem verteilen, was andere Worker indiziert haben
+            db.session.rollback()
+            self.app.logger.warning("Index-Sync im Chain-Follower fehlgeschlagen: %s", exc)
+
+        block, log_index = self._doc_cursor
+        rows = (NotarizedDocument.query
+                .filter(NotarizedDocument.org_address.in_(org_addresses))
+                .filter(or_(
+                    NotarizedDocument.block_number > block,
+                    and_(NotarizedDocument.block_number == block, NotarizedDocument.log_index > log_index)
+                ))
+                .order_by(NotarizedDocument.block_number, NotarizedDocument.log_index)
+                .limit(self.app.config["SSE_BATCH_LIMIT"])
+                .all())
+        for row in rows:
+            self.publish(row.org_address, "document", row.to_dict())
+        if rows:
+            self._doc_cursor = (rows[-1].block_number, rows[-1].log_index)
+
+        finished = (NotarizationJob.query
+                    .filter(NotarizationJob.organization_id.in_(organization_ids))
+                    .filter(NotarizationJob.status != "pending"))
+        # (updated_at, id) statt nur updated_at: Jobs mit gleichem Zeitstempel
+        # an der Limit-Grenze gehen nicht verloren
+        jobs = (finished
+                .filter(tuple_(NotarizationJob.updated_at, NotarizationJob.id) > self._job_cursor)
+                .order_by(NotarizationJob.updated_at, NotarizationJob.id)
+                .limit(self.app.config["SSE_BATCH_LIMIT"])
+                .all())
+        # Erst nach dem Cursor committete Änderungen mit älterem Zeitstempel
+        # (langsame Transaktion eines anderen Workers) im Fenster davor nachholen
+        late = [job for job in self._job_window(finished) if (job.updated_at, job.id) not in self._sent_jobs]
+        for job in late + jobs:
+            self._sent_jobs.add((job.updated_at, job.id))
+            for sub in self._subscribers_of(job.organization_id):
+                sub.push("job", job.to_dict())
+        if jobs:
+            self._job_cursor = (jobs[-1].updated_at, jobs[-1].id)
+        floor = self._job_cursor[0] - timedelta(seconds=self.app.config["SSE_JOB_OVERLAP_SECONDS"])
+        self._sent_jobs = {key for key in self._sent_jobs if key[0] >= floor}
+
+    def _job_window(self, query):
+        """Jobs aus query im Überlappungsfenster bis einschließlich Cursor."""
+        updated_at, job_id = self._job_cursor
+        floor = updated_at - timedelta(seconds=self.app.config["SSE_JOB_OVERLAP_SECONDS"])
+        return (query
+                .filter(NotarizationJob.updated_at >= floor)
+                .filter(tuple_(NotarizationJob.updated_at, NotarizationJob.id) <= self._job_cursor)
+                .all())
+
+    def _subscribers_of(self, organization_id):
+        with self._lock:
+            return [sub for subs in self._subscribers.values() for sub in subs
+                    if sub.organization_id == organization_id]
+
+def format_sse(event, data):
+    """Ein Event im text/event-stream-Format."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def init_events(app):
+    app.extensions["event_hub"] = EventHub(app)
@@ -0,0 +1,51 @@
+import threading
+import time
+
+from web3.exceptions import MethodUnavailable, Web3RPCError
+
+class FeeOracle:
+    """
+    Gebühren-Vorschlag für neue Transaktionen. Auf EIP-1559-Chains
+    maxFeePerGas = Base-Fee × base_multiplier + Priority-Fee (übersteht
+    mehrere volle Blöcke in Folge), sonst der gasPrice des Nodes. Der
+    Vorschlag wird ttl Sekunden für alle Sender wiederverwendet, statt je
+    Transaktion Block und Priority-Fee neu abzufragen.
+    """
+    def __init__(self, w3, ttl=5.0, base_multiplier=2, min_priority_fee=0):
+        self.w3 = w3
+        self.ttl = ttl
+        self.base_multiplier = base_multiplier
+        self.min_priority_fee = min_priority_fee
+        self._lock = threading.Lock()
+        self._fees = None
+        self._fetched_at = 0.0
+
+    def _priority_fee(self):
+        try:
+            # web3 fällt ohne eth_maxPriorityFeePerGas selbst auf eth_feeHistory zurück
+            tip = self.w3.eth.max_priority_fee
+        except (MethodUnavailable, Web3RPCError, ValueError):
+            tip = 0
+        return max(tip, self.min_priority_fee)
+
+    def _fetch(self):
+        base_fee = self.w3.eth.get_block("latest").get("baseFeePerGas")
+        if base_fee is None:
+            # Node ohne London-Hardfork
+            return {"gasPrice": self.w3.eth.gas_price}
+        tip = self._priority_fee()
+        return {"maxFeePerGas": base_fee * self.base_multiplier + tip, "maxPriorityFeePerGas": tip}
+
+    def suggest(self):
+        """Gebühren-Felder für build_transaction (gasPrice bzw. maxFeePerGas/maxPriorityFeePerGas)."""
+        with self._lock:
+            now = time.monotonic()
+            if self._fees is None or now - self._fetched_at > self.ttl:
+                self._fees = self._fetch()
+                self._fetched_at = now
+            return dict(self._fees)
+
+    def invalidate(self):
+        """Nach einer wegen zu niedriger Gebühr abgelehnten Transaktion neu abfragen."""
+        with self._lock:
+            self._fees = None
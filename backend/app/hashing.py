@@ -0,0 +1,33 @@
+from tempfile import SpooledTemporaryFile
+
+from Crypto.Hash import keccak
+from flask import Request, current_app
+from hexbytes import HexBytes
+
+from .metrics import HASH_SECONDS
+
+class UploadRequest(Request):
+    """
+    Request-Klasse mit konfigurierbarer Spool-Grenze für Datei-Uploads:
+    bis UPLOAD_SPOOL_THRESHOLD Bytes bleibt ein Upload im Speicher, erst
+    darüber wird er in eine temporäre Datei ausgelagert.
+    """
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return SpooledTemporaryFile(max_size=current_app.config["UPLOAD_SPOOL_THRESHOLD"], mode="rb+")
+
+def keccak_file(file, chunk_size=None):
+    """
+    Keccak-256 eines Uploads (FileStorage), inkrementell in Blöcken fester
+    Größe gelesen – der Speicherbedarf ist unabhängig von der Dateigröße.
+    Liefert HexBytes wie w3.keccak(data).
+    """
+    chunk_size = chunk_size or current_app.config["HASH_CHUNK_SIZE"]
+    hasher = keccak.new(digest_bits=256)
+    stream = file.stream
+    with HASH_SECONDS.time():
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            hasher.update(chunk)
+    return HexBytes(hasher.digest())
@@ -0,0 +1,118 @@
+from itertools import islice
+
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from web3.exceptions import Web3RPCError
+import click
+
+from . import db
+from .models import NotarizedDocument, IndexCheckpoint
+from .stats import record_notarizations
+from .web3utils import get_chain, cached_call
+
+CHECKPOINT_NAME = "DocumentNotarized"
+
+# Fehlertexte, mit denen Nodes/Provider (Geth, Erigon, Alchemy, Infura …)
+# ein zu großes eth_getLogs-Ergebnis bzw. einen zu großen Bereich ablehnen
+_TOO_MANY_RESULTS = ("query returned more than", "too many results", "response size exceeded",
+                     "log response size", "limit exceeded", "block range", "query timeout")
+
+def _is_too_many_results(exc):
+    return any(msg in str(exc).lower() for msg in _TOO_MANY_RESULTS)
+
+def fetch_logs(event, from_block, to_block, chunk_blocks, **filters):
+    """
+    Holt die Logs von event im Bereich [from_block, to_block] in Block-Chunks
+    von höchstens chunk_blocks Blöcken. Lehnt der Node einen Chunk als zu groß
+    ab, wird er halbiert; nach erfolgreichen Chunks wächst die Größe wieder.
+    filters (z. B. argument_filters) gehen unverändert an get_logs.
+    Liefert (letzter Block des Chunks, Logs) je Chunk.
+    """
+    size = chunk_blocks
+    start = from_block
+    while start <= to_block:
+        end = min(start + size - 1, to_block)
+        try:
+            logs = event.get_logs(from_block=start, to_block=end, **filters)
+        except (Web3RPCError, ValueError) as exc:
+            if size == 1 or not _is_too_many_results(exc):
+                raise
+            size = max(size // 2, 1)
+            continue
+        yield end, logs
+        start = end + 1
+        size = min(size * 2, chunk_blocks)
+
+def sync_document_index(max_chunks=None):
+    """
+    Übernimmt alle DocumentNotarized-Events seit dem gespeicherten Checkpoint
+    in die Tabelle notarized_documents und schiebt den Checkpoint weiter.
+    max_chunks begrenzt die Zahl der Log-Chunks (Aufrufe im Request); den
+    Rest holen der Chain-Follower bzw. `flask index-sync` nach.
+    Liefert die Anzahl neu indizierter Events.
+    """
+    # 1) Block-Bereich bestimmen (Checkpoint + 1 bis Head - Confirmations)
+    checkpoint = db.session.get(IndexCheckpoint, CHECKPOINT_NAME)
+    if checkpoint:
+        from_block = checkpoint.last_block + 1
+    else:
+        from_block = current_app.config["INDEX_START_BLOCK"]
+    chain = get_chain()
+    to_block = chain.w3.eth.block_number - current_app.config["INDEX_CONFIRMATIONS"]
+    if to_block < from_block:
+        return 0
+
+    # 2) Nur die neuen Logs holen – chunkweise, jeder Chunk ein eigener Commit
+    count = 0
+    owners = {}
+    chunks = fetch_logs(chain.contract.events.DocumentNotarized, from_block, to_block,
+                        current_app.config["INDEX_LOG_CHUNK_BLOCKS"])
+    for chunk_end, events in islice(chunks, max_chunks):
+        # 3) Besitzende Org je idHash auflösen – docOrg ändert sich nach der
+        #    Erst-Notarisierung nie, daher reicht ein getDocOrg pro neuer ID
+        for ev in events:
+            id_hex = ev.args.idHash.hex()
+            if id_hex in owners:
+                continue
+            known = NotarizedDocument.query.filter_by(id_hash=id_hex).first()
+            if known:
+                owners[id_hex] = known.org_address
+            else:
+                owners[id_hex] = cached_call("getDocOrg", ev.args.idHash).lower()
+
+        rows = [
+            NotarizedDocument(
+                id_hash=ev.args.idHash.hex(),
+                document_hash=ev.args.documentHash.hex(),
+                org_address=owners[ev.args.idHash.hex()],
+                timestamp=ev.args.timestamp,
+                tx_hash=ev.transactionHash.hex(),
+                block_number=ev.blockNumber,
+                log_index=ev.logIndex
+            )
+            for ev in events
+        ]
+        db.session.add_all(rows)
+        record_notarizations(rows)
+
+        # 4) Checkpoint (und Org-Statistik) im selben Commit fortschreiben
+        if checkpoint:
+            checkpoint.last_block = chunk_end
+        else:
+            checkpoint = IndexCheckpoint(name=CHECKPOINT_NAME, last_block=chunk_end)
+            db.session.add(checkpoint)
+
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Ein paralleler Worker hat denselben Bereich bereits indiziert
+            db.session.rollback()
+            return count
+        count += len(events)
+    return count
+
+@click.command("index-sync")
+def index_sync_command():
+    """Indiziert alle noch fehlenden DocumentNotarized-Events."""
+    count = sync_document_index()
+    click.echo(f"{count} Events indiziert")
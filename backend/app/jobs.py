@@ -0,0 +1,115 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from hexbytes import HexBytes
+from web3.exceptions import TimeExhausted, TransactionNotFound
+
+from . import db
+from .models import NotarizationJob
+from .web3utils import get_chain, invalidate_document
+
+# Ein Receipt-Tracker (Thread-Pool) je Prozess; _tracked hält die Jobs,
+# auf deren Receipt in diesem Prozess gewartet wird
+_executor = None
+_executor_lock = threading.Lock()
+_tracked = set()
+
+# So oft prüft der Tracker beim Warten, ob der Sender-Pool die Transaktion ersetzt hat
+_REPLACEMENT_CHECK_SECONDS = 5
+
+def _get_executor(app):
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=app.config["RECEIPT_TRACKER_WORKERS"],
+                thread_name_prefix="receipt-tracker"
+            )
+        return _executor
+
+def create_job(organization_id, doc_id, id_hash, doc_hash, tx_hash):
+    job = NotarizationJob(
+        id=str(uuid.uuid4()),
+        organization_id=organization_id,
+        document_id=doc_id,
+        id_hash=id_hash.hex(),
+        document_hash=doc_hash.hex(),
+        tx_hash=tx_hash.hex()
+    )
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+def track_receipt(app, job_id, tx_hash):
+    """Übergibt das Warten auf den Receipt an den Tracker-Pool."""
+    _tracked.add(job_id)
+    _get_executor(app).submit(_wait_for_receipt, app, job_id, tx_hash)
+
+def _wait_for_receipt(app, job_id, tx_hash):
+    with app.app_context():
+        try:
+            receipt = _wait_following_replacements(get_chain(), tx_hash, app.config["RECEIPT_TIMEOUT"])
+            _apply_receipt(db.session.get(NotarizationJob, job_id), receipt)
+        except Exception as exc:
+            # Timeout oder Node nicht erreichbar: die Transaktion kann noch
+            # gemined werden → Job bleibt pending, refresh_job fragt später nach
+            app.logger.warning("Receipt für Job %s nicht erhalten: %s", job_id, exc)
+        finally:
+            db.session.commit()
+            db.session.remove()
+            _tracked.discard(job_id)
+
+def _wait_following_replacements(chain, tx_hash, timeout):
+    """
+    Wartet auf den Receipt von tx_hash; ersetzt der Sender-Pool die
+    Transaktion zwischendurch (replace_stuck), auf den der neuen.
+    """
+    deadline = time.monotonic() + timeout
+    tx_hash = HexBytes(tx_hash)
+    while True:
+        remaining = deadline - time.monotonic()
+        try:
+            return chain.w3.eth.wait_for_transaction_receipt(
+                tx_hash, timeout=max(min(remaining, _REPLACEMENT_CHECK_SECONDS), 0.1)
+            )
+        except TimeExhausted:
+            current = chain.sender_pool.replacement_for(tx_hash)
+            if current != tx_hash:
+                tx_hash = current
+            elif remaining <= _REPLACEMENT_CHECK_SECONDS:
+                raise
+
+def record_replacement(app, old_hash, new_hash):
+    """Listener des Sender-Pools: offene Jobs auf den Hash der Ersatz-Transaktion umstellen."""
+    with app.app_context():
+        (NotarizationJob.query
+         .filter_by(tx_hash=old_hash.hex(), status="pending")
+         .update({"tx_hash": new_hash.hex()}))
+        db.session.commit()
+
+def _apply_receipt(job, receipt):
+    job.tx_hash = receipt.transactionHash.hex()
+    job.block_number = receipt.blockNumber
+    if receipt.status == 1:
+        job.status = "confirmed"
+        invalidate_document(bytes.fromhex(job.id_hash), bytes.fromhex(job.document_hash))
+    else:
+        job.status = "failed"
+        job.error = "Transaktion revertiert"
+
+def refresh_job(job):
+    """
+    Für Jobs ohne Tracker in diesem Prozess (z. B. nach einem Neustart):
+    einmalig und nicht blockierend nach dem Receipt fragen.
+    """
+    if job.status != "pending" or job.id in _tracked:
+        return job
+    try:
+        receipt = get_chain().w3.eth.get_transaction_receipt(job.tx_hash)
+    except TransactionNotFound:
+        return job
+    _apply_receipt(job, receipt)
+    db.session.commit()
+    return job
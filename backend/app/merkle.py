@@ -0,0 +1,45 @@
+from web3 import Web3
+
+def leaf_hash(id_hash, doc_hash):
+    """
+    Blatt für (id_hash, doc_hash) wie im Contract:
+    keccak256(keccak256(idHash, documentHash)). Das doppelte Hashen trennt
+    Blätter von inneren Knoten (Second-Preimage-Schutz).
+    """
+    return Web3.keccak(Web3.keccak(id_hash + doc_hash))
+
+def _hash_pair(a, b):
+    # Sortierte Paare → der Proof braucht keine Links/Rechts-Information
+    return Web3.keccak(a + b) if a < b else Web3.keccak(b + a)
+
+def build_tree(leaves):
+    """
+    Baut alle Ebenen des Merkle-Baums (Ebene 0 = Blätter, letzte = [root]).
+    Ein übrig bleibender Knoten wird unverändert in die nächste Ebene übernommen.
+    """
+    if not leaves:
+        raise ValueError("Merkle-Baum ohne Blätter")
+    levels = [list(leaves)]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parent = [_hash_pair(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parent.append(level[-1])
+        levels.append(parent)
+    return levels
+
+def get_proof(levels, index):
+    """Liefert die Geschwister-Hashes vom Blatt `index` bis zur Root."""
+    proof = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append(level[sibling])
+        index //= 2
+    return proof
+
+def verify_proof(leaf, proof, root):
+    computed = leaf
+    for sibling in proof:
+        computed = _hash_pair(computed, sibling)
+    return computed == root
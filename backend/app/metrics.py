@@ -0,0 +1,188 @@
+import os
+import threading
+import time
+
+from flask import Response, g, has_request_context, request
+from hexbytes import HexBytes
+from prometheus_client import (CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge,
+                               Histogram, REGISTRY, generate_latest, multiprocess)
+from sqlalchemy import event
+from web3.middleware import Web3Middleware
+
+# Metriken gelten je Prozess (unter gunicorn: PROMETHEUS_MULTIPROC_DIR setzen)
+HTTP_REQUEST_SECONDS = Histogram(
+    "notary_http_request_duration_seconds", "Dauer der HTTP-Requests je Route",
+    ["method", "route", "status"]
+)
+UPLOAD_BYTES = Histogram(
+    "notary_upload_bytes", "Größe der Request-Bodies (Uploads) je Route",
+    ["route"], buckets=[2 ** i for i in range(10, 31, 2)]
+)
+HASH_SECONDS = Histogram(
+    "notary_hash_duration_seconds", "Dauer der Keccak-Berechnung je Upload"
+)
+DB_QUERIES = Counter(
+    "notary_db_queries_total", "Ausgeführte SQL-Statements"
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "notary_db_queries_per_request", "SQL-Statements je HTTP-Request",
+    ["route"], buckets=[0, 1, 2, 3, 5, 10, 20, 50, 100]
+)
+RPC_REQUESTS = Counter(
+    "notary_rpc_requests_total", "JSON-RPC-Calls an den Node je Methode (Batch-Einträge einzeln)",
+    ["method"]
+)
+RPC_ERRORS = Counter(
+    "notary_rpc_errors_total", "Fehlgeschlagene JSON-RPC-Calls je Methode",
+    ["method"]
+)
+RPC_SECONDS = Histogram(
+    "notary_rpc_duration_seconds", "Dauer der JSON-RPC-Round-Trips je Methode (Batches als 'batch')",
+    ["method"]
+)
+RPC_HEDGED_REQUESTS = Counter(
+    "notary_rpc_hedged_requests_total", "Reads, die zusätzlich an einen zweiten Node gingen (Hedging)"
+)
+RPC_FAILOVERS = Counter(
+    "notary_rpc_failovers_total", "Nach einem Verbindungsfehler an einen anderen Node gesendete Requests"
+)
+RPC_ENDPOINT_HEALTHY = Gauge(
+    "notary_rpc_endpoint_healthy", "1, wenn der RPC-Node laut Health-Probe nutzbar ist",
+    ["endpoint"], multiprocess_mode="max"
+)
+RPC_ENDPOINT_LATENCY = Gauge(
+    "notary_rpc_endpoint_latency_seconds", "Gemessene Latenz (EWMA) je RPC-Node",
+    ["endpoint"], multiprocess_mode="max"
+)
+PREFILTER_LOOKUPS = Counter(
+    "notary_prefilter_lookups_total",
+    "Verify-Lookups am Prefilter: absent (ohne eth_call beantwortet), candidate, unavailable",
+    ["result"]
+)
+PENDING_TRANSACTIONS = Gauge(
+    "notary_pending_transactions", "Gesendete Transaktionen ohne abgefragten Receipt",
+    multiprocess_mode="livesum"
+)
+
+# Gesendete, noch nicht bestätigte Transaktionen (tx_hash → Sendezeit);
+# Einträge ohne Receipt (z. B. ersetzte Transaktionen) verfallen nach einer Stunde
+_PENDING_MAX_AGE = 3600
+_pending = {}
+_pending_lock = threading.Lock()
+
+def _track_sent(tx_hash):
+    now = time.monotonic()
+    with _pending_lock:
+        for stale in [h for h, sent_at in _pending.items() if now - sent_at > _PENDING_MAX_AGE]:
+            del _pending[stale]
+        _pending[tx_hash] = now
+        PENDING_TRANSACTIONS.set(len(_pending))
+
+def _track_receipt(tx_hash):
+    with _pending_lock:
+        if _pending.pop(tx_hash, None) is not None:
+            PENDING_TRANSACTIONS.set(len(_pending))
+
+class RpcMetricsMiddleware(Web3Middleware):
+    """
+    Zählt und misst jeden RPC-Call (auch JSON-RPC-Batches) und führt den
+    Gauge der offenen Transaktionen (eth_sendTransaction → Receipt).
+    """
+    def wrap_make_request(self, make_request):
+        def middleware(method, params):
+            started = time.perf_counter()
+            try:
+                response = make_request(method, params)
+            except Exception:
+                RPC_ERRORS.labels(method).inc()
+                raise
+            finally:
+                RPC_REQUESTS.labels(method).inc()
+                RPC_SECONDS.labels(method).observe(time.perf_counter() - started)
+            if "error" in response:
+                RPC_ERRORS.labels(method).inc()
+            elif method in ("eth_sendTransaction", "eth_sendRawTransaction"):
+                _track_sent(HexBytes(response["result"]).hex())
+            elif method == "eth_getTransactionReceipt" and response.get("result"):
+                _track_receipt(HexBytes(params[0]).hex())
+            return response
+        return middleware
+
+    async def async_wrap_make_request(self, make_request):
+        # AsyncWeb3 (ASGI-Modus, app/aio.py)
+        async def middleware(method, params):
+            started = time.perf_counter()
+            try:
+                response = await make_request(method, params)
+            except Exception:
+                RPC_ERRORS.labels(method).inc()
+                raise
+            finally:
+                RPC_REQUESTS.labels(method).inc()
+                RPC_SECONDS.labels(method).observe(time.perf_counter() - started)
+            if "error" in response:
+                RPC_ERRORS.labels(method).inc()
+            elif method in ("eth_sendTransaction", "eth_sendRawTransaction"):
+                _track_sent(HexBytes(response["result"]).hex())
+            elif method == "eth_getTransactionReceipt" and response.get("result"):
+                _track_receipt(HexBytes(params[0]).hex())
+            return response
+        return middleware
+
+    def wrap_make_batch_request(self, make_batch_request):
+        def middleware(requests_info):
+            started = time.perf_counter()
+            try:
+                return make_batch_request(requests_info)
+            finally:
+                RPC_SECONDS.labels("batch").observe(time.perf_counter() - started)
+                for method, _ in requests_info:
+                    RPC_REQUESTS.labels(method).inc()
+        return middleware
+
+def _route():
+    return request.url_rule.rule if request.url_rule else "unmatched"
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    DB_QUERIES.inc()
+    if has_request_context():
+        g.db_queries = g.get("db_queries", 0) + 1
+
+def _registry():
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+def init_metrics(app):
+    """
+    Registriert Request-Hooks, den Query-Zähler an den Engines der App und
+    den Endpunkt /metrics (Prometheus-Textformat).
+    """
+    from . import db  # app/__init__ importiert metrics (über hashing) vor db
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, "before_cursor_execute", _count_query)
+
+    @app.before_request
+    def _start_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def _observe(response):
+        started = g.pop("request_started", None)
+        if started is not None:
+            route = _route()
+            HTTP_REQUEST_SECONDS.labels(request.method, route, response.status_code).observe(
+                time.perf_counter() - started
+            )
+            DB_QUERIES_PER_REQUEST.labels(route).observe(g.pop("db_queries", 0))
+            if request.content_length:
+                UPLOAD_BYTES.labels(route).observe(request.content_length)
+        return response
+
+    @app.route("/metrics")
+    def metrics():
+        return Response(generate_latest(_registry()), content_type=CONTENT_TYPE_LATEST)
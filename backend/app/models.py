@@ -1,4 +1,5 @@
 from . import db, bcrypt
+from datetime import datetime, timezone
 from flask_login import UserMixin
 import pyotp
 
@@ -15,7 +16,7 @@ class User(db.Model, UserMixin):
     email          = db.Column(db.String(128), unique=True, nullable=False)
     password_hash  = db.Column(db.String(128), nullable=False)
     otp_secret     = db.Column(db.String(32), nullable=True)  # für TOTP
-    organization_id = db.Column(db.Integer, db.ForeignKey("organizations.id"), nullable=False)
+    organization_id = db.Column(db.Integer, db.ForeignKey("organizations.id"), nullable=False, index=True)
 
     def set_password(self, password):
         self.password_hash = bcrypt.generate_password_hash(password).decode()
@@ -31,3 +32,139 @@ class User(db.Model, UserMixin):
             return False
         totp = pyotp.TOTP(self.otp_secret)
         return totp.verify(token, valid_window=5)
+
+
+class NotarizedDocument(db.Model):
+    """
+    Lokale Kopie eines DocumentNotarized-Events (siehe app/indexer.py).
+    """
+    __tablename__ = "notarized_documents"
+    id            = db.Column(db.Integer, primary_key=True)
+    id_hash       = db.Column(db.String(66), nullable=False, index=True)
+    document_hash = db.Column(db.String(66), nullable=False, index=True)
+    org_address   = db.Column(db.String(42), nullable=False)  # lowercase, wie getDocOrg
+    timestamp     = db.Column(db.BigInteger, nullable=False)
+    tx_hash       = db.Column(db.String(66), nullable=False)
+    block_number  = db.Column(db.Integer, nullable=False)
+    log_index     = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint("tx_hash", "log_index", name="uq_notarized_documents_log"),
+        db.Index("ix_notarized_documents_org_block", "org_address", "block_number", "log_index"),
+    )
+
+    def to_dict(self):
+        return {
+            "idHash":       self.id_hash,
+            "documentHash": self.document_hash,
+            "timestamp":    self.timestamp,
+            "txHash":       self.tx_hash,
+            "blockNumber":  self.block_number
+        }
+
+class IndexCheckpoint(db.Model):
+    """
+    Letzter vollständig indizierter Block je Event-Index.
+    """
+    __tablename__ = "index_checkpoints"
+    name       = db.Column(db.String(64), primary_key=True)
+    last_block = db.Column(db.Integer, nullable=False)
+
+class AnchorBatch(db.Model):
+    """
+    Ein per anchorRoot verankerter Merkle-Baum über mehrere Dokumente.
+    """
+    __tablename__ = "anchor_batches"
+    id           = db.Column(db.Integer, primary_key=True)
+    org_address  = db.Column(db.String(42), nullable=False)
+    merkle_root  = db.Column(db.String(66), unique=True, nullable=False)
+    leaf_count   = db.Column(db.Integer, nullable=False)
+    tx_hash      = db.Column(db.String(66), nullable=True)   # gesetzt, sobald gesendet
+    sent_block   = db.Column(db.Integer, nullable=True)      # Chain-Head vor dem Senden (Suche in _adopt)
+    block_number = db.Column(db.Integer, nullable=True)      # gesetzt, sobald gemined
+    anchored_at  = db.Column(db.BigInteger, nullable=True)   # Block-Timestamp
+    created_at   = db.Column(db.DateTime, nullable=False,
+                             default=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
+    documents    = db.relationship("AnchoredDocument", backref="batch", lazy=True)
+
+class AnchoredDocument(db.Model):
+    """
+    Für die Verankerung eingereichtes Dokument. Solange batch_id NULL ist,
+    wartet es auf das nächste Anker-Fenster; danach hält proof den
+    Inclusion-Proof (JSON-Liste von Hex-Hashes).
+    """
+    __tablename__ = "anchored_documents"
+    id            = db.Column(db.Integer, primary_key=True)
+    # Eine ID wird nur einmal verankert (wie bei /notarize) – auch bei parallelen Requests
+    id_hash       = db.Column(db.String(66), nullable=False, index=True, unique=True)
+    document_hash = db.Column(db.String(66), nullable=False, index=True)
+    org_address   = db.Column(db.String(42), nullable=False)
+    submitted_at  = db.Column(db.DateTime, nullable=False,
+                              default=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
+    batch_id      = db.Column(db.Integer, db.ForeignKey("anchor_batches.id"), nullable=True, index=True)
+    leaf_index    = db.Column(db.Integer, nullable=True)
+    proof         = db.Column(db.Text, nullable=True)
+    # Dauerhafter Fehler (Revert von anchorRoot): geparkt, bis "flask anchor-flush --retry-failed"
+    error         = db.Column(db.Text, nullable=True)
+
+    __table_args__ = (
+        db.UniqueConstraint("id_hash", "document_hash", name="uq_anchored_documents_pair"),
+        # Wartende Dokumente je Org (pending_count, flush_anchor_batch)
+        db.Index("ix_anchored_documents_org_batch", "org_address", "batch_id"),
+    )
+
+class NotarizationJob(db.Model):
+    """
+    Asynchrone Notarisierung (/api/notarize?async=1): die Transaktion ist
+    gesendet, den Receipt trägt der Receipt-Tracker (app/jobs.py) nach.
+    """
+    __tablename__ = "notarization_jobs"
+    id              = db.Column(db.String(36), primary_key=True)  # UUID4
+    organization_id = db.Column(db.Integer, db.ForeignKey("organizations.id"), nullable=False, index=True)
+    document_id     = db.Column(db.String(256), nullable=False)
+    id_hash         = db.Column(db.String(66), nullable=False)
+    document_hash   = db.Column(db.String(66), nullable=False)
+    tx_hash         = db.Column(db.String(66), nullable=False, index=True)
+    status          = db.Column(db.String(16), nullable=False, default="pending")  # pending | confirmed | failed
+    block_number    = db.Column(db.Integer, nullable=True)
+    error           = db.Column(db.Text, nullable=True)
+    created_at      = db.Column(db.DateTime, nullable=False,
+                                default=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
+    updated_at      = db.Column(db.DateTime, nullable=False,
+                                default=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+                                onupdate=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
+
+    def to_dict(self):
+        return {
+            "jobId":        self.id,
+            "documentId":   self.document_id,
+            "documentHash": self.document_hash,
+            "status":       self.status,
+            "txHash":       self.tx_hash,
+            "blockNumber":  self.block_number,
+            "error":        self.error,
+            "createdAt":    self.created_at.isoformat(),
+            "updatedAt":    self.updated_at.isoformat()
+        }
+
+class OrgStats(db.Model):
+    """
+    Laufend fortgeschriebene Kennzahlen je Org (siehe app/stats.py), damit
+    /api/stats nicht über den ganzen Event-Index zählen muss.
+    """
+    __tablename__ = "org_stats"
+    org_address          = db.Column(db.String(42), primary_key=True)
+    total_notarizations  = db.Column(db.Integer, nullable=False, default=0)
+    latest_document_hash = db.Column(db.String(66), nullable=True)
+    latest_timestamp     = db.Column(db.BigInteger, nullable=True)
+
+class OrgStatsBucket(db.Model):
+    """
+    Anzahl Notarisierungen einer Org je Stunde bzw. Tag (bucket_start =
+    Unix-Zeit des Intervallbeginns, UTC).
+    """
+    __tablename__ = "org_stats_buckets"
+    org_address  = db.Column(db.String(42), primary_key=True)
+    granularity  = db.Column(db.String(8), primary_key=True)  # hour | day
+    bucket_start = db.Column(db.BigInteger, primary_key=True)
+    count        = db.Column(db.Integer, nullable=False, default=0)
@@ -0,0 +1,261 @@
+import json
+import math
+import os
+import threading
+import time
+
+import click
+from flask import current_app
+
+from . import db
+from .metrics import PREFILTER_LOOKUPS
+from .models import IndexCheckpoint, NotarizedDocument
+
+class BloomFilter:
+    """
+    Bloom-Filter über 32-Byte-Keccak-Hashes. Die Hashes sind bereits
+    gleichverteilt, die k Bit-Positionen kommen daher per Double-Hashing
+    direkt aus ihren ersten 16 Bytes.
+    """
+    def __init__(self, capacity, error_rate, bits=None, count=0):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bits if bits is not None else bytearray((self.size + 7) // 8)
+        self.count = count
+
+    def _positions(self, item):
+        h1 = int.from_bytes(item[:8], "big")
+        h2 = int.from_bytes(item[8:16], "big") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        """Setzt die Bits von item; False, wenn alle schon gesetzt waren."""
+        new = False
+        for pos in self._positions(item):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not self.bits[byte] & mask:
+                self.bits[byte] |= mask
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+class ScalableBloomFilter:
+    """
+    Wächst mit der Chain: ist die letzte Stufe voll, kommt eine mit doppelter
+    Kapazität und halber Fehlerrate dazu – die Gesamt-Fehlerrate bleibt unter
+    error_rate, ohne alle Hashes neu einfügen zu müssen.
+    """
+    def __init__(self, capacity=None, error_rate=None, layers=None):
+        # layers: aus einem Snapshot geladene Stufen
+        self.layers = layers or [BloomFilter(capacity, error_rate / 2)]
+
+    def add(self, item):
+        if item in self:
+            return False
+        layer = self.layers[-1]
+        if layer.count >= layer.capacity:
+            layer = BloomFilter(layer.capacity * 2, layer.error_rate / 2)
+            self.layers.append(layer)
+        return layer.add(item)
+
+    def __contains__(self, item):
+        return any(item in layer for layer in self.layers)
+
+    @property
+    def count(self):
+        return sum(layer.count for layer in self.layers)
+
+    @property
+    def nbytes(self):
+        return sum(len(layer.bits) for layer in self.layers)
+
+SNAPSHOT_MAGIC = b"NOTARY-PREFILTER 1\n"
+
+class DocumentPrefilter:
+    """
+    Menge aller per storeDocumentHash notarisierten Dateihashes
+    (DocumentNotarized-Logs) als Bloom-Filter im Speicher. Was nicht im
+    Filter ist, hat fileTimestamps == 0 – /api/verify spart sich dann den
+    eth_call; Treffer (auch Fehlalarme) werden weiter on-chain bestätigt.
+
+    Der Filter folgt der Chain über eigene eth_getLogs-Abfragen ab dem
+    zuletzt übernommenen Block (die letzten PREFILTER_REORG_DEPTH Blöcke
+    jeweils erneut) und wird nur genutzt, wenn er höchstens
+    PREFILTER_MAX_STALENESS Sekunden alt ist – wie Null-Ergebnisse im
+    Read-Cache (READ_CACHE_NEGATIVE_TTL). Eigene Notarisierungen trägt
+    ChainClient.invalidate_document sofort ein. Aufgebaut wird er aus dem
+    Snapshot (PREFILTER_SNAPSHOT_PATH), sonst aus dem Event-Index der DB –
+    wie das Nachziehen in einem Hintergrund-Thread, nie im Request.
+    """
+    def __init__(self, chain):
+        self.chain = chain
+        self.config = chain.config
+        self.bloom = None
+        self.block = None  # letzter vollständig übernommener Block
+        self.refreshed_at = 0.0
+        self.snapshot_at = time.monotonic()
+        self._refresh_lock = threading.Lock()
+        self._bits_lock = threading.Lock()
+        self._thread = None
+        self._retry_at = 0.0
+
+    def add(self, doc_hash):
+        if self.bloom is not None:
+            with self._bits_lock:
+                self.bloom.add(bytes(doc_hash))
+
+    def candidates(self, doc_hashes):
+        """
+        Die Hashes, die notarisiert sein können (im App-Kontext aufrufen).
+        Ist der Filter deaktiviert, noch nicht aufgebaut oder nicht aktuell,
+        sind das alle.
+        """
+        if not doc_hashes or not self._ready():
+            PREFILTER_LOOKUPS.labels("unavailable").inc(len(doc_hashes))
+            return list(doc_hashes)
+        found = [h for h in doc_hashes if bytes(h) in self.bloom]
+        PREFILTER_LOOKUPS.labels("candidate").inc(len(found))
+        PREFILTER_LOOKUPS.labels("absent").inc(len(doc_hashes) - len(found))
+        return found
+
+    def _ready(self):
+        if not self.config["PREFILTER_ENABLED"]:
+            return False
+        age = time.monotonic() - self.refreshed_at
+        # Schon nach der halben Frist im Hintergrund nachziehen, damit der
+        # Filter im Normalbetrieb gar nicht erst veraltet
+        if age > self.config["PREFILTER_MAX_STALENESS"] / 2:
+            self._start_refresh()
+        return self.bloom is not None and age <= self.config["PREFILTER_MAX_STALENESS"]
+
+    def _start_refresh(self):
+        """
+        Aufbau, Nachziehen und Snapshot laufen in einem eigenen Thread –
+        Requests lesen nur den aktuellen Filter. Nach einem Fehlschlag erst
+        wieder nach PREFILTER_MAX_STALENESS Sekunden.
+        """
+        if time.monotonic() < self._retry_at or not self._refresh_lock.acquire(blocking=False):
+            return
+        app = current_app._get_current_object()
+        self._thread = threading.Thread(target=self._run_refresh, args=(app,), name="prefilter-refresh",
+                                        daemon=True)
+        self._thread.start()
+
+    def _run_refresh(self, app):
+        try:
+            with app.app_context():
+                try:
+                    self.refresh()
+                except Exception as exc:
+                    db.session.rollback()
+                    self._retry_at = time.monotonic() + self.config["PREFILTER_MAX_STALENESS"]
+                    app.logger.warning("Prefilter nicht aktualisiert: %s", exc)
+                finally:
+                    db.session.remove()
+        finally:
+            self._refresh_lock.release()
+
+    def refresh(self):
+        """Lädt/baut den Filter bei Bedarf und übernimmt die Logs neuer Blöcke."""
+        from .indexer import fetch_logs  # indexer importiert web3utils
+
+        if self.bloom is None:
+            self._load()
+        started = time.monotonic()
+        head = self.chain.w3.eth.block_number
+        start = max(self.block + 1 - self.config["PREFILTER_REORG_DEPTH"], self.config["INDEX_START_BLOCK"])
+        if start <= head:
+            for _, events in fetch_logs(self.chain.contract.events.DocumentNotarized, start, head,
+                                        self.config["INDEX_LOG_CHUNK_BLOCKS"]):
+                with self._bits_lock:
+                    for ev in events:
+                        self.bloom.add(bytes(ev.args.documentHash))
+        self.block = max(self.block, head)
+        self.refreshed_at = started
+
+        if (self.config["PREFILTER_SNAPSHOT_PATH"]
+                and time.monotonic() - self.snapshot_at > self.config["PREFILTER_SNAPSHOT_INTERVAL"]):
+            self.save_snapshot()
+
+    def _load(self):
+        if self.config["PREFILTER_SNAPSHOT_PATH"] and self._load_snapshot():
+            return
+        bloom = ScalableBloomFilter(self.config["PREFILTER_CAPACITY"], self.config["PREFILTER_ERROR_RATE"])
+        block = self.config["INDEX_START_BLOCK"] - 1
+        # Erstaufbau aus dem Event-Index (bis zu seinem Checkpoint) statt aus allen Logs
+        from .indexer import CHECKPOINT_NAME
+        checkpoint = db.session.get(IndexCheckpoint, CHECKPOINT_NAME)
+        if checkpoint:
+            rows = (db.session.query(NotarizedDocument.document_hash)
+                    .filter(NotarizedDocument.block_number <= checkpoint.last_block)
+                    .yield_per(10_000))
+            for (doc_hex,) in rows:
+                bloom.add(bytes.fromhex(doc_hex))
+            block = checkpoint.last_block
+        self.bloom, self.block = bloom, block
+
+    def _load_snapshot(self):
+        path = self.config["PREFILTER_SNAPSHOT_PATH"]
+        try:
+            with open(path, "rb") as f:
+                if f.readline() != SNAPSHOT_MAGIC:
+                    raise ValueError("kein Prefilter-Snapshot")
+                header = json.loads(f.readline())
+                if header["contract"] != self.chain.contract.address:
+                    # Snapshot eines anderen (z. B. neu deployten) Contracts
+                    return False
+                layers = []
+                for spec in header["layers"]:
+                    layer = BloomFilter(spec["capacity"], spec["errorRate"], count=spec["count"])
+                    bits = f.read(len(layer.bits))
+                    if len(bits) != len(layer.bits):
+                        # Abgeschnitten (z. B. volle Platte) → sonst IndexError bei jedem Lookup
+                        raise ValueError(f"Stufe {len(layers)}: {len(bits)} statt {len(layer.bits)} Bytes")
+                    layer.bits = bytearray(bits)
+                    layers.append(layer)
+                if not layers or f.read(1):
+                    raise ValueError("Stufen passen nicht zum Header")
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, KeyError) as exc:
+            current_app.logger.warning("Prefilter-Snapshot %s unbrauchbar: %s", path, exc)
+            return False
+        self.bloom = ScalableBloomFilter(layers=layers)
+        self.block = header["block"]
+        return True
+
+    def save_snapshot(self):
+        """Schreibt den Filter atomar nach PREFILTER_SNAPSHOT_PATH."""
+        path = self.config["PREFILTER_SNAPSHOT_PATH"]
+        with self._bits_lock:
+            header = {
+                "contract": self.chain.contract.address,
+                "block": self.block,
+                "layers": [{"capacity": layer.capacity, "errorRate": layer.error_rate, "count": layer.count}
+                           for layer in self.bloom.layers]
+            }
+            data = b"".join(bytes(layer.bits) for layer in self.bloom.layers)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(SNAPSHOT_MAGIC)
+            f.write(json.dumps(header).encode() + b"\n")
+            f.write(data)
+        os.replace(tmp, path)
+        self.snapshot_at = time.monotonic()
+
+@click.command("prefilter-snapshot")
+def prefilter_snapshot_command():
+    """Baut den Verify-Prefilter bis zum Chain-Head und schreibt den Snapshot."""
+    prefilter = current_app.extensions["chain"].prefilter
+    if not current_app.config["PREFILTER_SNAPSHOT_PATH"]:
+        raise click.UsageError("PREFILTER_SNAPSHOT_PATH ist nicht gesetzt")
+    prefilter.refresh()
+    prefilter.save_snapshot()
+    click.echo(f"{prefilter.bloom.count} Hashes bis Block {prefilter.block}, "
+               f"{prefilter.bloom.nbytes} Bytes")
@@ -0,0 +1,124 @@
+import cProfile
+import hmac
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from flask import current_app, g, request
+from flask_login import current_user
+
+from .web3utils import get_user_org_address
+
+class StackSampler:
+    """
+    Nimmt in einem Hintergrund-Thread alle interval Sekunden den Stack eines
+    Threads auf und zählt gleiche Stacks – Collapsed-Stack-Format für
+    flamegraph.pl bzw. speedscope. Anders als cProfile zählt so auch Zeit,
+    in der der Thread auf den Node oder die DB wartet.
+    """
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def write(self, path):
+        with open(path, "w") as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+def _triggered():
+    config = current_app.config
+    token = config["PROFILING_TOKEN"]
+    header = request.headers.get("X-Profile")
+    if token and header and hmac.compare_digest(header, token):
+        return "header"
+    if config["PROFILING_SAMPLE_RATE"] and random.random() < config["PROFILING_SAMPLE_RATE"]:
+        return "sample"
+    return None
+
+def _org_tag():
+    if not current_user.is_authenticated:
+        return "anonymous"
+    return (get_user_org_address(current_user) or "none").lower()
+
+def _route_tag():
+    rule = request.url_rule.rule if request.url_rule else "unmatched"
+    return re.sub(r"[^A-Za-z0-9]+", "_", rule).strip("_") or "root"
+
+def init_profiling(app):
+    """
+    Profilt einzelne Requests: mit Header X-Profile: <PROFILING_TOKEN> oder
+    zufällig mit Rate PROFILING_SAMPLE_RATE. Je Request landen in
+    PROFILING_DIR eine pstats-Datei (.prof, cProfile) und Collapsed Stacks
+    (.collapsed, StackSampler), benannt nach Zeitpunkt, Route und Org.
+    Erfasst wird nur der Request-Thread.
+    """
+    os.makedirs(app.config["PROFILING_DIR"], exist_ok=True)
+
+    @app.before_request
+    def _start_profile():
+        trigger = _triggered()
+        if not trigger:
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Ab Python 3.12 nur ein aktiver Profiler je Prozess
+            return
+        sampler = StackSampler(threading.get_ident(), app.config["PROFILING_SAMPLE_INTERVAL"])
+        sampler.start()
+        g.profile = (profiler, sampler, trigger, time.perf_counter())
+
+    @app.after_request
+    def _profile_status(response):
+        if "profile" in g:
+            g.profile_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def _finish_profile(exc):
+        profile = g.pop("profile", None)
+        if profile is None:
+            return
+        profiler, sampler, trigger, started = profile
+        profiler.disable()
+        sampler.stop()
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        route, org = _route_tag(), _org_tag()
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+        base = os.path.join(app.config["PROFILING_DIR"], f"{stamp}-{route}-{org}-{uuid.uuid4().hex[:8]}")
+        try:
+            profiler.dump_stats(f"{base}.prof")
+            sampler.write(f"{base}.collapsed")
+        except OSError as error:
+            app.logger.warning("Profil %s nicht geschrieben: %s", base, error)
+            return
+        app.logger.info("Profil %s (%s %s, Status %s, %.1f ms, %s)", base, request.method, request.path,
+                        g.pop("profile_status", 500 if exc else None), duration_ms, trigger)
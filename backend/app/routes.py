@@ -1,56 +1,439 @@
-from flask import Blueprint, request, jsonify
+import queue
+import time
+
+from flask import Blueprint, Response, request, jsonify, current_app, url_for
 from flask_login import login_required, current_user
-from .web3utils import w3, contract, default_sender_account, get_user_org_address
+from .web3utils import (get_chain, get_user_org_address,
+                        cached_call, batch_calls, invalidate_document,
+                        notarization_candidates)
+from .models import NotarizedDocument, AnchoredDocument, NotarizationJob
+from .indexer import sync_document_index
+from .stats import GRANULARITIES, get_org_stats, get_timeseries
+from .events import format_sse
+from .hashing import keccak_file
+from .jobs import create_job, track_receipt, refresh_job
+from .senders import NoSenderError
+from .anchoring import (submit_document, pending_count, schedule_flush,
+                        find_anchored, anchored_timestamp, anchored_timestamps, anchor_status)
 from web3 import Web3
+from web3.exceptions import ContractLogicError
+from hexbytes import HexBytes
+from sqlalchemy import and_, or_
+from . import db
 
 bp = Blueprint("notary", __name__)
 
+@bp.errorhandler(413)
+def upload_too_large(_):
+    return jsonify({"error": "Datei zu groß"}), 413
+
+ZERO32 = b'\x00' * 32
+
+# Revert-Gründe des Contracts (ASCII) → Fehlermeldungen der API
+_REVERT_MESSAGES = {
+    "Schon notariell hinterlegt": "Schon notariell hinterlegt",
+    "Dokument darf nicht geaendert werden": "Dokument darf nicht geändert werden",
+    "Nicht Org-Admin": "Nicht Org-Admin",
+    # NoSenderError: kein vom Node verwalteter Admin-Account der Org
+    "Keine Sender-Adresse für Org": "Keine Sender-Adresse für Org",
+}
+
+def revert_message(exc):
+    """Fehlermeldung für eine Transaktion, die laut eth_estimateGas revertieren würde."""
+    for reason, message in _REVERT_MESSAGES.items():
+        if reason in str(exc):
+            return message
+    return "Transaktion fehlgeschlagen"
+
+def anchored_originals(pairs):
+    """
+    Per Merkle-Root verankerte Dokumente kennt der Contract nicht einzeln →
+    dieselben Regeln gegen die lokale Tabelle prüfen (eine Query).
+    Liefert {id_hash_hex: document_hash_hex}.
+    """
+    return {
+        doc.id_hash: doc.document_hash
+        for doc in AnchoredDocument.query.filter(
+            AnchoredDocument.id_hash.in_([id_hash.hex() for id_hash, _ in pairs])
+        )
+    }
+
+def precheck_errors(pairs, originals, anchored):
+    """
+    Regeln des Contracts für (id_hash, doc_hash)-Paare anhand von originalHash
+    (je Paar) und anchored_originals(). Liefert je Paar die Fehlermeldung oder None.
+    """
+    errors = []
+    for (id_hash, doc_hash), orig_bytes in zip(pairs, originals):
+        if id_hash.hex() in anchored:
+            if anchored[id_hash.hex()] != doc_hash.hex():
+                errors.append("Dokument darf nicht geändert werden")
+            else:
+                errors.append("Schon notariell hinterlegt")
+            continue
+
+        # wenn orig_bytes nicht Null-Hash und nicht derselbe Hash → verboten
+        if orig_bytes != ZERO32 and orig_bytes != doc_hash:
+            errors.append("Dokument darf nicht geändert werden")
+            continue
+
+        # Derselbe Hash unter dieser ID → schon notarisiert
+        if orig_bytes == doc_hash:
+            errors.append("Schon notariell hinterlegt")
+            continue
+        errors.append(None)
+    return errors
+
+def _precheck_many(pairs):
+    """
+    Prüft wie der Contract, ob die (id_hash, doc_hash)-Paare notarisiert
+    werden dürfen. Liefert je Paar die Fehlermeldung oder None.
+    """
+    anchored = anchored_originals(pairs)
+    # originalHash für alle Paare in einem Round-Trip. Eine ID wird nur einmal
+    # notarisiert (Notary und NotaryV2): ist originalHash gesetzt, ist genau
+    # dieses Paar schon notarisiert – ein eigener timestamps-Call entfällt
+    originals = batch_calls([("originalHash", (id_hash,)) for id_hash, _ in pairs])
+    return precheck_errors(pairs, originals, anchored)
+
+def _precheck(id_hash, doc_hash):
+    return _precheck_many([(id_hash, doc_hash)])[0]
+
+def parse_hash(value):
+    """bytes32 aus "0x<64 hex>" oder None bei ungültiger Eingabe."""
+    try:
+        doc_hash = HexBytes(value)
+    except (TypeError, ValueError):
+        return None
+    return bytes(doc_hash) if len(doc_hash) == 32 else None
+
+# Gemeinsame Eingabeprüfung und Lookups für diese Routen und ihre async
+# Gegenstücke in aio.py (die nur das Lesen des Requests und die RPC-Calls
+# selbst erledigen)
+
+def notarize_upload_error(file, doc_id):
+    """Fehlermeldung für /notarize-Formulardaten oder None."""
+    if not file:
+        return "No file provided"
+    if not doc_id:
+        return "No documentId provided"
+    return None
+
+def notarize_hash_input(data):
+    """(doc_id, doc_hash, Fehlermeldung | None) aus dem JSON von /notarize/hash."""
+    doc_id = data.get("documentId")
+    if not doc_id or not isinstance(doc_id, str):
+        return None, None, "No documentId provided"
+    doc_hash = parse_hash(data.get("documentHash"))
+    if doc_hash is None:
+        return None, None, "Ungültiger Hash"
+    return doc_id, doc_hash, None
+
+def hash_list_items(data):
+    """
+    [(Eingabe, bytes32 | None), ...] aus dem JSON von /verify/batch oder
+    None, wenn keine Hash-Liste übergeben wurde.
+    """
+    raw = (data or {}).get("hashes")
+    if not isinstance(raw, list) or not raw:
+        return None
+    return [(value, parse_hash(value)) for value in raw]
+
+def batch_candidates(items):
+    """
+    Gültige Hashes eines Batches (ohne Duplikate) und die darunter, die laut
+    Prefilter notarisiert sein können – nur für sie ist fileTimestamps nötig.
+    """
+    valid = list(dict.fromkeys(doc_hash for _, doc_hash in items if doc_hash is not None))
+    return valid, notarization_candidates(valid)
+
+def batch_result(items, valid, candidate_stamps):
+    """
+    Antwort von /verify/batch aus den fileTimestamps der Kandidaten
+    ({doc_hash: ts}); nicht einzeln notarisierte Hashes werden gegen die
+    Merkle-Anker geprüft.
+    """
+    stamps = dict.fromkeys(valid, 0)
+    stamps.update(candidate_stamps)
+    missing = [h for h in valid if stamps[h] == 0]
+    anchored = anchored_timestamps(missing) if missing else {}
+
+    results = []
+    for label, doc_hash in items:
+        if doc_hash is None:
+            results.append({"input": label, "verified": False, "error": "Ungültiger Hash"})
+            continue
+        ts = stamps[doc_hash] or anchored.get(doc_hash.hex(), 0)
+        results.append({
+            "input":        label,
+            "documentHash": doc_hash.hex(),
+            "verified":     ts != 0,
+            "timestamp":    ts or None
+        })
+    return {
+        "total":    len(results),
+        "verified": sum(1 for r in results if r["verified"]),
+        "results":  results
+    }
+
+def anchored_result(doc, ts):
+    """Antwort von /verify für ein per Merkle-Root verankertes Dokument."""
+    status = anchor_status(doc)
+    return {
+        "verified":   True,
+        "timestamp":  ts,
+        "merkleRoot": status["merkleRoot"],
+        "proof":      status["proof"]
+    }
+
+def _paginate(query, serialize):
+    """
+    Cursor-Paginierung über (block_number, log_index) der Event-Index-Tabelle.
+    Liest ?limit= und ?cursor= und liefert ({items, nextCursor}, None) oder
+    (None, Fehlermeldung). nextCursor ist null auf der letzten Seite.
+    """
+    try:
+        limit = int(request.args.get("limit", current_app.config["DOCUMENTS_PAGE_SIZE"]))
+    except ValueError:
+        return None, "Ungültiges Limit"
+    if limit < 1:
+        return None, "Ungültiges Limit"
+    limit = min(limit, current_app.config["DOCUMENTS_MAX_PAGE_SIZE"])
+
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            block, log_index = (int(part) for part in cursor.split(":"))
+        except ValueError:
+            return None, "Ungültiger Cursor"
+        query = query.filter(or_(
+            NotarizedDocument.block_number > block,
+            and_(NotarizedDocument.block_number == block, NotarizedDocument.log_index > log_index)
+        ))
+
+    # Eine Zeile mehr laden, um zu wissen, ob es eine weitere Seite gibt
+    rows = (query
+            .order_by(NotarizedDocument.block_number, NotarizedDocument.log_index)
+            .limit(limit + 1)
+            .all())
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = f"{rows[-1].block_number}:{rows[-1].log_index}"
+    return {"items": [serialize(row) for row in rows], "nextCursor": next_cursor}, None
+
 @bp.route("/notarize", methods=["POST"])
 @login_required
 def notarize():
     file = request.files.get("file")
     doc_id = request.form.get("documentId")
-    if not file:
-        return jsonify({"error": "No file provided"}), 400
-    if not doc_id:
-        return jsonify({"error": "No documentId provided"}), 400
+    error = notarize_upload_error(file, doc_id)
+    if error:
+        return jsonify({"error": error}), 400
 
-    data = file.read()
-    # 1) Erzeuge den raw-Hash (bytes32)
-    doc_hash = w3.keccak(data)
+    # 1) Erzeuge den raw-Hash (bytes32) – blockweise aus dem Upload-Stream
+    doc_hash = keccak_file(file)
+    return _notarize_hash(doc_id, doc_hash)
 
+@bp.route("/notarize/hash", methods=["POST"])
+@login_required
+def notarize_hash():
+    """
+    Wie /notarize, aber mit im Client berechnetem Keccak-256-Hash statt
+    Datei-Upload: JSON {"documentId": "...", "documentHash": "0x<64 hex>"}.
+    """
+    doc_id, doc_hash, error = notarize_hash_input(request.get_json(silent=True) or {})
+    if error:
+        return jsonify({"error": error}), 400
+    return _notarize_hash(doc_id, doc_hash)
+
+def _notarize_hash(doc_id, doc_hash):
+    """Pre-Checks, Transaktion und Antwort für /notarize und /notarize/hash."""
     # 2) ID-Hash (bytes32)
-    id_hash = w3.keccak(text=doc_id)
-
-    # 3) Original-Hash aus dem Contract holen – rohes bytes32
-    orig_bytes = contract.functions.originalHash(id_hash).call()
-
-    # 4) Pre-Check: wenn orig_bytes nicht Null-Hash und nicht derselbe Hash → verboten
-    zero32 = b'\x00' * 32
-    if orig_bytes != zero32 and orig_bytes != doc_hash:
-        return jsonify({"error": "Dokument darf nicht geändert werden"}), 400
-
-    # 5) Key fürs Timestamp-Mapping bauen (wie im Contract)
-    key = w3.keccak(id_hash + doc_hash)
-    if contract.functions.timestamps(key).call() != 0:
-        return jsonify({"error": "Schon notariell hinterlegt"}), 400
-
-    # 6) Transaktion bauen und senden
-    nonce = w3.eth.get_transaction_count(default_sender_account)
-    tx = contract.functions.storeDocumentHash(id_hash, doc_hash).build_transaction({
-        "from": default_sender_account,
-        "nonce": nonce,
-        "gas": 200_000,
-        "gasPrice": w3.to_wei("1", "gwei"),
-    })
-    tx_hash = w3.eth.send_transaction(tx)
-    receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+    id_hash = Web3.keccak(text=doc_id)
+
+    # 3) + 4) + 5) Pre-Checks gegen originalHash
+    error = _precheck(id_hash, doc_hash)
+    if error:
+        return jsonify({"error": error}), 400
+
+    # 6) Transaktion bauen und senden (Absender + Nonce aus dem Sender-Pool,
+    #    Gaslimit per eth_estimateGas, EIP-1559-Gebühren aus dem FeeOracle)
+    chain = get_chain()
+    try:
+        tx_hash, _ = chain.sender_pool.send(
+            chain.contract.functions.storeDocumentHash(id_hash, doc_hash),
+            org_address=get_user_org_address(current_user)
+        )
+    except (ContractLogicError, NoSenderError) as exc:
+        # Zwischen Pre-Check und Senden notarisiert (oder keine Admin-Rechte)
+        return jsonify({"error": revert_message(exc)}), 400
+
+    # 7a) Job-Modus: sofort 202, den Receipt trägt der Tracker nach
+    if request.args.get("async", "").lower() in ("1", "true"):
+        job = create_job(current_user.organization_id, doc_id, id_hash, doc_hash, tx_hash)
+        track_receipt(current_app._get_current_object(), job.id, tx_hash)
+        return jsonify(job.to_dict()), 202, {"Location": url_for("notary.get_job", job_id=job.id)}
+
+    # 7b) Sonst synchron auf den Receipt warten
+    receipt = chain.w3.eth.wait_for_transaction_receipt(tx_hash)
+    if receipt.status == 1:
+        invalidate_document(id_hash, doc_hash)
 
     return jsonify({
         "txHash": receipt.transactionHash.hex(),
         "blockNumber": receipt.blockNumber
     }), 200
 
+@bp.route("/jobs/<string:job_id>", methods=["GET"])
+@login_required
+def get_job(job_id):
+    """
+    Status eines asynchronen Notarisierungs-Jobs (pending | confirmed | failed).
+    """
+    job = db.session.get(NotarizationJob, job_id)
+    if not job or job.organization_id != current_user.organization_id:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(refresh_job(job).to_dict()), 200
+
+@bp.route("/notarize/batch", methods=["POST"])
+@login_required
+def notarize_batch():
+    """
+    Notarisiert mehrere Dokumente auf einmal. Erwartet je Dokument ein Feld
+    `file` und ein Feld `documentId` (gleiche Reihenfolge). Die Pre-Checks
+    laufen vorab für alle Dokumente, gültige Dokumente werden in Chunks zu je
+    NOTARIZE_BATCH_CHUNK_SIZE per storeDocumentHashes gesendet.
+    """
+    files = request.files.getlist("file")
+    doc_ids = request.form.getlist("documentId")
+    if not files:
+        return jsonify({"error": "No file provided"}), 400
+    if len(files) != len(doc_ids) or not all(doc_ids):
+        return jsonify({"error": "Anzahl von file und documentId stimmt nicht überein"}), 400
+    if len(files) > current_app.config["NOTARIZE_BATCH_MAX_DOCUMENTS"]:
+        return jsonify({"error": "Zu viele Dokumente in einem Batch"}), 413
+
+    # 1) Hashes berechnen, Duplikate innerhalb des Batches aussortieren
+    results = []
+    candidates = []  # (Index in results, id_hash, doc_hash)
+    seen = {}        # id_hash → doc_hash innerhalb dieses Batches
+    for file, doc_id in zip(files, doc_ids):
+        doc_hash = keccak_file(file)
+        id_hash = Web3.keccak(text=doc_id)
+        results.append({"documentId": doc_id, "documentHash": doc_hash.hex()})
+
+        if id_hash in seen:
+            # Regeln des Contracts auch innerhalb des Batches einhalten
+            if seen[id_hash] != doc_hash:
+                results[-1]["error"] = "Dokument darf nicht geändert werden"
+            else:
+                results[-1]["error"] = "Schon notariell hinterlegt"
+            continue
+        seen[id_hash] = doc_hash
+        candidates.append((len(results) - 1, id_hash, doc_hash))
+
+    # Pre-Checks für alle Kandidaten in einem Durchlauf
+    errors = _precheck_many([(id_hash, doc_hash) for _, id_hash, doc_hash in candidates])
+    accepted = []
+    for candidate, error in zip(candidates, errors):
+        if error:
+            results[candidate[0]]["error"] = error
+        else:
+            accepted.append(candidate)
+
+    # 2) Gültige Dokumente in Chunks senden (der Sender-Pool verteilt die
+    #    Chunks auf die Admin-Accounts der Org und vergibt die Nonces) ...
+    chunk_size = current_app.config["NOTARIZE_BATCH_CHUNK_SIZE"]
+    chunks = [accepted[i:i + chunk_size] for i in range(0, len(accepted), chunk_size)]
+    org_addr = get_user_org_address(current_user)
+    chain = get_chain()
+    pending = []
+    for chunk in chunks:
+        try:
+            tx_hash, _ = chain.sender_pool.send(
+                chain.contract.functions.storeDocumentHashes(
+                    [id_hash for _, id_hash, _ in chunk],
+                    [doc_hash for _, _, doc_hash in chunk]
+                ),
+                org_address=org_addr
+            )
+        except (ContractLogicError, NoSenderError) as exc:
+            # Der Chunk würde revertieren → nicht senden, Fehler je Dokument
+            for idx, _, _ in chunk:
+                results[idx]["error"] = revert_message(exc)
+            continue
+        pending.append((chunk, tx_hash))
+
+    # 3) ... und erst danach auf die Receipts warten
+    for chunk, tx_hash in pending:
+        receipt = chain.w3.eth.wait_for_transaction_receipt(tx_hash)
+        for idx, id_hash, doc_hash in chunk:
+            if receipt.status != 1:
+                results[idx]["error"] = "Transaktion fehlgeschlagen"
+                continue
+            invalidate_document(id_hash, doc_hash)
+            results[idx]["txHash"] = receipt.transactionHash.hex()
+            results[idx]["blockNumber"] = receipt.blockNumber
+
+    for result in results:
+        result["status"] = "error" if "error" in result else "notarized"
+
+    return jsonify({
+        "notarized": sum(1 for r in results if r["status"] == "notarized"),
+        "failed":    sum(1 for r in results if r["status"] == "error"),
+        "results":   results
+    }), 200
+
+@bp.route("/anchor", methods=["POST"])
+@login_required
+def anchor():
+    """
+    Reicht ein Dokument für die Merkle-Verankerung ein. Es wird mit den
+    übrigen Dokumenten des aktuellen Fensters in einer Root verankert
+    (ANCHOR_BATCH_MAX_SIZE Dokumente oder ANCHOR_WINDOW_SECONDS Sekunden).
+    """
+    file = request.files.get("file")
+    doc_id = request.form.get("documentId")
+    error = notarize_upload_error(file, doc_id)
+    if error:
+        return jsonify({"error": error}), 400
+
+    doc_hash = keccak_file(file)
+    id_hash = Web3.keccak(text=doc_id)
+
+    # Dieselben Regeln wie bei /notarize
+    error = _precheck(id_hash, doc_hash)
+    if error:
+        return jsonify({"error": error}), 400
+
+    org_addr = get_user_org_address(current_user).lower()
+    doc, error = submit_document(id_hash, doc_hash, org_addr)
+    if error:
+        return jsonify({"error": error}), 400
+
+    # Zählfenster voll → Timer-Thread verankert sofort (der Request wartet
+    # nicht auf den Receipt), sonst schließt er das Zeitfenster
+    app = current_app._get_current_object()
+    if pending_count(org_addr) >= current_app.config["ANCHOR_BATCH_MAX_SIZE"]:
+        schedule_flush(app, delay=0)
+    else:
+        schedule_flush(app)
+
+    return jsonify({"documentId": doc_id, **anchor_status(doc)}), 202
+
+@bp.route("/anchor/<string:documentId>", methods=["GET"])
+@login_required
+def anchor_proof(documentId):
+    """
+    Liefert Status, Merkle-Root und Inclusion-Proof eines verankerten Dokuments.
+    """
+    org_addr = get_user_org_address(current_user).lower()
+    doc = AnchoredDocument.query.filter_by(id_hash=Web3.keccak(text=documentId).hex()).first()
+    if not doc or doc.org_address != org_addr:
+        return jsonify({"error": "Nicht berechtigt"}), 403
+    return jsonify({"documentId": documentId, **anchor_status(doc)}), 200
+
 @bp.route("/verify", methods=["POST"])
 @login_required
 def verify():
@@ -58,38 +441,68 @@ def verify():
     if not file:
         return jsonify({"error": "No file provided"}), 400
 
-    data = file.read()
-    doc_hash = w3.keccak(data)
+    doc_hash = keccak_file(file)
 
-    # Prüfe globalen Dateihash (neues Mapping fileTimestamps)
-    ts = contract.functions.fileTimestamps(doc_hash).call()
-    if ts == 0:
-        return jsonify({"verified": False}), 404
+    # Prüfe globalen Dateihash (neues Mapping fileTimestamps) – nicht im
+    # Prefilter → sicher nie einzeln notarisiert, kein eth_call nötig
+    ts = cached_call("fileTimestamps", doc_hash) if notarization_candidates([doc_hash]) else 0
+    if ts != 0:
+        return jsonify({"verified": True, "timestamp": ts}), 200
 
-    return jsonify({"verified": True, "timestamp": ts}), 200
+    # Sonst: per Merkle-Root verankert? Proof wird on-chain gegen die Root geprüft
+    anchored = find_anchored(doc_hash)
+    if anchored:
+        ts = anchored_timestamp(anchored)
+        if ts != 0:
+            return jsonify(anchored_result(anchored, ts)), 200
+
+    return jsonify({"verified": False}), 404
+
+@bp.route("/verify/batch", methods=["POST"])
+@login_required
+def verify_batch():
+    """
+    Prüft viele Dokumente auf einmal: entweder mehrere Dateien (Form-Feld
+    `file`, mehrfach) oder JSON {"hashes": ["<keccak256 hex>", ...]}.
+    Alle fileTimestamps-Lookups laufen gebündelt über JSON-RPC-Batches.
+    """
+    # 1) Eingabe lesen: vorberechnete Hashes oder Dateien
+    if request.is_json:
+        items = hash_list_items(request.get_json(silent=True))
+        if items is None:
+            return jsonify({"error": "No hashes provided"}), 400
+    else:
+        files = request.files.getlist("file")
+        if not files:
+            return jsonify({"error": "No file provided"}), 400
+        items = [(file.filename, keccak_file(file)) for file in files]
+
+    if len(items) > current_app.config["VERIFY_BATCH_MAX_ITEMS"]:
+        return jsonify({"error": "Zu viele Dokumente in einem Batch"}), 413
+
+    # 2) fileTimestamps für alle gültigen Hashes, die laut Prefilter notarisiert
+    #    sein können (Cache + Batch-RPC); die übrigen sind sicher 0
+    valid, candidates = batch_candidates(items)
+    stamps = batch_calls([("fileTimestamps", (h,)) for h in candidates])
+
+    # 3) Nicht einzeln notarisierte Hashes gegen Merkle-Anker prüfen
+    return jsonify(batch_result(items, valid, dict(zip(candidates, stamps)))), 200
 
 @bp.route("/documents", methods=["GET"])
 @login_required
 def list_documents():
     """
-    Listet alle Dokumente auf, die zur Organisation des aktuellen Nutzers gehören.
+    Listet die Dokumente der Organisation des aktuellen Nutzers seitenweise
+    auf (?limit=, ?cursor= aus nextCursor der vorigen Seite).
     """
     org_addr = get_user_org_address(current_user).lower()
-    events = contract.events.DocumentNotarized.create_filter(from_block=0).get_all_entries()
+    sync_document_index(current_app.config["INDEX_INLINE_MAX_CHUNKS"])
 
-    docs = []
-    for ev in events:
-        owner = contract.functions.getDocOrg(ev.args.idHash).call()
-        if owner.lower() != org_addr:
-            continue
-        docs.append({
-            "idHash":       ev.args.idHash.hex(),
-            "documentHash": ev.args.documentHash.hex(),
-            "timestamp":    ev.args.timestamp,
-            "txHash":       ev.transactionHash.hex(),
-            "blockNumber":  ev.blockNumber
-        })
-    return jsonify(docs), 200
+    page, error = _paginate(NotarizedDocument.query.filter_by(org_address=org_addr),
+                            NotarizedDocument.to_dict)
+    if error:
+        return jsonify({"error": error}), 400
+    return jsonify(page), 200
 
 @bp.route("/documents/<string:documentId>", methods=["GET"])
 @login_required
@@ -98,30 +511,20 @@ def get_document(documentId):
     Gibt Details zu einem einzelnen Dokument zurück, wenn es zur Organisation gehört.
     """
     org_addr = get_user_org_address(current_user).lower()
-    id_hash = w3.keccak(text=documentId)
+    id_hash = Web3.keccak(text=documentId)
+    sync_document_index(current_app.config["INDEX_INLINE_MAX_CHUNKS"])
 
-    # Prüfe, ob die Org dieses Dokument hält
-    owner = contract.functions.getDocOrg(id_hash).call()
-    if owner.lower() != org_addr:
+    # Erste Notarisierung dieser ID; deren Org hält das Dokument
+    row = (NotarizedDocument.query
+           .filter_by(id_hash=id_hash.hex())
+           .order_by(NotarizedDocument.block_number, NotarizedDocument.log_index)
+           .first())
+    if not row:
+        return jsonify({"error": "Dokument nicht gefunden"}), 404
+    if row.org_address != org_addr:
         return jsonify({"error": "Nicht berechtigt"}), 403
 
-    entries = contract.events.DocumentNotarized.create_filter(
-        from_block=0,
-        argument_filters={"idHash": id_hash}
-    ).get_all_entries()
-
-    if not entries:
-        return jsonify({"error": "Document not found"}), 404
-
-    ev = entries[0]
-    return jsonify({
-        "documentId":    documentId,
-        "idHash":        ev.args.idHash.hex(),
-        "documentHash":  ev.args.documentHash.hex(),
-        "timestamp":     ev.args.timestamp,
-        "txHash":        ev.transactionHash.hex(),
-        "blockNumber":   ev.blockNumber
-    }), 200
+    return jsonify({"documentId": documentId, **row.to_dict()}), 200
 
 @bp.route("/stats", methods=["GET"])
 @login_required
@@ -132,31 +535,79 @@ def stats():
       - latestNotarization { documentHash, timestamp }
     """
     org_addr = get_user_org_address(current_user).lower()
-    events = contract.events.DocumentNotarized.create_filter(from_block=0).get_all_entries()
-    own = [
-        e for e in events
-        if contract.functions.getDocOrg(e.args.idHash).call().lower() == org_addr
-    ]
-
-    total = len(own)
-    latest = None
-    if own:
-        ev = max(own, key=lambda e: e.args.timestamp)
-        latest = {
-            "documentHash": ev.args.documentHash.hex(),
-            "timestamp":    ev.args.timestamp
-        }
+    sync_document_index(current_app.config["INDEX_INLINE_MAX_CHUNKS"])
+    return jsonify(get_org_stats(org_addr)), 200
 
+@bp.route("/events", methods=["GET"])
+@login_required
+def events():
+    """
+    Server-Sent Events für die eigene Organisation, statt /stats bzw. die
+    History zu pollen:
+      - event: document  → neu beobachtetes DocumentNotarized (wie /documents)
+      - event: job       → asynchroner Job bestätigt/fehlgeschlagen (wie /jobs/<id>)
+    Alle Clients eines Prozesses teilen sich einen Chain-Follower.
+    """
+    hub = current_app.extensions["event_hub"]
+    sub = hub.subscribe(get_user_org_address(current_user), current_user.organization_id)
+    if sub is None:
+        return jsonify({"error": "Zu viele verbundene Clients"}), 503
+    keepalive = current_app.config["SSE_KEEPALIVE_SECONDS"]
+
+    def stream():
+        try:
+            # Sofort etwas senden, damit Proxies/Browser die Verbindung als offen sehen
+            yield "retry: 3000\n\n"
+            while not sub.overflowed:
+                try:
+                    event, data = sub.queue.get(timeout=keepalive)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(event, data)
+        finally:
+            hub.unsubscribe(sub)
+
+    return Response(stream(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
+@bp.route("/stats/timeseries", methods=["GET"])
+@login_required
+def stats_timeseries():
+    """
+    Notarisierungen der eigenen Organisation je Stunde/Tag:
+      ?granularity=hour|day (Standard day), ?from= / ?to= als Unix-Zeit
+      (Standard: die letzten STATS_TIMESERIES_DEFAULT_BUCKETS Buckets)
+    """
+    granularity = request.args.get("granularity", "day")
+    if granularity not in GRANULARITIES:
+        return jsonify({"error": "Ungültige Granularität"}), 400
+    size = GRANULARITIES[granularity]
+    try:
+        end = int(request.args.get("to", time.time()))
+        start = int(request.args.get("from", end - size * current_app.config["STATS_TIMESERIES_DEFAULT_BUCKETS"]))
+    except ValueError:
+        return jsonify({"error": "Ungültiger Zeitraum"}), 400
+    if start >= end:
+        return jsonify({"error": "Ungültiger Zeitraum"}), 400
+    if (end - start) // size > current_app.config["STATS_TIMESERIES_MAX_BUCKETS"]:
+        return jsonify({"error": "Zeitraum zu groß"}), 400
+
+    org_addr = get_user_org_address(current_user).lower()
+    sync_document_index(current_app.config["INDEX_INLINE_MAX_CHUNKS"])
     return jsonify({
-        "totalNotarizations": total,
-        "latestNotarization": latest
+        "granularity": granularity,
+        "buckets":     get_timeseries(org_addr, granularity, start, end)
     }), 200
 
 @bp.route("/documents/<string:documentId>/history", methods=["GET"])
 @login_required
 def document_history(documentId):
     """
-    Liefert die komplette Historie der Notarisierungen für eine documentId:
+    Liefert die Historie der Notarisierungen für eine documentId seitenweise
+    (?limit=, ?cursor=), je Eintrag:
       - documentHash
       - timestamp
       - txHash
@@ -164,28 +615,24 @@ def document_history(documentId):
     """
     # 1) Organisations-Check
     org_addr = get_user_org_address(current_user).lower()
-    id_hash  = w3.keccak(text=documentId)
+    id_hash  = Web3.keccak(text=documentId)
 
-    # 2) Prüfe, ob die Org dieses Dokument hält
-    owner = contract.functions.getDocOrg(id_hash).call()
-    if owner.lower() != org_addr:
-        return jsonify({"error": "Nicht berechtigt"}), 403
+    # 2) Index aktualisieren
+    sync_document_index(current_app.config["INDEX_INLINE_MAX_CHUNKS"])
+    entries = NotarizedDocument.query.filter_by(id_hash=id_hash.hex())
 
-    # 3) Alle DocumentNotarized-Events für diese ID abholen
-    events = contract.events.DocumentNotarized.create_filter(
-        from_block=0,
-        argument_filters={"idHash": id_hash}
-    ).get_all_entries()
-
-    # 4) Eine Liste von History-Einträgen zusammenstellen
-    history = []
-    for ev in events:
-        history.append({
-            "documentHash": ev.args.documentHash.hex(),
-            "timestamp":    ev.args.timestamp,
-            "txHash":       ev.transactionHash.hex(),
-            "blockNumber":  ev.blockNumber
-        })
-
-    return jsonify(history), 200
+    # 3) Prüfe, ob die Org dieses Dokument hält (Org der Erst-Notarisierung)
+    first = entries.order_by(NotarizedDocument.block_number, NotarizedDocument.log_index).first()
+    if not first or first.org_address != org_addr:
+        return jsonify({"error": "Nicht berechtigt"}), 403
 
+    # 4) Eine Seite von History-Einträgen zusammenstellen
+    page, error = _paginate(entries, lambda row: {
+        "documentHash": row.document_hash,
+        "timestamp":    row.timestamp,
+        "txHash":       row.tx_hash,
+        "blockNumber":  row.block_number
+    })
+    if error:
+        return jsonify({"error": error}), 400
+    return jsonify(page), 200
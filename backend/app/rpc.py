@@ -0,0 +1,406 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+import aiohttp
+import requests
+from urllib3.exceptions import ConnectTimeoutError
+from web3 import AsyncHTTPProvider, HTTPProvider
+from web3.providers import JSONBaseProvider
+from web3.providers.async_base import AsyncJSONBaseProvider
+
+from .metrics import RPC_ENDPOINT_HEALTHY, RPC_ENDPOINT_LATENCY, RPC_FAILOVERS, RPC_HEDGED_REQUESTS
+
+# Verbindungsfehler/Timeouts → nächster Node. JSON-RPC-Fehler (z. B. Reverts)
+# sind gültige Antworten und werden nicht wiederholt
+TRANSPORT_ERRORS = (OSError, aiohttp.ClientError)
+
+# Methoden, die vom Zustand eines bestimmten Nodes abhängen (Mempool, Nonces,
+# vom Node verwaltete Accounts): immer an denselben Node, Failover der Reihe nach
+STICKY_METHODS = {
+    "eth_sendTransaction", "eth_sendRawTransaction", "eth_getTransactionCount", "eth_accounts",
+    "eth_newFilter", "eth_getFilterChanges", "eth_uninstallFilter"
+}
+
+# Schreibende Methoden: eth_sendTransaction signiert der Node mit eigenem Account,
+# ein zweiter Node würde dieselbe Überweisung erneut senden. Failover daher nur,
+# wenn der Verbindungsaufbau gescheitert ist (siehe _unsent)
+WRITE_METHODS = {"eth_sendTransaction", "eth_sendRawTransaction"}
+
+# Hedging erst, wenn für den Node genug Latenz-Samples vorliegen
+_MIN_HEDGE_SAMPLES = 20
+
+def redact_url(url):
+    """scheme://host[:port] einer RPC-URL – Pfad, Query und Zugangsdaten tragen oft API-Keys."""
+    parts = urlsplit(url)
+    if not parts.hostname:
+        return "redacted"
+    try:
+        port = f":{parts.port}" if parts.port else ""
+    except ValueError:
+        port = ""
+    return f"{parts.scheme}://{parts.hostname}{port}"
+
+def _unsent(exc):
+    """True, wenn der Request den Node nachweislich nicht erreicht hat (Verbindungsaufbau gescheitert)."""
+    if isinstance(exc, aiohttp.ClientConnectorError):
+        return True
+    if isinstance(exc, requests.ConnectionError) and exc.args:
+        # requests verpackt urllib3s MaxRetryError; NewConnectionError ist ein ConnectTimeoutError
+        return isinstance(getattr(exc.args[0], "reason", None), ConnectTimeoutError)
+    return False
+
+class Endpoint:
+    """Ein RPC-Node: gemessene Latenz (EWMA + letzte Samples) und Zustand."""
+    def __init__(self, url, alpha, label, max_samples=200):
+        self.url = url
+        self.label = label  # für Metriken und Logs, ohne API-Keys
+        self.alpha = alpha
+        self.ewma = 0.0  # noch ungemessene Nodes werden zuerst gewählt
+        self.samples = deque(maxlen=max_samples)
+        self.healthy = True
+        self.block_number = None
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            self.ewma = seconds if not self.samples else self.alpha * seconds + (1 - self.alpha) * self.ewma
+            self.samples.append(seconds)
+
+    def quantile(self, q):
+        with self._lock:
+            samples = sorted(self.samples)
+        return samples[int(q * (len(samples) - 1))] if samples else None
+
+class EndpointSet:
+    """
+    Routing über mehrere RPC-Nodes, gemeinsam für den synchronen und den
+    async Provider:
+
+    - Reads an den gesunden Node mit der kleinsten EWMA-Latenz; antwortet er
+      nicht innerhalb seines hedge_quantile-Latenz-Quantils, geht derselbe
+      Request zusätzlich an den nächstbesten (die erste Antwort gewinnt).
+    - Nach einem beobachteten Receipt (min_block) kommen für Reads nur Nodes
+      in Frage, die diesen Block schon kennen – sonst liefert ein
+      nachhängender Node nach dem eigenen Write noch den alten Zustand.
+      Nachhängende Nodes bleiben Reserve für Verbindungsfehler, nie Hedge-Ziel.
+    - STICKY_METHODS an den ersten gesunden Node in Konfigurationsreihenfolge.
+    - Ein Verbindungsfehler markiert den Node als ungesund; erst die nächste
+      Health-Probe (eth_blockNumber) nimmt ihn wieder auf. Nodes, die mehr als
+      max_block_lag Blöcke hinter dem höchsten zurückliegen, gelten ebenfalls
+      als ungesund.
+    """
+    def __init__(self, urls, alpha=0.2, hedge_quantile=0.95, hedge_min_delay=0.05, max_block_lag=5):
+        # Index im Label: eindeutig, auch wenn zwei URLs nur der API-Key unterscheidet
+        self.endpoints = [Endpoint(url, alpha, f"{i}:{redact_url(url)}") for i, url in enumerate(urls)]
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_delay = hedge_min_delay
+        self.max_block_lag = max_block_lag
+        self.min_block = 0  # höchster Block eines beobachteten Receipts
+        self._lock = threading.Lock()
+
+    def __iter__(self):
+        return iter(self.endpoints)
+
+    def is_current(self, endpoint):
+        return (endpoint.block_number or 0) >= self.min_block
+
+    def ranked(self):
+        """
+        Nodes für Reads und wie viele davon gehedgt werden dürfen: gesunde
+        aktuelle nach Latenz, dann nachhängende und ungesunde als Reserve.
+        Kennt kein gesunder Node min_block (z. B. Reorg), zählen alle gesunden.
+        """
+        by_latency = lambda e: e.ewma
+        healthy = sorted((e for e in self.endpoints if e.healthy), key=by_latency)
+        current = [e for e in healthy if self.is_current(e)] or healthy
+        rest = ([e for e in healthy if e not in current]
+                + sorted((e for e in self.endpoints if not e.healthy), key=by_latency))
+        return current + rest, len(current)
+
+    def sticky(self):
+        """Nodes für STICKY_METHODS: Konfigurationsreihenfolge, gesunde zuerst."""
+        return ([e for e in self.endpoints if e.healthy]
+                + [e for e in self.endpoints if not e.healthy])
+
+    def hedge_delay(self, endpoint):
+        """Wartezeit bis zum Hedge-Request oder None (noch zu wenige Samples)."""
+        if len(endpoint.samples) < _MIN_HEDGE_SAMPLES:
+            return None
+        return max(self.hedge_min_delay, endpoint.quantile(self.hedge_quantile))
+
+    def mark_failed(self, endpoint):
+        endpoint.healthy = False
+        RPC_ENDPOINT_HEALTHY.labels(endpoint.label).set(0)
+
+    def observe_response(self, endpoint, method, response):
+        """Blocknummern aus Antworten: Receipts heben min_block, eth_blockNumber den Stand des Nodes."""
+        result = response.get("result") if isinstance(response, dict) else None
+        if method == "eth_getTransactionReceipt" and isinstance(result, dict) and result.get("blockNumber"):
+            block = int(result["blockNumber"], 16)
+        elif method == "eth_blockNumber" and isinstance(result, str):
+            block = int(result, 16)
+        else:
+            return
+        with self._lock:
+            endpoint.block_number = max(endpoint.block_number or 0, block)
+            if method == "eth_getTransactionReceipt":
+                self.min_block = max(self.min_block, block)
+
+    def update_health(self, block_numbers):
+        """Ergebnis einer Probe-Runde: {Endpoint: Blocknummer oder None}."""
+        heads = [n for n in block_numbers.values() if n is not None]
+        head = max(heads) if heads else None
+        for endpoint, number in block_numbers.items():
+            if number is not None:
+                endpoint.block_number = number
+            endpoint.healthy = number is not None and head - number <= self.max_block_lag
+            RPC_ENDPOINT_HEALTHY.labels(endpoint.label).set(int(endpoint.healthy))
+            RPC_ENDPOINT_LATENCY.labels(endpoint.label).set(endpoint.ewma)
+
+class MultiEndpointProvider(JSONBaseProvider):
+    """
+    Web3-Provider über mehrere HTTP-Nodes (Routing siehe EndpointSet). Die
+    Health-Probes laufen in einem Hintergrund-Thread, der mit dem ersten
+    Request startet. Gleichzeitig laufende Hedge-Requests sind auf
+    max_hedges begrenzt, damit verlorene Requests den Pool nicht füllen.
+    """
+    def __init__(self, urls, session_factory=None, request_kwargs=None, health_interval=5.0,
+                 health_timeout=2.0, max_workers=32, max_hedges=None, **routing):
+        super().__init__()
+        self.endpoints = EndpointSet(urls, **routing)
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self._providers = {
+            url: HTTPProvider(url, request_kwargs=request_kwargs,
+                              session=session_factory() if session_factory else None,
+                              # Wiederholen übernimmt das Failover auf den nächsten Node
+                              exception_retry_configuration=None)
+            for url in urls
+        }
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rpc-hedge")
+        self._hedge_slots = threading.BoundedSemaphore(max_hedges or max(1, max_workers // 4))
+        self._probe_thread = None
+        self._probe_lock = threading.Lock()
+
+    def __str__(self):
+        return f"MultiEndpointProvider({', '.join(e.label for e in self.endpoints)})"
+
+    def make_request(self, method, params):
+        self._start_probes()
+        call = lambda provider: provider.make_request(method, params)
+        if method in STICKY_METHODS:
+            return self._failover(call, method)
+        return self._hedged(call, method)
+
+    def make_batch_request(self, requests):
+        self._start_probes()
+        # Batches enthalten nur eth_calls (ChainClient.batch_calls)
+        return self._hedged(lambda provider: provider.make_batch_request(requests))
+
+    def _timed(self, endpoint, call, method=None):
+        started = time.perf_counter()
+        try:
+            response = call(self._providers[endpoint.url])
+        except TRANSPORT_ERRORS:
+            endpoint.observe(time.perf_counter() - started)
+            self.endpoints.mark_failed(endpoint)
+            raise
+        endpoint.observe(time.perf_counter() - started)
+        self.endpoints.observe_response(endpoint, method, response)
+        return response
+
+    def _failover(self, call, method):
+        last_error = None
+        for endpoint in self.endpoints.sticky():
+            if last_error is not None:
+                RPC_FAILOVERS.inc()
+            try:
+                return self._timed(endpoint, call, method)
+            except TRANSPORT_ERRORS as exc:
+                # Timeout nach dem Senden: der Node hat die Transaktion evtl.
+                # schon angenommen → nicht an einen zweiten Node schicken
+                if method in WRITE_METHODS and not _unsent(exc):
+                    raise
+                last_error = exc
+        raise last_error
+
+    def _hedged(self, call, method=None):
+        ranked, hedgeable = self.endpoints.ranked()
+        if len(ranked) == 1:
+            return self._timed(ranked[0], call, method)
+
+        candidates = iter(ranked)
+        pending = set()
+        launched = 0
+
+        def launch(hedge=False):
+            nonlocal launched
+            endpoint = next(candidates, None)
+            if endpoint is not None:
+                launched += 1
+                future = self._executor.submit(self._timed, endpoint, call, method)
+                if hedge:
+                    future.add_done_callback(lambda _: self._hedge_slots.release())
+                pending.add(future)
+            return endpoint is not None
+
+        launch()
+        delay = self.endpoints.hedge_delay(ranked[0])
+        last_error = None
+        try:
+            while pending:
+                done, _ = wait(pending, timeout=delay, return_when=FIRST_COMPLETED)
+                if not done:
+                    # Langsamer als sonst → zusätzlich an den nächsten aktuellen
+                    # Node, solange ein Hedge-Slot frei ist; die verlorene Anfrage
+                    # läuft im Hintergrund zu Ende (Latenz-Sample)
+                    delay = None
+                    if launched < hedgeable and self._hedge_slots.acquire(blocking=False):
+                        launch(hedge=True)
+                        RPC_HEDGED_REQUESTS.inc()
+                    continue
+                for future in done:
+                    pending.discard(future)
+                    try:
+                        return future.result()
+                    except TRANSPORT_ERRORS as exc:
+                        last_error = exc
+                if not pending and launch():
+                    RPC_FAILOVERS.inc()
+            raise last_error
+        finally:
+            # Noch nicht gestartete Requests verwerfen
+            for future in pending:
+                future.cancel()
+
+    def _start_probes(self):
+        if self._probe_thread is None:
+            with self._probe_lock:
+                if self._probe_thread is None:
+                    self._probe_thread = threading.Thread(target=self._probe_loop, name="rpc-health",
+                                                          daemon=True)
+                    self._probe_thread.start()
+
+    def _probe_loop(self):
+        while True:
+            time.sleep(self.health_interval)
+            self.probe()
+
+    def probe(self):
+        """Eine Probe-Runde: eth_blockNumber an alle Nodes parallel."""
+        futures = {
+            self._executor.submit(self._timed, endpoint,
+                                  lambda provider: provider.make_request("eth_blockNumber", [])): endpoint
+            for endpoint in self.endpoints
+        }
+        wait(futures, timeout=self.health_timeout)
+        block_numbers = {}
+        for future, endpoint in futures.items():
+            try:
+                block_numbers[endpoint] = int(future.result(timeout=0)["result"], 16)
+            except Exception:
+                # Timeout, Verbindungsfehler oder JSON-RPC-Fehler
+                block_numbers[endpoint] = None
+        self.endpoints.update_health(block_numbers)
+
+class AsyncMultiEndpointProvider(AsyncJSONBaseProvider):
+    """
+    AsyncWeb3-Gegenstück (ASGI-Modus) mit demselben EndpointSet: Latenzen
+    und Zustand teilen sich beide Provider, die Probes laufen im synchronen.
+    """
+    def __init__(self, endpoints, request_kwargs=None):
+        super().__init__()
+        self.endpoints = endpoints
+        self._providers = {
+            endpoint.url: AsyncHTTPProvider(endpoint.url, request_kwargs=request_kwargs,
+                                            exception_retry_configuration=None)
+            for endpoint in endpoints
+        }
+
+    async def cache_async_session(self, session):
+        for provider in self._providers.values():
+            await provider.cache_async_session(session)
+
+    async def make_request(self, method, params):
+        call = lambda provider: provider.make_request(method, params)
+        if method in STICKY_METHODS:
+            return await self._failover(call, method)
+        return await self._hedged(call, method)
+
+    async def make_batch_request(self, requests):
+        return await self._hedged(lambda provider: provider.make_batch_request(requests))
+
+    async def _timed(self, endpoint, call, method=None):
+        started = time.perf_counter()
+        try:
+            response = await call(self._providers[endpoint.url])
+        except TRANSPORT_ERRORS:
+            endpoint.observe(time.perf_counter() - started)
+            self.endpoints.mark_failed(endpoint)
+            raise
+        except asyncio.CancelledError:
+            # Verlorener Hedge: die Wartezeit bis hierher ist eine Untergrenze der Latenz
+            endpoint.observe(time.perf_counter() - started)
+            raise
+        endpoint.observe(time.perf_counter() - started)
+        self.endpoints.observe_response(endpoint, method, response)
+        return response
+
+    async def _failover(self, call, method):
+        last_error = None
+        for endpoint in self.endpoints.sticky():
+            if last_error is not None:
+                RPC_FAILOVERS.inc()
+            try:
+                return await self._timed(endpoint, call, method)
+            except TRANSPORT_ERRORS as exc:
+                if method in WRITE_METHODS and not _unsent(exc):
+                    raise
+                last_error = exc
+        raise last_error
+
+    async def _hedged(self, call, method=None):
+        ranked, hedgeable = self.endpoints.ranked()
+        if len(ranked) == 1:
+            return await self._timed(ranked[0], call, method)
+
+        candidates = iter(ranked)
+        pending = set()
+        launched = 0
+
+        def launch():
+            nonlocal launched
+            endpoint = next(candidates, None)
+            if endpoint is not None:
+                launched += 1
+                pending.add(asyncio.ensure_future(self._timed(endpoint, call, method)))
+            return endpoint is not None
+
+        launch()
+        delay = self.endpoints.hedge_delay(ranked[0])
+        last_error = None
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    delay = None
+                    if launched < hedgeable and launch():
+                        RPC_HEDGED_REQUESTS.inc()
+                    continue
+                for task in done:
+                    pending.discard(task)
+                    try:
+                        return task.result()
+                    except TRANSPORT_ERRORS as exc:
+                        last_error = exc
+                if not pending and launch():
+                    RPC_FAILOVERS.inc()
+            raise last_error
+        finally:
+            # Verlorene Requests abbrechen statt bis zum Timeout weiterlaufen lassen
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,261 @@
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.exceptions import Web3RPCError
+
+from .fees import FeeOracle
+
+logger = logging.getLogger(__name__)
+
+# Fehlertexte der Nodes (Hardhat/Geth), nach denen der lokale Zähler
+# nicht mehr zum Node passt
+_NONCE_ERRORS = ("nonce too low", "nonce too high", "invalid nonce", "already known",
+                 "replacement transaction underpriced")
+
+def _is_nonce_error(exc):
+    return any(msg in str(exc).lower() for msg in _NONCE_ERRORS)
+
+# Gebühr unter der aktuellen Base-Fee bzw. dem Mindestpreis des Nodes
+_FEE_ERRORS = ("less than block base fee", "transaction underpriced", "fee too low",
+               "max fee per gas less than")
+
+def _is_fee_error(exc):
+    return any(msg in str(exc).lower() for msg in _FEE_ERRORS)
+
+_FEE_FIELDS = ("gasPrice", "maxFeePerGas", "maxPriorityFeePerGas")
+
+# So viele Ersetzungen (alter → neuer Tx-Hash) merkt sich der SenderPool
+_MAX_REPLACEMENTS = 10_000
+
+class NoSenderError(Exception):
+    """Kein vom Node verwalteter Account ist Admin der Org."""
+    def __init__(self, org_address):
+        super().__init__(f"Keine Sender-Adresse für Org {org_address}")
+
+class NonceManager:
+    """
+    Thread-sicherer lokaler Nonce-Zähler für einen Account. Vergibt Nonces
+    ohne RPC-Call und gleicht sich nur bei Fehlern oder hängenden
+    Transaktionen wieder mit dem Node ab.
+    """
+    def __init__(self, w3, address, stuck_timeout, on_replace=None):
+        self.w3 = w3
+        self.address = address
+        self.stuck_timeout = stuck_timeout
+        self.on_replace = on_replace  # (alter Tx-Hash, neuer Tx-Hash), außerhalb des Locks
+        self._lock = threading.Lock()
+        self._next = None
+        self._stale = False    # neu vom Node lesen, sobald keine Reservierung mehr offen ist
+        self._reserved = set()  # vergebene, noch nicht gesendete Nonces
+        self._in_flight = {}  # nonce → (tx, tx_hash, sent_at)
+
+    def reserve(self):
+        with self._lock:
+            if self._next is None or (self._stale and not self._reserved):
+                # "pending" zählt gesendete, noch nicht geminte Transaktionen mit;
+                # eine Lücke (gescheiterte Nonce) wird so als nächstes gefüllt.
+                # Hinter einer Lücke wartende Transaktionen zählt der Node nicht mit
+                self._next = self.w3.eth.get_transaction_count(self.address, "pending")
+                self._stale = False
+            while self._next in self._in_flight:
+                self._next += 1
+            nonce = self._next
+            self._next += 1
+            self._reserved.add(nonce)
+            return nonce
+
+    def resync(self, nonce):
+        """
+        nonce wurde nicht (erfolgreich) gesendet: Zähler neu vom Node lesen –
+        erst wenn keine andere Reservierung mehr offen ist, sonst vergäbe der
+        Node-Stand deren Nonces ein zweites Mal.
+        """
+        with self._lock:
+            self._reserved.discard(nonce)
+            self._stale = True
+
+    def sent(self, nonce, tx, tx_hash):
+        with self._lock:
+            self._reserved.discard(nonce)
+            self._in_flight[nonce] = (tx, tx_hash, time.monotonic())
+
+    def replace_stuck(self):
+        """
+        Prüft in-flight Transaktionen, die älter als stuck_timeout sind:
+        bereits geminte werden vergessen, die übrigen mit ~12,5 % höherem
+        Gaspreis unter derselben Nonce neu gesendet. Die RPC-Calls laufen
+        ohne Lock; reserve() und sent() anderer Threads warten nicht darauf.
+        """
+        now = time.monotonic()
+        with self._lock:
+            stuck = {nonce: entry for nonce, entry in self._in_flight.items()
+                     if now - entry[2] > self.stuck_timeout}
+            # Vormerken, damit parallele Aufrufe sie nicht ebenfalls ersetzen
+            for nonce, (tx, tx_hash, _) in stuck.items():
+                self._in_flight[nonce] = (tx, tx_hash, now)
+        if not stuck:
+            return
+
+        mined = self.w3.eth.get_transaction_count(self.address, "latest")
+        replaced = []
+        for nonce, (tx, tx_hash, _) in sorted(stuck.items()):
+            if nonce < mined:
+                continue
+            bumped = dict(tx)
+            for field in _FEE_FIELDS:
+                if field in bumped:
+                    bumped[field] = bumped[field] * 9 // 8 + 1
+            try:
+                new_hash = self.w3.eth.send_transaction(bumped)
+            except (Web3RPCError, ValueError) as exc:
+                logger.warning("Ersetzen von Nonce %s (%s) fehlgeschlagen: %s",
+                               nonce, self.address, exc)
+                continue
+            logger.warning("Hängende Transaktion %s durch %s ersetzt (Nonce %s, %s)",
+                           tx_hash.hex(), new_hash.hex(), nonce, self.address)
+            replaced.append((nonce, bumped, tx_hash, new_hash))
+
+        with self._lock:
+            for nonce in [n for n in self._in_flight if n < mined]:
+                del self._in_flight[nonce]
+            for nonce, bumped, _, new_hash in replaced:
+                if nonce in self._in_flight:
+                    self._in_flight[nonce] = (bumped, new_hash, now)
+        if self.on_replace:
+            for _, _, tx_hash, new_hash in replaced:
+                self.on_replace(tx_hash, new_hash)
+
+class SenderPool:
+    """
+    Mehrere Absender-Accounts mit je eigenem NonceManager. Eine Org sendet
+    über die Accounts, die laut Contract (adminOf) ihre Admins sind – dazu
+    zählt die Org-Wallet (Organization.chain_address) selbst, wenn der Node
+    sie verwaltet. Ohne passenden Account wird nicht gesendet (NoSenderError):
+    der Contract bucht Dokumente auf adminOf[msg.sender]. Nur Sendungen ohne
+    Org gehen reihum über den Default-Pool.
+
+    Die Admin-Zuordnung (adminOf) wird nach admin_ttl Sekunden neu gelesen,
+    damit ein entzogener oder neu ernannter Admin auch greift.
+
+    Ersetzt ein NonceManager eine hängende Transaktion, merkt sich der Pool
+    alten → neuen Hash (replacement_for) und ruft on_replace(alt, neu) auf.
+    """
+    def __init__(self, w3, contract, default_accounts, stuck_timeout=120, fees=None, gas_margin=1.2,
+                 on_replace=None, admin_ttl=300):
+        self.w3 = w3
+        self.contract = contract
+        self.stuck_timeout = stuck_timeout
+        self.admin_ttl = admin_ttl
+        self.fees = fees or FeeOracle(w3)
+        self.gas_margin = gas_margin
+        self.on_replace = on_replace
+        self._lock = threading.Lock()
+        self._managers = {}
+        self._org_of = {}      # Account → Org (adminOf)
+        self._org_cycles = {}  # Org → Round-Robin über ihre Accounts
+        self._org_expires = time.monotonic() + admin_ttl  # nächstes Neulesen von adminOf
+        self._replacements = OrderedDict()  # alter Tx-Hash → neuer
+        self._unlocked = {Web3.to_checksum_address(a) for a in w3.eth.accounts}
+        self.default_accounts = [Web3.to_checksum_address(a) for a in default_accounts]
+        for account in self.default_accounts:
+            self._add_account(account)
+        self._default_cycle = itertools.cycle(self.default_accounts)
+
+    def _add_account(self, account):
+        self._managers[account] = NonceManager(self.w3, account, self.stuck_timeout,
+                                               on_replace=self._replaced)
+        self._org_of[account] = self.contract.functions.adminOf(account).call().lower()
+
+    def _replaced(self, old_hash, new_hash):
+        with self._lock:
+            self._replacements[HexBytes(old_hash)] = HexBytes(new_hash)
+            while len(self._replacements) > _MAX_REPLACEMENTS:
+                self._replacements.popitem(last=False)
+        if self.on_replace:
+            self.on_replace(HexBytes(old_hash), HexBytes(new_hash))
+
+    def replacement_for(self, tx_hash):
+        """Aktueller Hash einer (ggf. mehrfach) ersetzten Transaktion, sonst tx_hash."""
+        tx_hash = HexBytes(tx_hash)
+        with self._lock:
+            while tx_hash in self._replacements:
+                tx_hash = self._replacements[tx_hash]
+        return tx_hash
+
+    def _refresh_admins(self):
+        """adminOf aller Accounts neu lesen (RPC ohne Lock) und Round-Robins verwerfen."""
+        with self._lock:
+            if time.monotonic() < self._org_expires:
+                return
+            # Vormerken: parallele Aufrufe senden mit dem alten Stand weiter
+            self._org_expires = time.monotonic() + self.admin_ttl
+            accounts = list(self._managers)
+        orgs = {account: self.contract.functions.adminOf(account).call().lower() for account in accounts}
+        with self._lock:
+            self._org_of.update(orgs)
+            self._org_cycles.clear()
+
+    def account_for(self, org_address=None):
+        if org_address is not None and time.monotonic() >= self._org_expires:
+            self._refresh_admins()
+        with self._lock:
+            if org_address is None:
+                return next(self._default_cycle)
+            if not Web3.is_address(org_address):
+                raise NoSenderError(org_address)
+            org_address = org_address.lower()
+            if org_address not in self._org_cycles:
+                # Org-Wallet als eigenen Admin-Account aufnehmen, falls unlocked
+                wallet = Web3.to_checksum_address(org_address)
+                if wallet in self._unlocked and wallet not in self._managers:
+                    self._add_account(wallet)
+                own = [a for a, org in self._org_of.items() if org == org_address]
+                if not own:
+                    # Nicht zwischenspeichern: ein später ernannter Admin soll greifen
+                    raise NoSenderError(org_address)
+                self._org_cycles[org_address] = itertools.cycle(own)
+            return next(self._org_cycles[org_address])
+
+    def send(self, fn_call, tx_params=None, org_address=None):
+        """
+        Baut und sendet fn_call mit lokal vergebener Nonce. Ohne Vorgabe in
+        tx_params wird das Gaslimit per eth_estimateGas (× gas_margin) und die
+        Gebühr über den FeeOracle bestimmt; würde die Transaktion revertieren,
+        wirft schon die Schätzung (ContractLogicError). Bei Nonce- oder
+        Gebühren-Fehlern wird einmal neu synchronisiert und erneut gesendet.
+        Liefert (tx_hash, sender).
+        """
+        sender = self.account_for(org_address)
+        manager = self._managers[sender]
+        manager.replace_stuck()
+
+        params = dict(tx_params or {})
+        if "gas" not in params:
+            params["gas"] = int(fn_call.estimate_gas({"from": sender}) * self.gas_margin)
+        own_fees = not any(field in params for field in _FEE_FIELDS)
+
+        for attempt in range(2):
+            if own_fees:
+                params.update(self.fees.suggest())
+            nonce = manager.reserve()
+            try:
+                tx = fn_call.build_transaction({**params, "from": sender, "nonce": nonce})
+                tx_hash = self.w3.eth.send_transaction(tx)
+            except Exception as exc:
+                # Nonce wurde nicht verbraucht bzw. passt nicht → Zähler neu
+                # vom Node, damit keine Lücke die Folge-Transaktionen blockiert
+                manager.resync(nonce)
+                if attempt == 0 and _is_nonce_error(exc):
+                    continue
+                if attempt == 0 and own_fees and _is_fee_error(exc):
+                    # Base-Fee ist über den zwischengespeicherten Vorschlag gestiegen
+                    self.fees.invalidate()
+                    continue
+                raise
+            manager.sent(nonce, tx, tx_hash)
+            return tx_hash, sender
@@ -0,0 +1,84 @@
+from collections import Counter, defaultdict
+
+from . import db
+from .models import OrgStats, OrgStatsBucket
+
+# Bucket-Größen in Sekunden
+GRANULARITIES = {"hour": 3600, "day": 86400}
+
+def bucket_start(timestamp, granularity):
+    size = GRANULARITIES[granularity]
+    return timestamp - timestamp % size
+
+def record_notarizations(rows):
+    """
+    Schreibt neu indizierte NotarizedDocument-Zeilen in die Aggregate der
+    jeweiligen Org. Läuft in der Session des Indexers und wird mit dessen
+    Checkpoint committet (bzw. mit ihm zurückgerollt).
+    """
+    per_org = defaultdict(list)
+    for row in rows:
+        per_org[row.org_address].append(row)
+
+    # Kein Autoflush: Konflikte der neuen Zeilen sollen erst beim Commit des
+    # Indexers auffallen (IntegrityError → Rollback des ganzen Chunks)
+    with db.session.no_autoflush:
+        for org_address, docs in per_org.items():
+            _record_org(org_address, docs)
+
+def _record_org(org_address, docs):
+    stats = db.session.get(OrgStats, org_address)
+    if stats is None:
+        stats = OrgStats(org_address=org_address, total_notarizations=0)
+        db.session.add(stats)
+    stats.total_notarizations += len(docs)
+
+    newest = max(docs, key=lambda d: (d.timestamp, d.block_number, d.log_index))
+    if stats.latest_timestamp is None or newest.timestamp >= stats.latest_timestamp:
+        stats.latest_document_hash = newest.document_hash
+        stats.latest_timestamp = newest.timestamp
+
+    counts = Counter(
+        (granularity, bucket_start(doc.timestamp, granularity))
+        for doc in docs for granularity in GRANULARITIES
+    )
+    for (granularity, start), n in counts.items():
+        bucket = db.session.get(OrgStatsBucket, (org_address, granularity, start))
+        if bucket is None:
+            bucket = OrgStatsBucket(org_address=org_address, granularity=granularity,
+                                    bucket_start=start, count=0)
+            db.session.add(bucket)
+        bucket.count += n
+
+def get_org_stats(org_address):
+    """totalNotarizations + latestNotarization aus den Aggregaten."""
+    stats = db.session.get(OrgStats, org_address)
+    if stats is None:
+        return {"totalNotarizations": 0, "latestNotarization": None}
+    latest = None
+    if stats.latest_timestamp is not None:
+        latest = {
+            "documentHash": stats.latest_document_hash,
+            "timestamp":    stats.latest_timestamp
+        }
+    return {
+        "totalNotarizations": stats.total_notarizations,
+        "latestNotarization": latest
+    }
+
+def get_timeseries(org_address, granularity, start, end):
+    """
+    Lückenlose Zeitreihe [{start, count}, ...] für die Buckets, die
+    [start, end) überdecken; leere Buckets zählen 0.
+    """
+    size = GRANULARITIES[granularity]
+    first = bucket_start(start, granularity)
+    counts = dict(
+        db.session.query(OrgStatsBucket.bucket_start, OrgStatsBucket.count)
+        .filter(OrgStatsBucket.org_address == org_address,
+                OrgStatsBucket.granularity == granularity,
+                OrgStatsBucket.bucket_start >= first,
+                OrgStatsBucket.bucket_start < end)
+        .all()
+    )
+    return [{"start": t, "count": counts.get(t, 0)} for t in range(first, end, size)]
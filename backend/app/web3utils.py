@@ -1,33 +1,285 @@
-from .config import Config
+import json
+import logging
+import threading
+from functools import lru_cache
+
+import requests
+from flask import current_app, has_app_context
+from hexbytes import HexBytes
+from requests.adapters import HTTPAdapter
+from sqlalchemy import event
 from web3 import Web3
+from web3.exceptions import Web3RPCError
+
 from .models import Organization
-import json
+from .senders import SenderPool
+from .fees import FeeOracle
+from .cache import ContractReadCache, TTLCache
+from .metrics import RpcMetricsMiddleware
+from .prefilter import DocumentPrefilter
+from .rpc import MultiEndpointProvider, redact_url
+
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=None)
+def load_artifact(path):
+    """Hardhat-Artefakt (abi, bytecode) – einmal je Pfad und Prozess geparst."""
+    with open(path) as f:
+        artifact = json.load(f)
+    return artifact["abi"], artifact.get("bytecode")
+
+def load_abi(path):
+    return load_artifact(path)[0]
+
+def compile_notary(source_path, contract_name):
+    """
+    Kompiliert den Notary-Contract mit py-solc-x (optional), falls kein
+    Hardhat-Artefakt vorliegt. Liefert (abi, bytecode).
+    """
+    try:
+        import solcx
+    except ImportError as exc:
+        raise FileNotFoundError(
+            "Kein Notary-Artefakt gefunden: `npx hardhat compile` ausführen "
+            "oder py-solc-x installieren"
+        ) from exc
+    try:
+        out = solcx.compile_files([source_path], output_values=["abi", "bin"], solc_version="0.8.28")
+    except solcx.exceptions.SolcNotInstalled as exc:
+        raise FileNotFoundError(
+            "Kein Notary-Artefakt gefunden und solc 0.8.28 nicht installiert: "
+            "`npx hardhat compile` oder `python -m solcx.install v0.8.28` ausführen"
+        ) from exc
+    compiled = next(v for k, v in out.items() if k.endswith(f":{contract_name}"))
+    return compiled["abi"], "0x" + compiled["bin"]
+
+def _rpc_session(pool_size):
+    """requests-Session mit Keep-Alive-Pool für alle RPC-Calls eines Prozesses."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+class ChainClient:
+    """
+    App-weiter Zugang zu Node und Notary-Contract. Baut die Verbindung erst
+    beim ersten Zugriff auf (nicht beim Import oder in create_app) und hält
+    danach Web3-Instanz, Contract und Absender-Pool für den Prozess vor.
+    """
+    def __init__(self, config):
+        self.config = config
+        self._lock = threading.RLock()
+        self._w3 = None
+        self._contract = None
+        self._sender_pool = None
+        # Aufgerufen mit (alter, neuer Tx-Hash), wenn der Sender-Pool eine hängende
+        # Transaktion ersetzt (Jobs und Anker-Batches führen ihren Hash nach)
+        self.replacement_listeners = []
+        # Bloom-Filter der notarisierten Dateihashes (/api/verify ohne eth_call für Unbekannte)
+        self.prefilter = DocumentPrefilter(self)
+        # RPC_URLS (mehrere Nodes, siehe app/rpc.py) oder der einzelne RPC_URL
+        self.rpc_urls = config["RPC_URLS"] or [config["RPC_URL"]]
+        # Gemeinsamer Cache für view-Calls (originalHash, timestamps, fileTimestamps, getDocOrg)
+        self.read_cache = ContractReadCache(
+            max_entries=config["READ_CACHE_MAX_ENTRIES"],
+            negative_ttl=config["READ_CACHE_NEGATIVE_TTL"]
+        )
+
+    @property
+    def w3(self):
+        if self._w3 is None:
+            with self._lock:
+                if self._w3 is None:
+                    if self.config["CHAIN_BACKEND"] == "memory":
+                        # In-Process-EVM (eth-tester/py-evm), kein externer Node
+                        w3 = Web3(Web3.EthereumTesterProvider())
+                    elif len(self.rpc_urls) > 1:
+                        w3 = Web3(MultiEndpointProvider(
+                            self.rpc_urls,
+                            session_factory=lambda: _rpc_session(self.config["RPC_POOL_SIZE"]),
+                            request_kwargs={"timeout": (self.config["RPC_CONNECT_TIMEOUT"],
+                                                        self.config["RPC_READ_TIMEOUT"])},
+                            health_interval=self.config["RPC_HEALTH_INTERVAL"],
+                            health_timeout=self.config["RPC_HEALTH_TIMEOUT"],
+                            max_workers=self.config["RPC_POOL_SIZE"] * len(self.rpc_urls),
+                            alpha=self.config["RPC_EWMA_ALPHA"],
+                            hedge_quantile=self.config["RPC_HEDGE_QUANTILE"],
+                            hedge_min_delay=self.config["RPC_HEDGE_MIN_DELAY"],
+                            max_block_lag=self.config["RPC_MAX_BLOCK_LAG"]
+                        ))
+                    else:
+                        w3 = Web3(Web3.HTTPProvider(
+                            self.config["RPC_URL"],
+                            session=_rpc_session(self.config["RPC_POOL_SIZE"]),
+                            request_kwargs={"timeout": (self.config["RPC_CONNECT_TIMEOUT"],
+                                                        self.config["RPC_READ_TIMEOUT"])}
+                        ))
+                    w3.middleware_onion.add(RpcMetricsMiddleware, "rpc_metrics")
+                    if not w3.is_connected():
+                        raise ConnectionError(f"Cannot connect to {', '.join(map(redact_url, self.rpc_urls))}")
+                    self._w3 = w3
+        return self._w3
 
-# Web3-Provider
-w3 = Web3(Web3.HTTPProvider(Config.RPC_URL))
-if not w3.is_connected():
-    raise ConnectionError(f"Cannot connect to {Config.RPC_URL}")
+    @property
+    def contract(self):
+        if self._contract is None:
+            with self._lock:
+                if self._contract is None:
+                    if self.config["CHAIN_BACKEND"] == "memory":
+                        self._contract = self._deploy_memory_contract()
+                    else:
+                        # Contract-Adresse aus Datei + Checksum
+                        with open(self.config["DEPLOYED_ADDRESS_FILE"]) as f:
+                            address = Web3.to_checksum_address(f.read().strip())
+                        self._contract = self.w3.eth.contract(
+                            address=address,
+                            abi=load_abi(self.config["CONTRACT_ABI_PATH"])
+                        )
+        return self._contract
 
-# Contract-Adresse aus Datei (einmalig) + Checksum
-with open(Config.DEPLOYED_ADDRESS_FILE) as f:
-    raw_addr = f.read().strip()
-contract_address = Web3.to_checksum_address(raw_addr)
+    def _deploy_memory_contract(self):
+        """
+        Deployt Notary auf der In-Process-Chain und richtet die Org ein wie
+        scripts/deploy.js: Account #0 Chain-Owner, #1 Org-Wallet, #2 Org-Admin.
+        """
+        try:
+            abi, bytecode = load_artifact(self.config["CONTRACT_ABI_PATH"])
+        except FileNotFoundError:
+            abi, bytecode = compile_notary(self.config["CONTRACT_SOURCE_PATH"], self.config["NOTARY_CONTRACT"])
+        owner, org_wallet, org_admin = self.w3.eth.accounts[:3]
 
-# Contract-ABI laden
-with open(Config.CONTRACT_ABI_PATH) as f:
-    contract_abi = json.load(f)["abi"]
+        tx_hash = self.w3.eth.contract(abi=abi, bytecode=bytecode).constructor().transact({"from": owner})
+        address = self.w3.eth.wait_for_transaction_receipt(tx_hash).contractAddress
+        contract = self.w3.eth.contract(address=address, abi=abi)
+        contract.functions.registerOrg(org_wallet).transact({"from": owner})
+        contract.functions.addOrgAdmin(org_wallet, org_admin).transact({"from": org_wallet})
+        return contract
 
-# Contract-Instanz
-contract = w3.eth.contract(address=contract_address, abi=contract_abi)
-#Debugging: print(f"[web3utils] Contract loaded at address: {contract.address}")
+    @property
+    def sender_pool(self):
+        if self._sender_pool is None:
+            with self._lock:
+                if self._sender_pool is None:
+                    # Default-Sender: Hardhat unlocked account #2
+                    accounts = self.config["SENDER_ACCOUNTS"] or [self.w3.eth.accounts[2]]
+                    self._sender_pool = SenderPool(
+                        self.w3, self.contract, accounts,
+                        stuck_timeout=self.config["SENDER_STUCK_TIMEOUT"],
+                        admin_ttl=self.config["SENDER_ADMIN_TTL"],
+                        fees=FeeOracle(
+                            self.w3,
+                            ttl=self.config["FEE_CACHE_TTL"],
+                            base_multiplier=self.config["FEE_BASE_MULTIPLIER"],
+                            min_priority_fee=self.config["FEE_MIN_PRIORITY_WEI"]
+                        ),
+                        gas_margin=self.config["GAS_ESTIMATE_MARGIN"],
+                        on_replace=self._tx_replaced
+                    )
+        return self._sender_pool
 
-# Default-Sender (Hardhat unlocked account)
-default_sender_account = w3.eth.accounts[2]
+    def _tx_replaced(self, old_hash, new_hash):
+        for listener in self.replacement_listeners:
+            try:
+                listener(old_hash, new_hash)
+            except Exception:
+                logger.exception("Ersetzung %s → %s nicht übernommen", old_hash.hex(), new_hash.hex())
+
+    def cached_call(self, fn_name, *args):
+        """contract.functions.<fn_name>(*args).call() über den Read-Cache."""
+        return self.read_cache.call(self.contract, fn_name, *args)
+
+    def batch_calls(self, calls):
+        """
+        Führt mehrere view-Calls [(fn_name, args), ...] als JSON-RPC-Batch aus –
+        ein HTTP-Round-Trip je READ_BATCH_SIZE Calls statt einer pro Call – und
+        liefert die Ergebnisse in derselben Reihenfolge. Treffer im Read-Cache
+        werden nicht erneut abgefragt.
+        """
+        results = [None] * len(calls)
+        missing = []
+        for i, (fn_name, args) in enumerate(calls):
+            found, value = self.read_cache.get(fn_name, *args)
+            if found:
+                results[i] = value
+            else:
+                missing.append(i)
+
+        batch_size = self.config["READ_BATCH_SIZE"]
+        for start in range(0, len(missing), batch_size):
+            chunk = missing[start:start + batch_size]
+            fns = [self.contract.functions[calls[i][0]](*calls[i][1]) for i in chunk]
+            try:
+                # Über die Middleware des Providers (Formatierung, RPC-Metriken)
+                send_batch = self.w3.provider.batch_request_func(self.w3, self.w3.middleware_onion)
+                responses = send_batch([
+                    ("eth_call", [{"to": self.contract.address, "data": fn._encode_transaction_data()}, "latest"])
+                    for fn in fns
+                ])
+            except (AttributeError, NotImplementedError):
+                # Provider ohne Batch-Support (z. B. eth-tester) → Einzel-Calls
+                for i in chunk:
+                    results[i] = self.cached_call(calls[i][0], *calls[i][1])
+                continue
+            if not isinstance(responses, list):
+                # Node lehnt den ganzen Batch ab
+                raise Web3RPCError(f"Batch-Request fehlgeschlagen: {responses.get('error')}")
+
+            for i, fn, response in zip(chunk, fns, responses):
+                if "error" in response:
+                    raise Web3RPCError(f"eth_call {calls[i][0]} fehlgeschlagen: {response['error']}")
+                output_types = [out["type"] for out in fn.abi["outputs"]]
+                value = self.w3.codec.decode(output_types, HexBytes(response["result"]))[0]
+                self.read_cache.put(calls[i][0], calls[i][1], value)
+                results[i] = value
+        return results
+
+    def invalidate_document(self, id_hash, doc_hash):
+        """Nach einer bestätigten eigenen Notarisierung die Cache-Einträge verwerfen."""
+        self.read_cache.invalidate_document(id_hash, doc_hash, Web3.keccak(id_hash + doc_hash))
+        self.prefilter.add(doc_hash)
+
+def init_chain(app):
+    """
+    Registriert den (noch nicht verbundenen) ChainClient und den Cache
+    organization_id → chain_address an der App.
+    """
+    app.extensions["chain"] = ChainClient(app.config)
+    app.extensions["org_addresses"] = TTLCache(app.config["ORG_ADDRESS_CACHE_TTL"])
+
+def get_chain():
+    """ChainClient der aktuellen App."""
+    return current_app.extensions["chain"]
+
+def cached_call(fn_name, *args):
+    return get_chain().cached_call(fn_name, *args)
+
+def batch_calls(calls):
+    return get_chain().batch_calls(calls)
+
+def notarization_candidates(doc_hashes):
+    """Die Dateihashes, für die fileTimestamps != 0 sein kann (siehe DocumentPrefilter)."""
+    return get_chain().prefilter.candidates(doc_hashes)
+
+def invalidate_document(id_hash, doc_hash):
+    get_chain().invalidate_document(id_hash, doc_hash)
 
 def get_user_org_address(user):
     """
     Liefert die on-chain Adresse (chain_address) der Organisation,
-    der der gegebene Flask-User zugeordnet ist.
+    der der gegebene Flask-User zugeordnet ist. Aus dem Cache oder über
+    user.organization (von load_user per Join mitgeladen).
     """
-    org = Organization.query.get(user.organization_id)
-    return org.chain_address
\ No newline at end of file
+    cache = current_app.extensions["org_addresses"]
+    found, address = cache.get(user.organization_id)
+    if not found:
+        address = user.organization.chain_address
+        cache.put(user.organization_id, address)
+    return address
+
+@event.listens_for(Organization, "after_update")
+@event.listens_for(Organization, "after_delete")
+def _forget_org_address(mapper, connection, org):
+    """Geänderte/gelöschte Orgs sofort aus dem Adress-Cache nehmen."""
+    if has_app_context() and "org_addresses" in current_app.extensions:
+        current_app.extensions["org_addresses"].invalidate(org.id)
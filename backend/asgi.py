@@ -0,0 +1,5 @@
+from app import create_app
+from app.aio import create_asgi_app
+
+# ASGI-Modus: hypercorn asgi:app --bind 0.0.0.0:5001
+app = create_asgi_app(create_app())
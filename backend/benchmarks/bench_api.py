@@ -0,0 +1,264 @@
+"""
+Benchmark der Notary-API in Abhängigkeit von der Chain-Historie.
+
+Befüllt die Chain eines laufenden Nodes (RPC_URL, Contract wie per
+scripts/deploy.js deployt) stufenweise mit N Notarisierungen und misst je
+Stufe Latenz und Anzahl RPC-Round-Trips für
+
+    POST /api/notarize, POST /api/verify, GET /api/documents,
+    GET /api/stats, GET /api/documents/<id>/history
+
+Die Requests laufen in-process über den Flask-Test-Client gegen eine
+eigene SQLite-Datenbank; gemessen wird also Backend + Node, nicht das
+Netzwerk zum Client. Ergebnisse landen als JSON in --output und lassen
+sich per --baseline mit einem früheren Lauf vergleichen. Mit
+CHAIN_BACKEND=memory läuft alles gegen die In-Process-Chain (eth-tester).
+
+Aufruf (aus backend/):
+    python -m benchmarks.bench_api --sizes 1000,10000,100000 --output bench.json
+    python -m benchmarks.bench_api --sizes 1000 --baseline bench.json
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from io import BytesIO
+
+from web3 import Web3
+
+from app import create_app, db
+from app.models import Organization, User
+from app.indexer import sync_document_index
+from app.web3utils import get_chain
+
+PASSWORD = "BenchPassword123"
+
+def document_content(i):
+    """Dateiinhalt der i-ten Seed-Notarisierung (für /api/verify reproduzierbar)."""
+    return f"bench-document-{i}".encode()
+
+def document_id(i):
+    return f"bench-{i}"
+
+class RpcCounter:
+    """Zählt RPC-Round-Trips und einzelne Calls am Provider des ChainClients."""
+    def __init__(self, provider):
+        self.round_trips = 0
+        self.calls = 0
+        make_request = provider.make_request
+
+        def counted_request(method, params):
+            self.round_trips += 1
+            self.calls += 1
+            return make_request(method, params)
+
+        provider.make_request = counted_request
+        # EthereumTesterProvider (CHAIN_BACKEND=memory) kennt keine Batches
+        if hasattr(provider, "make_batch_request"):
+            make_batch_request = provider.make_batch_request
+
+            def counted_batch(requests):
+                self.round_trips += 1
+                self.calls += len(requests)
+                return make_batch_request(requests)
+
+            provider.make_batch_request = counted_batch
+
+    def snapshot(self):
+        return self.round_trips, self.calls
+
+def seeded_count(chain):
+    """Bereits vorhandene Seed-Dokumente (fortlaufend ab 0) auf der Chain."""
+    def notarized(i):
+        return any(chain.contract.functions.originalHash(Web3.keccak(text=document_id(i))).call())
+
+    lo, hi = 0, 1
+    while notarized(hi - 1):
+        lo, hi = hi, hi * 2
+    # Binärsuche nach dem ersten fehlenden Index in [lo, hi)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if notarized(mid):
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+def seed(org_address, start, target, chunk_size):
+    """Notarisiert die Seed-Dokumente start..target-1 per storeDocumentHashes."""
+    chain = get_chain()
+    pending = []
+    for first in range(start, target, chunk_size):
+        indices = range(first, min(first + chunk_size, target))
+        tx_hash, _ = chain.sender_pool.send(
+            chain.contract.functions.storeDocumentHashes(
+                [Web3.keccak(text=document_id(i)) for i in indices],
+                [Web3.keccak(document_content(i)) for i in indices]
+            ),
+            org_address=org_address
+        )
+        pending.append(tx_hash)
+        if len(pending) >= 20:
+            for tx in pending:
+                chain.w3.eth.wait_for_transaction_receipt(tx)
+            pending = []
+            print(f"  {min(first + chunk_size, target)}/{target} notarisiert", file=sys.stderr)
+    for tx in pending:
+        chain.w3.eth.wait_for_transaction_receipt(tx)
+
+def measure(client, counter, name, make_request, repetitions):
+    """Führt make_request() repetitions-mal aus und fasst Latenz + RPCs zusammen."""
+    latencies = []
+    rpc_before = counter.snapshot()
+    for n in range(repetitions):
+        started = time.perf_counter()
+        res = make_request(n)
+        latencies.append((time.perf_counter() - started) * 1000)
+        if res.status_code >= 400:
+            raise RuntimeError(f"{name}: HTTP {res.status_code} {res.get_data(as_text=True)[:200]}")
+    rpc_after = counter.snapshot()
+    latencies.sort()
+    return {
+        "endpoint":          name,
+        "requests":          repetitions,
+        "meanMs":            round(statistics.fmean(latencies), 3),
+        "p50Ms":             round(latencies[len(latencies) // 2], 3),
+        "p95Ms":             round(latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)], 3),
+        "maxMs":             round(latencies[-1], 3),
+        "rpcRoundTripsPerRequest": round((rpc_after[0] - rpc_before[0]) / repetitions, 2),
+        "rpcCallsPerRequest":      round((rpc_after[1] - rpc_before[1]) / repetitions, 2)
+    }
+
+def run_level(app, client, counter, size, repetitions, rng):
+    """Misst alle Endpunkte bei size Seed-Notarisierungen."""
+    # Index einmal vorab nachziehen – die Dauer wird getrennt ausgewiesen
+    started = time.perf_counter()
+    with app.app_context():
+        sync_document_index()
+    index_seconds = time.perf_counter() - started
+
+    run_id = f"{size}-{int(time.time())}"
+    samples = [rng.randrange(size) for _ in range(repetitions)]
+    endpoints = [
+        ("POST /api/notarize", lambda n: client.post("/api/notarize", data={
+            "documentId": f"bench-new-{run_id}-{n}",
+            "file": (BytesIO(f"bench-new-{run_id}-{n}".encode()), "bench.pdf")
+        }, content_type="multipart/form-data")),
+        ("POST /api/verify", lambda n: client.post("/api/verify", data={
+            "file": (BytesIO(document_content(samples[n])), "bench.pdf")
+        }, content_type="multipart/form-data")),
+        ("GET /api/documents", lambda n: client.get("/api/documents")),
+        ("GET /api/stats", lambda n: client.get("/api/stats")),
+        ("GET /api/documents/<id>/history",
+         lambda n: client.get(f"/api/documents/{document_id(samples[n])}/history")),
+    ]
+    results = []
+    for name, make_request in endpoints:
+        result = measure(client, counter, name, make_request, repetitions)
+        result.update({"historySize": size, "indexSyncSeconds": round(index_seconds, 3)})
+        results.append(result)
+        print(f"  {name:34} p50 {result['p50Ms']:9.2f} ms  p95 {result['p95Ms']:9.2f} ms  "
+              f"RPC {result['rpcRoundTripsPerRequest']:6.2f}", file=sys.stderr)
+    return results
+
+def compare(results, baseline_path, max_regression):
+    """Vergleicht p95 je (Historie, Endpunkt) mit einem früheren Lauf."""
+    with open(baseline_path) as f:
+        baseline = {(r["historySize"], r["endpoint"]): r for r in json.load(f)["results"]}
+    regressions = []
+    for result in results:
+        before = baseline.get((result["historySize"], result["endpoint"]))
+        if not before:
+            continue
+        ratio = result["p95Ms"] / before["p95Ms"] if before["p95Ms"] else 1.0
+        print(f"  {result['historySize']:>7} {result['endpoint']:34} p95 x{ratio:5.2f}  "
+              f"RPC {before['rpcRoundTripsPerRequest']} → {result['rpcRoundTripsPerRequest']}",
+              file=sys.stderr)
+        if ratio > max_regression or result["rpcRoundTripsPerRequest"] > before["rpcRoundTripsPerRequest"]:
+            regressions.append(result)
+    return regressions
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="Historien-Größen (kommagetrennt, aufsteigend)")
+    parser.add_argument("--requests", type=int, default=50, help="Requests je Endpunkt und Stufe")
+    parser.add_argument("--output", default="bench-results.json", help="Ergebnisdatei (JSON)")
+    parser.add_argument("--baseline", help="Früherer Lauf zum Vergleich")
+    parser.add_argument("--max-regression", type=float, default=1.5,
+                        help="Erlaubter p95-Faktor gegenüber --baseline")
+    parser.add_argument("--seed", type=int, default=1, help="Zufalls-Seed für die Stichproben")
+    args = parser.parse_args(argv)
+    sizes = sorted(int(s) for s in args.sizes.split(","))
+
+    db_dir = tempfile.mkdtemp(prefix="notary-bench-")
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(db_dir, 'bench.db')}",
+        "AUTH_WORKERS": 0,
+        "BCRYPT_LOG_ROUNDS": 4
+    })
+    rng = random.Random(args.seed)
+
+    with app.app_context():
+        db.create_all()
+        chain = get_chain()
+        # Org-Wallet wie in scripts/deploy.js (Hardhat-Account #1)
+        org_address = chain.w3.eth.accounts[1]
+        org = Organization(name="Benchmark", chain_address=org_address)
+        user = User(email="bench@example.org", organization=org)
+        user.set_password(PASSWORD)
+        db.session.add_all([org, user])
+        db.session.commit()
+        counter = RpcCounter(chain.w3.provider)
+        seeded = seeded_count(chain)
+
+    client = app.test_client()
+    res = client.post("/login", data={"email": "bench@example.org", "password": PASSWORD})
+    if res.status_code != 200:
+        raise RuntimeError(f"Login fehlgeschlagen: {res.get_data(as_text=True)}")
+
+    results = []
+    for size in sizes:
+        print(f"Historie {size}:", file=sys.stderr)
+        if seeded < size:
+            with app.app_context():
+                seed(org_address, seeded, size, app.config["NOTARIZE_BATCH_CHUNK_SIZE"])
+            seeded = size
+        results.extend(run_level(app, client, counter, size, args.requests, rng))
+
+    report = {
+        "meta": {
+            "startedAt": datetime.now(timezone.utc).isoformat(),
+            "gitRevision": git_revision(),
+            "chainBackend": app.config["CHAIN_BACKEND"],
+            "contract": app.config["NOTARY_CONTRACT"],
+            "rpcUrl": app.config["RPC_URL"],
+            "requestsPerEndpoint": args.requests
+        },
+        "results": results
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Ergebnisse in {args.output}", file=sys.stderr)
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.max_regression)
+        if regressions:
+            print(f"{len(regressions)} Regression(en) gegenüber {args.baseline}", file=sys.stderr)
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""
+Benchmark des Multi-Endpoint-Providers (app/rpc.py) gegen lokale Stand-in-Nodes.
+
+Startet --nodes minimale JSON-RPC-Server (eth_call, eth_blockNumber, Batches)
+mit --latency ms Antwortzeit; der erste davon ist degradiert und antwortet
+bei --degraded-ratio der Requests erst nach --degraded-delay ms. Gemessen
+werden eth_calls aus --threads parallelen Threads über
+
+    single   HTTPProvider auf den degradierten Node (bisher: ein RPC_URL)
+    multi    MultiEndpointProvider über alle Nodes (EWMA-Routing + Hedging)
+
+und je Variante p50/p95/p99 ausgegeben, als JSON in --output.
+
+Aufruf (aus backend/):
+    python -m benchmarks.bench_rpc --nodes 3 --requests 2000 --output bench-rpc.json
+    python -m benchmarks.bench_rpc --degraded-ratio 0.2 --degraded-delay 1000
+"""
+import argparse
+import json
+import multiprocessing
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from web3 import HTTPProvider
+
+from app.rpc import MultiEndpointProvider
+from app.web3utils import _rpc_session
+
+from .bench_api import git_revision
+
+RESULTS = {
+    "eth_blockNumber": "0x10",
+    "eth_chainId": "0x7a69",
+    "web3_clientVersion": "stand-in/1.0",
+    "eth_call": "0x" + "00" * 32,
+}
+
+def _serve_node(latency, stall_ratio, stall_delay, seed, ready):
+    rng = random.Random(seed)
+    rng_lock = threading.Lock()
+
+    def delay():
+        with rng_lock:
+            stalled = rng.random() < stall_ratio
+            jitter = rng.uniform(0.8, 1.2)
+        return latency * jitter + (stall_delay if stalled else 0.0)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Header und Body gehen getrennt raus; ohne TCP_NODELAY kämen 40 ms Delayed-ACK dazu
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            time.sleep(delay())
+            if isinstance(request, list):
+                body = [{"jsonrpc": "2.0", "id": r["id"], "result": RESULTS[r["method"]]} for r in request]
+            else:
+                body = {"jsonrpc": "2.0", "id": request["id"], "result": RESULTS[request["method"]]}
+            data = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    ready.send(f"http://127.0.0.1:{server.server_address[1]}")
+    server.serve_forever()
+
+class StandInNode:
+    """
+    JSON-RPC-Server mit einstellbarer Latenz und gelegentlichen Stalls, in
+    einem eigenen Prozess (teilt sich den GIL nicht mit den Clients).
+    """
+    def __init__(self, latency, stall_ratio=0.0, stall_delay=0.0, seed=1):
+        ready, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_serve_node, daemon=True,
+                                               args=(latency, stall_ratio, stall_delay, seed, child))
+        self.process.start()
+        self.url = ready.recv()
+
+    def stop(self):
+        self.process.terminate()
+
+def measure(name, provider, requests, threads, warmup):
+    """requests eth_calls direkt am Provider aus threads Threads; Latenzen in ms."""
+    params = [{"to": "0x" + "11" * 20, "data": "0x"}, "latest"]
+
+    def one(_):
+        started = time.perf_counter()
+        provider.make_request("eth_call", params)
+        return (time.perf_counter() - started) * 1000
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(one, range(warmup)))
+        latencies = sorted(pool.map(one, range(requests)))
+
+    def pct(q):
+        return round(latencies[min(int(len(latencies) * q), len(latencies) - 1)], 3)
+    result = {"provider": name, "requests": requests, "p50Ms": pct(0.5), "p95Ms": pct(0.95),
+              "p99Ms": pct(0.99), "maxMs": round(latencies[-1], 3)}
+    print(f"{name:8} p50 {result['p50Ms']:8.2f} ms  p95 {result['p95Ms']:8.2f} ms  "
+          f"p99 {result['p99Ms']:8.2f} ms", file=sys.stderr)
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--nodes", type=int, default=3, help="Anzahl Stand-in-Nodes (der erste degradiert)")
+    parser.add_argument("--latency", type=float, default=2.0, help="Grundlatenz je Node in ms")
+    parser.add_argument("--degraded-ratio", type=float, default=0.05,
+                        help="Anteil verzögerter Requests am degradierten Node")
+    parser.add_argument("--degraded-delay", type=float, default=200.0,
+                        help="Zusätzliche Verzögerung dieser Requests in ms")
+    parser.add_argument("--requests", type=int, default=2000, help="Gemessene eth_calls je Variante")
+    parser.add_argument("--warmup", type=int, default=200, help="Nicht gemessene eth_calls vorab")
+    parser.add_argument("--threads", type=int, default=4, help="Parallele Clients")
+    parser.add_argument("--output", default="bench-rpc.json", help="Ergebnisdatei (JSON)")
+    args = parser.parse_args(argv)
+
+    latency = args.latency / 1000
+    nodes = [StandInNode(latency, args.degraded_ratio, args.degraded_delay / 1000)]
+    nodes += [StandInNode(latency, seed=i + 2) for i in range(args.nodes - 1)]
+    urls = [node.url for node in nodes]
+    request_kwargs = {"timeout": (3, 30)}
+    try:
+        results = [
+            measure("single", HTTPProvider(urls[0], session=_rpc_session(args.threads),
+                                           request_kwargs=request_kwargs),
+                    args.requests, args.threads, args.warmup),
+            measure("multi", MultiEndpointProvider(urls, session_factory=lambda: _rpc_session(args.threads),
+                                                   request_kwargs=request_kwargs, health_interval=1.0,
+                                                   max_workers=args.threads * len(urls)),
+                    args.requests, args.threads, args.warmup),
+        ]
+    finally:
+        for node in nodes:
+            node.stop()
+
+    report = {
+        "meta": {
+            "startedAt": datetime.now(timezone.utc).isoformat(),
+            "gitRevision": git_revision(),
+            "nodes": args.nodes,
+            "latencyMs": args.latency,
+            "degradedRatio": args.degraded_ratio,
+            "degradedDelayMs": args.degraded_delay,
+            "threads": args.threads
+        },
+        "results": results
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Ergebnisse in {args.output}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
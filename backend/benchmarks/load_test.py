@@ -0,0 +1,339 @@
+"""
+Lastgenerator für den laufenden Notary-Server (Flask oder ASGI) samt Node.
+
+Legt --orgs Organisationen mit je --users-per-org Nutzern (Passwort + TOTP)
+in der Datenbank des Servers an (DATABASE_URL wie beim Server) und
+registriert die Org-Wallets – unlocked Accounts des Nodes – per registerOrg
+im Contract. Alle Nutzer melden sich über HTTP mit pyotp-Code an; danach
+laufen --duration Sekunden gemischte Requests nach --mix
+
+    notarize   POST /api/notarize (neue Datei, --file-size Bytes)
+    verify     POST /api/verify (Anteil --verify-hit-ratio bereits notarisiert)
+    documents  GET /api/documents
+    stats      GET /api/stats
+
+über zufällig gewählte Nutzer. Mit --rate kommen die Requests als
+Poisson-Prozess (offene Last, --concurrency begrenzt die gleichzeitigen);
+die Latenz zählt ab dem geplanten Ankunftszeitpunkt, Wartezeit in der
+Warteschlange eingeschlossen. Ohne --rate schicken --concurrency Clients
+ihre Requests direkt hintereinander (geschlossene Last). Je Endpunkt
+werden Durchsatz, Fehlerrate und p50/p95/p99 ausgegeben, als JSON in
+--output.
+
+Der Login-Limiter zählt alle Logins von 127.0.0.1 gegen
+LOGIN_MAX_ATTEMPTS_PER_IP – den Server dafür mit einem Wert über der
+Nutzerzahl starten.
+
+Aufruf (aus backend/):
+    LOGIN_MAX_ATTEMPTS_PER_IP=1000 python run.py
+    python -m benchmarks.load_test --url http://localhost:5001 --orgs 4 --users-per-org 25 \\
+        --concurrency 32 --rate 100 --duration 60 --output load.json
+"""
+import argparse
+import itertools
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from http.cookiejar import DefaultCookiePolicy
+
+import pyotp
+import requests
+
+from app import bcrypt, create_app, db
+from app.models import Organization, User
+from app.web3utils import get_chain
+
+from .bench_api import git_revision
+
+PASSWORD = "LoadPassword123"
+
+DEFAULT_MIX = "notarize=1,verify=5,documents=2,stats=2"
+
+# Statuscodes, die für den jeweiligen Request kein Fehler sind
+EXPECTED_STATUS = {
+    "POST /login": {200},
+    "POST /api/notarize": {200},
+    "POST /api/verify": {200, 404},  # 404 = nicht notarisiert
+    "GET /api/documents": {200},
+    "GET /api/stats": {200},
+}
+
+def org_wallets(chain, count):
+    """
+    count unlocked Accounts als Org-Wallets. Ausgenommen sind der Chain
+    Owner, die Default-Sender und Admins anderer Orgs (registerOrg würde
+    deren adminOf überschreiben).
+    """
+    contract = chain.contract
+    reserved = {contract.functions.chainOwner().call(), *chain.sender_pool.default_accounts}
+    wallets = []
+    for account in chain.w3.eth.accounts:
+        if account in reserved:
+            continue
+        admin_of = contract.functions.adminOf(account).call()
+        if int(admin_of, 16) in (0, int(account, 16)):
+            wallets.append(account)
+        if len(wallets) == count:
+            return wallets
+    raise RuntimeError(f"Nur {len(wallets)} freie unlocked Accounts für {count} Orgs")
+
+def setup(orgs, users_per_org):
+    """
+    Legt Orgs und Nutzer an (idempotent) und liefert [(email, otp_secret)].
+    Alle Nutzer teilen sich einen Passwort-Hash – sonst dauert das Anlegen
+    hunderter Nutzer so lange wie ihre bcrypt-Hashes.
+    """
+    chain = get_chain()
+    owner = chain.contract.functions.chainOwner().call()
+    password_hash = bcrypt.generate_password_hash(PASSWORD).decode()
+    users = []
+    for i, wallet in enumerate(org_wallets(chain, orgs)):
+        if not chain.contract.functions.isOrg(wallet).call():
+            tx_hash = chain.contract.functions.registerOrg(wallet).transact({"from": owner})
+            chain.w3.eth.wait_for_transaction_receipt(tx_hash)
+        org = Organization.query.filter_by(chain_address=wallet).first()
+        if not org:
+            org = Organization(name=f"Load {i}", chain_address=wallet)
+            db.session.add(org)
+        for n in range(users_per_org):
+            email = f"load-{i}-{n}@example.org"
+            user = User.query.filter_by(email=email).first()
+            if not user:
+                user = User(email=email, password_hash=password_hash, organization=org)
+                user.generate_otp_secret()
+                db.session.add(user)
+            user.password_hash = password_hash
+            users.append((email, user.otp_secret))
+    db.session.commit()
+    return users
+
+class Recorder:
+    """Sammelt Latenzen und Statuscodes je Endpunkt (threadsicher)."""
+    def __init__(self):
+        self.latencies = {name: [] for name in EXPECTED_STATUS}
+        self.statuses = {name: Counter() for name in EXPECTED_STATUS}
+        self.errors = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, name, status, seconds):
+        with self._lock:
+            self.latencies[name].append(seconds * 1000)
+            self.statuses[name][str(status)] += 1
+            if status not in EXPECTED_STATUS[name]:
+                self.errors[name] += 1
+
+    def summary(self, name, elapsed):
+        latencies = sorted(self.latencies[name])
+        if not latencies:
+            return None
+
+        def pct(q):
+            return round(latencies[min(int(len(latencies) * q), len(latencies) - 1)], 3)
+        return {
+            "endpoint":      name,
+            "requests":      len(latencies),
+            "errors":        self.errors[name],
+            "errorRate":     round(self.errors[name] / len(latencies), 4),
+            "throughputRps": round(len(latencies) / elapsed, 2),
+            "p50Ms":         pct(0.5),
+            "p95Ms":         pct(0.95),
+            "p99Ms":         pct(0.99),
+            "maxMs":         round(latencies[-1], 3),
+            "statusCodes":   dict(self.statuses[name])
+        }
+
+class LoadClient:
+    """
+    HTTP-Seite: Logins und die einzelnen Request-Arten. Jeder Thread hat
+    eine eigene requests.Session (Keep-Alive-Verbindungen); deren Cookie-Jar
+    nimmt nichts an, das Session-Cookie des jeweiligen Nutzers geht je
+    Request mit.
+    """
+    def __init__(self, url, recorder, file_size, verify_hit_ratio, timeout, seed):
+        self.url = url.rstrip("/")
+        self.recorder = recorder
+        self.file_size = file_size
+        self.verify_hit_ratio = verify_hit_ratio
+        self.timeout = timeout
+        self.run_id = uuid.uuid4().hex[:8]
+        self.cookies = {}      # email → Session-Cookies nach dem Login
+        self.notarized = []    # Inhalte erfolgreich notarisierter Dateien
+        self._local = threading.local()
+        self._counter = itertools.count()
+        self._seed = seed
+
+    def _thread_state(self):
+        local = self._local
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+            local.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            local.rng = random.Random(f"{self._seed}-{threading.get_ident()}")
+        return local
+
+    def _send(self, name, scheduled, method, path, email=None, **kwargs):
+        """Ein Request als email (mit dessen Session-Cookie); Latenz ab scheduled."""
+        state = self._thread_state()
+        try:
+            res = state.session.request(method, f"{self.url}{path}", timeout=self.timeout,
+                                        cookies=self.cookies.get(email), **kwargs)
+            status = res.status_code
+        except requests.RequestException:
+            res, status = None, "exception"
+        self.recorder.record(name, status, time.perf_counter() - scheduled)
+        return res
+
+    def login(self, email, otp_secret, scheduled):
+        res = self._send("POST /login", scheduled, "POST", "/login", json={
+            "email": email, "password": PASSWORD, "otp": pyotp.TOTP(otp_secret).now()
+        })
+        if res is not None and res.status_code == 200:
+            self.cookies[email] = res.cookies.get_dict()
+            return True
+        return False
+
+    def send_random(self, mix, emails, scheduled):
+        """Ein Request zufälliger Art (Gewichte aus mix) für einen zufälligen Nutzer."""
+        rng = self._thread_state().rng
+        kinds, weights = mix
+        getattr(self, rng.choices(kinds, weights)[0])(rng.choice(emails), scheduled)
+
+    def _content(self):
+        n = next(self._counter)
+        prefix = f"load-{self.run_id}-{n}-".encode()
+        return n, prefix + b"\0" * max(0, self.file_size - len(prefix))
+
+    def notarize(self, email, scheduled):
+        n, content = self._content()
+        res = self._send("POST /api/notarize", scheduled, "POST", "/api/notarize", email,
+                         data={"documentId": f"load-{self.run_id}-{n}"},
+                         files={"file": ("load.pdf", content)})
+        if res is not None and res.status_code == 200:
+            self.notarized.append(content)
+
+    def verify(self, email, scheduled):
+        rng = self._thread_state().rng
+        if self.notarized and rng.random() < self.verify_hit_ratio:
+            content = rng.choice(self.notarized)
+        else:
+            content = self._content()[1]
+        self._send("POST /api/verify", scheduled, "POST", "/api/verify", email,
+                   files={"file": ("load.pdf", content)})
+
+    def documents(self, email, scheduled):
+        self._send("GET /api/documents", scheduled, "GET", "/api/documents", email)
+
+    def stats(self, email, scheduled):
+        self._send("GET /api/stats", scheduled, "GET", "/api/stats", email)
+
+def parse_mix(spec):
+    """"notarize=1,verify=5" → ([Request-Arten], [Gewichte])."""
+    kinds, weights = [], []
+    for part in spec.split(","):
+        kind, _, weight = part.partition("=")
+        kind = kind.strip()
+        if kind not in ("notarize", "verify", "documents", "stats"):
+            raise argparse.ArgumentTypeError(f"Unbekannte Request-Art: {kind}")
+        kinds.append(kind)
+        weights.append(float(weight or 1))
+    return kinds, weights
+
+def drive(client, emails, mix, concurrency, rate, duration, rng):
+    """Erzeugt die Last; liefert die Dauer bis zur letzten Antwort in Sekunden."""
+    def one(scheduled):
+        client.send_random(mix, emails, scheduled)
+
+    started = time.perf_counter()
+    deadline = started + duration
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        if rate:
+            # Offene Last: Ankunftszeiten unabhängig von den Antworten
+            arrival = started
+            while True:
+                arrival += rng.expovariate(rate)
+                if arrival >= deadline:
+                    break
+                time.sleep(max(0.0, arrival - time.perf_counter()))
+                pool.submit(one, arrival)
+        else:
+            def closed_loop():
+                while time.perf_counter() < deadline:
+                    one(time.perf_counter())
+            for _ in range(concurrency):
+                pool.submit(closed_loop)
+    return time.perf_counter() - started
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://localhost:5001", help="Basis-URL des Servers")
+    parser.add_argument("--orgs", type=int, default=4, help="Anzahl Organisationen")
+    parser.add_argument("--users-per-org", type=int, default=25, help="Nutzer je Organisation")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help=f"Gewichte der Request-Arten (Default {DEFAULT_MIX})")
+    parser.add_argument("--concurrency", type=int, default=16, help="Maximal gleichzeitige Requests")
+    parser.add_argument("--rate", type=float, default=0.0,
+                        help="Ankunftsrate in Requests/s (0 = geschlossene Last)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Dauer der Lastphase in s")
+    parser.add_argument("--file-size", type=int, default=4096, help="Größe der Dateien in Bytes")
+    parser.add_argument("--verify-hit-ratio", type=float, default=0.5,
+                        help="Anteil der Verifikationen bereits notarisierter Dateien")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Timeout je Request in s")
+    parser.add_argument("--seed", type=int, default=1, help="Zufalls-Seed")
+    parser.add_argument("--output", default="load-results.json", help="Ergebnisdatei (JSON)")
+    args = parser.parse_args(argv)
+
+    # Gleiche Konfiguration (DATABASE_URL, RPC_URL) wie der Server
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        users = setup(args.orgs, args.users_per_org)
+    print(f"{args.orgs} Orgs, {len(users)} Nutzer angelegt", file=sys.stderr)
+
+    recorder = Recorder()
+    client = LoadClient(args.url, recorder, args.file_size, args.verify_hit_ratio, args.timeout, args.seed)
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        logged_in = list(pool.map(lambda user: client.login(*user, time.perf_counter()), users))
+    emails = [email for (email, _), ok in zip(users, logged_in) if ok]
+    print(f"{len(emails)}/{len(users)} Logins erfolgreich "
+          f"({dict(recorder.statuses['POST /login'])})", file=sys.stderr)
+    if not emails:
+        return 1
+
+    elapsed = drive(client, emails, args.mix, args.concurrency, args.rate, args.duration,
+                    random.Random(args.seed))
+
+    results = []
+    for name in EXPECTED_STATUS:
+        result = recorder.summary(name, elapsed)
+        if result:
+            results.append(result)
+            print(f"  {name:20} {result['throughputRps']:8.1f} req/s  Fehler {result['errorRate']:6.1%}  "
+                  f"p50 {result['p50Ms']:8.1f} ms  p95 {result['p95Ms']:8.1f} ms  "
+                  f"p99 {result['p99Ms']:8.1f} ms", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "startedAt": datetime.now(timezone.utc).isoformat(),
+            "gitRevision": git_revision(),
+            "url": args.url,
+            "orgs": args.orgs,
+            "users": len(emails),
+            "mix": dict(zip(*args.mix)),
+            "concurrency": args.concurrency,
+            "rate": args.rate or None,
+            "durationSeconds": round(elapsed, 3)
+        },
+        "results": results
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Ergebnisse in {args.output}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
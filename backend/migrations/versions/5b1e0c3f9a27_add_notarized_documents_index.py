@@ -0,0 +1,48 @@
+"""Add notarized_documents event index + index_checkpoints
+
+Revision ID: 5b1e0c3f9a27
+Revises: 2160d6191c6d
+Create Date: 2026-10-18 09:12:41.118204
+"""
+
+# Alembic‐Revision‐Metadaten:
+revision = '5b1e0c3f9a27'
+down_revision = '2160d6191c6d'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+def upgrade():
+    op.create_table('notarized_documents',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('id_hash', sa.String(length=66), nullable=False),
+    sa.Column('document_hash', sa.String(length=66), nullable=False),
+    sa.Column('org_address', sa.String(length=42), nullable=False),
+    sa.Column('timestamp', sa.BigInteger(), nullable=False),
+    sa.Column('tx_hash', sa.String(length=66), nullable=False),
+    sa.Column('block_number', sa.Integer(), nullable=False),
+    sa.Column('log_index', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('tx_hash', 'log_index', name='uq_notarized_documents_log')
+    )
+    with op.batch_alter_table('notarized_documents', schema=None) as batch_op:
+        batch_op.create_index('ix_notarized_documents_id_hash', ['id_hash'], unique=False)
+        batch_op.create_index('ix_notarized_documents_document_hash', ['document_hash'], unique=False)
+        batch_op.create_index('ix_notarized_documents_org_block',
+                              ['org_address', 'block_number', 'log_index'], unique=False)
+
+    op.create_table('index_checkpoints',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('last_block', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+def downgrade():
+    op.drop_table('index_checkpoints')
+    with op.batch_alter_table('notarized_documents', schema=None) as batch_op:
+        batch_op.drop_index('ix_notarized_documents_org_block')
+        batch_op.drop_index('ix_notarized_documents_document_hash')
+        batch_op.drop_index('ix_notarized_documents_id_hash')
+    op.drop_table('notarized_documents')
@@ -0,0 +1,53 @@
+"""Add anchor_batches + anchored_documents for Merkle-root anchoring
+
+Revision ID: 8d4a2e61c0b3
+Revises: 5b1e0c3f9a27
+Create Date: 2026-10-18 11:40:07.532911
+"""
+
+# Alembic‐Revision‐Metadaten:
+revision = '8d4a2e61c0b3'
+down_revision = '5b1e0c3f9a27'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+def upgrade():
+    op.create_table('anchor_batches',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('org_address', sa.String(length=42), nullable=False),
+    sa.Column('merkle_root', sa.String(length=66), nullable=False),
+    sa.Column('leaf_count', sa.Integer(), nullable=False),
+    sa.Column('tx_hash', sa.String(length=66), nullable=True),
+    sa.Column('block_number', sa.Integer(), nullable=True),
+    sa.Column('anchored_at', sa.BigInteger(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('merkle_root')
+    )
+    op.create_table('anchored_documents',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('id_hash', sa.String(length=66), nullable=False),
+    sa.Column('document_hash', sa.String(length=66), nullable=False),
+    sa.Column('org_address', sa.String(length=42), nullable=False),
+    sa.Column('submitted_at', sa.DateTime(), nullable=False),
+    sa.Column('batch_id', sa.Integer(), nullable=True),
+    sa.Column('leaf_index', sa.Integer(), nullable=True),
+    sa.Column('proof', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['batch_id'], ['anchor_batches.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('id_hash', 'document_hash', name='uq_anchored_documents_pair')
+    )
+    with op.batch_alter_table('anchored_documents', schema=None) as batch_op:
+        batch_op.create_index('ix_anchored_documents_id_hash', ['id_hash'], unique=False)
+        batch_op.create_index('ix_anchored_documents_document_hash', ['document_hash'], unique=False)
+        batch_op.create_index('ix_anchored_documents_batch_id', ['batch_id'], unique=False)
+
+def downgrade():
+    with op.batch_alter_table('anchored_documents', schema=None) as batch_op:
+        batch_op.drop_index('ix_anchored_documents_batch_id')
+        batch_op.drop_index('ix_anchored_documents_document_hash')
+        batch_op.drop_index('ix_anchored_documents_id_hash')
+    op.drop_table('anchored_documents')
+    op.drop_table('anchor_batches')
@@ -0,0 +1,27 @@
+"""Add indexes on users.organization_id and pending anchored documents
+
+Revision ID: 9f3c5d8e1a42
+Revises: e2b7a4f03c61
+Create Date: 2026-10-18 14:58:09.663410
+"""
+
+# Alembic‐Revision‐Metadaten:
+revision = '9f3c5d8e1a42'
+down_revision = 'e2b7a4f03c61'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index('ix_users_organization_id', ['organization_id'], unique=False)
+    with op.batch_alter_table('anchored_documents', schema=None) as batch_op:
+        batch_op.create_index('ix_anchored_documents_org_batch', ['org_address', 'batch_id'], unique=False)
+
+def downgrade():
+    with op.batch_alter_table('anchored_documents', schema=None) as batch_op:
+        batch_op.drop_index('ix_anchored_documents_org_batch')
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('ix_users_organization_id')
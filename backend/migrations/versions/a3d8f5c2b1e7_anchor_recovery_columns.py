@@ -0,0 +1,28 @@
+"""Track anchor batch creation and park failed anchored documents
+
+Revision ID: a3d8f5c2b1e7
+Revises: 9f3c5d8e1a42
+Create Date: 2026-10-18 16:12:40.218334
+"""
+
+# Alembic‐Revision‐Metadaten:
+revision = 'a3d8f5c2b1e7'
+down_revision = '9f3c5d8e1a42'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+def upgrade():
+    with op.batch_alter_table('anchor_batches', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('created_at', sa.DateTime(), nullable=False,
+                                      server_default=sa.func.now()))
+    with op.batch_alter_table('anchored_documents', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('error', sa.Text(), nullable=True))
+
+def downgrade():
+    with op.batch_alter_table('anchored_documents', schema=None) as batch_op:
+        batch_op.drop_column('error')
+    with op.batch_alter_table('anchor_batches', schema=None) as batch_op:
+        batch_op.drop_column('created_at')
@@ -0,0 +1,23 @@
+"""Remember the chain head when an anchor batch is sent
+
+Revision ID: b7c2e9f4d1a6
+Revises: a3d8f5c2b1e7
+Create Date: 2026-10-18 19:04:11.530927
+"""
+
+# Alembic‐Revision‐Metadaten:
+revision = 'b7c2e9f4d1a6'
+down_revision = 'a3d8f5c2b1e7'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+def upgrade():
+    with op.batch_alter_table('anchor_batches', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sent_block', sa.Integer(), nullable=True))
+
+def downgrade():
+    with op.batch_alter_table('anchor_batches', schema=None) as batch_op:
+        batch_op.drop_column('sent_block')
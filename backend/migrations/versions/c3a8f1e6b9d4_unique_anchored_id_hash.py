@@ -0,0 +1,25 @@
+"""Anchor each document ID at most once
+
+Revision ID: c3a8f1e6b9d4
+Revises: b7c2e9f4d1a6
+Create Date: 2026-10-18 19:41:52.107364
+"""
+
+# Alembic‐Revision‐Metadaten:
+revision = 'c3a8f1e6b9d4'
+down_revision = 'b7c2e9f4d1a6'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+def upgrade():
+    with op.batch_alter_table('anchored_documents', schema=None) as batch_op:
+        batch_op.drop_index('ix_anchored_documents_id_hash')
+        batch_op.create_index('ix_anchored_documents_id_hash', ['id_hash'], unique=True)
+
+def downgrade():
+    with op.batch_alter_table('anchored_documents', schema=None) as batch_op:
+        batch_op.drop_index('ix_anchored_documents_id_hash')
+        batch_op.create_index('ix_anchored_documents_id_hash', ['id_hash'], unique=False)
@@ -0,0 +1,41 @@
+"""Add notarization_jobs for asynchronous notarization
+
+Revision ID: c47f19d2e8a5
+Revises: 8d4a2e61c0b3
+Create Date: 2026-10-18 13:05:52.904117
+"""
+
+# Alembic‐Revision‐Metadaten:
+revision = 'c47f19d2e8a5'
+down_revision = '8d4a2e61c0b3'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+def upgrade():
+    op.create_table('notarization_jobs',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('organization_id', sa.Integer(), nullable=False),
+    sa.Column('document_id', sa.String(length=256), nullable=False),
+    sa.Column('id_hash', sa.String(length=66), nullable=False),
+    sa.Column('document_hash', sa.String(length=66), nullable=False),
+    sa.Column('tx_hash', sa.String(length=66), nullable=False),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('block_number', sa.Integer(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('notarization_jobs', schema=None) as batch_op:
+        batch_op.create_index('ix_notarization_jobs_organization_id', ['organization_id'], unique=False)
+        batch_op.create_index('ix_notarization_jobs_tx_hash', ['tx_hash'], unique=False)
+
+def downgrade():
+    with op.batch_alter_table('notarization_jobs', schema=None) as batch_op:
+        batch_op.drop_index('ix_notarization_jobs_tx_hash')
+        batch_op.drop_index('ix_notarization_jobs_organization_id')
+    op.drop_table('notarization_jobs')
@@ -0,0 +1,58 @@
+"""Add org_stats and org_stats_buckets aggregates
+
+Revision ID: e2b7a4f03c61
+Revises: c47f19d2e8a5
+Create Date: 2026-10-18 14:21:37.518204
+"""
+
+# Alembic‐Revision‐Metadaten:
+revision = 'e2b7a4f03c61'
+down_revision = 'c47f19d2e8a5'
+branch_labels = None
+depends_on = None
+
+from collections import Counter
+
+from alembic import op
+import sqlalchemy as sa
+
+def upgrade():
+    org_stats = op.create_table('org_stats',
+    sa.Column('org_address', sa.String(length=42), nullable=False),
+    sa.Column('total_notarizations', sa.Integer(), nullable=False),
+    sa.Column('latest_document_hash', sa.String(length=66), nullable=True),
+    sa.Column('latest_timestamp', sa.BigInteger(), nullable=True),
+    sa.PrimaryKeyConstraint('org_address')
+    )
+    org_stats_buckets = op.create_table('org_stats_buckets',
+    sa.Column('org_address', sa.String(length=42), nullable=False),
+    sa.Column('granularity', sa.String(length=8), nullable=False),
+    sa.Column('bucket_start', sa.BigInteger(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('org_address', 'granularity', 'bucket_start')
+    )
+
+    # Aggregate aus dem bestehenden Event-Index nachrechnen
+    rows = op.get_bind().execute(sa.text(
+        "SELECT org_address, document_hash, timestamp FROM notarized_documents "
+        "ORDER BY timestamp, block_number, log_index"
+    )).fetchall()
+    stats, buckets = {}, Counter()
+    for org_address, document_hash, timestamp in rows:
+        entry = stats.setdefault(org_address, {"org_address": org_address, "total_notarizations": 0})
+        entry["total_notarizations"] += 1
+        entry["latest_document_hash"] = document_hash
+        entry["latest_timestamp"] = timestamp
+        for granularity, size in (("hour", 3600), ("day", 86400)):
+            buckets[(org_address, granularity, timestamp - timestamp % size)] += 1
+    if stats:
+        op.bulk_insert(org_stats, list(stats.values()))
+    if buckets:
+        op.bulk_insert(org_stats_buckets, [
+            {"org_address": org, "granularity": granularity, "bucket_start": start, "count": count}
+            for (org, granularity, start), count in buckets.items()
+        ])
+
+def downgrade():
+    op.drop_table('org_stats_buckets')
+    op.drop_table('org_stats')
@@ -1,15 +1,52 @@
 import io
 import pytest
-from app import create_app
+from app import create_app, db
+from app.models import Organization, User
+from app.web3utils import get_chain
+
+PASSWORD = "TestPassword123"
+
+# Grund, aus dem die Chain-Tests übersprungen wurden (fehlendes Artefakt/solc)
+_chain_skip_reason = None
+
+def pytest_terminal_summary(terminalreporter):
+    # Sonst nur mit -rs sichtbar: ein Großteil der Suite lief dann nicht
+    if _chain_skip_reason:
+        terminalreporter.write_line(f"Chain-Tests übersprungen: {_chain_skip_reason}", yellow=True, bold=True)
+
+@pytest.fixture
+def app():
+    # Je Test eine frische In-Process-Chain (Notary deployt, Org #1 registriert)
+    # und eine leere In-Memory-Datenbank
+    app = create_app({
+        "TESTING": True,
+        "CHAIN_BACKEND": "memory",
+        "SQLALCHEMY_DATABASE_URI": "sqlite://",
+        "AUTH_WORKERS": 0,
+        "BCRYPT_LOG_ROUNDS": 4
+    })
+    with app.app_context():
+        try:
+            chain = get_chain()
+            chain.contract
+        except FileNotFoundError as exc:
+            global _chain_skip_reason
+            _chain_skip_reason = str(exc)
+            pytest.skip(str(exc))
+        db.create_all()
+        org = Organization(name="Test-Org", chain_address=chain.w3.eth.accounts[1])
+        user = User(email="test@example.org", organization=org)
+        user.set_password(PASSWORD)
+        db.session.add_all([org, user])
+        db.session.commit()
+    yield app
 
 @pytest.fixture
-def client():
-    app = create_app()
-    app.config['TESTING'] = True
-    return app.test_client()
+def client(app):
+    client = app.test_client()
+    res = client.post("/login", data={"email": "test@example.org", "password": PASSWORD})
+    assert res.status_code == 200
+    return client
 
 def make_data(content: bytes, doc_id: str, filename: str = "file.pdf"):
-    return {
-        "documentId": doc_id,
-        "file": (io.BytesIO(content), filename)
-    }
+    return {"documentId": doc_id, "file": (io.BytesIO(content), filename)}
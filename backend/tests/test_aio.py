@@ -0,0 +1,103 @@
+# tests/test_aio.py
+
+import asyncio
+
+import pytest
+from web3 import Web3
+
+from app import create_app, db
+from app.aio import create_async_app
+from app.models import Organization, User
+from app.routes import batch_candidates, batch_result, hash_list_items
+
+@pytest.fixture
+def flask_app():
+    # Ohne Chain-Zugriff: Auth und Eingabeprüfung laufen vor dem ersten RPC-Call
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+        "AUTH_WORKERS": 0,
+        "BCRYPT_LOG_ROUNDS": 4
+    })
+    with app.app_context():
+        db.create_all()
+        org = Organization(name="TestOrg", chain_address="0x" + "ab" * 20)
+        user = User(email="alice@test.org", organization=org)
+        user.set_password("Secret123")
+        db.session.add_all([org, user])
+        db.session.commit()
+    return app
+
+def _session_cookie(flask_app):
+    client = flask_app.test_client()
+    res = client.post("/login", data={"email": "alice@test.org", "password": "Secret123"})
+    assert res.status_code == 200
+    return client.get_cookie("session").value
+
+# Ohne Login → 401 JSON (statt Redirect auf die Login-Seite)
+def test_async_endpoints_require_login(flask_app):
+    async def run():
+        client = create_async_app(flask_app).test_client()
+        res = await client.post("/api/notarize/hash", json={"documentId": "d", "documentHash": "0x00"})
+        return res.status_code, await res.get_json()
+    assert asyncio.run(run()) == (401, {"error": "Nicht eingeloggt"})
+
+# Das Session-Cookie des Flask-Logins gilt auch für die async Endpunkte
+def test_async_endpoints_accept_flask_session(flask_app):
+    cookie = _session_cookie(flask_app)
+
+    async def run():
+        client = create_async_app(flask_app).test_client()
+        res = await client.post("/api/notarize/hash", json={"documentId": "d", "documentHash": "0x1234"},
+                                headers={"Cookie": f"session={cookie}"})
+        return res.status_code, await res.get_json()
+    assert asyncio.run(run()) == (400, {"error": "Ungültiger Hash"})
+
+# Notarisieren und Verifizieren über AsyncWeb3 auf derselben In-Process-Chain
+def test_async_notarize_and_verify(app):
+    doc_hash = "0x" + Web3.keccak(b"async document").hex()
+
+    async def run():
+        aio = create_async_app(app)
+        async with aio.test_app():
+            client = aio.test_client()
+            async with client.session_transaction() as session:
+                # User aus conftest.py (id 1)
+                session["_user_id"] = "1"
+            first = await client.post("/api/notarize/hash", json={"documentId": "doc-a", "documentHash": doc_hash})
+            again = await client.post("/api/notarize/hash", json={"documentId": "doc-a", "documentHash": doc_hash})
+            verify = await client.post("/api/verify/batch", json={"hashes": [doc_hash, "0x" + "11" * 32, "x"]})
+            return first.status_code, (again.status_code, await again.get_json()), await verify.get_json()
+
+    first, again, verify = asyncio.run(run())
+    assert first == 200
+    assert again == (400, {"error": "Schon notariell hinterlegt"})
+    assert [r["verified"] for r in verify["results"]] == [True, False, False]
+    assert verify["results"][2]["error"] == "Ungültiger Hash"
+
+# Session eines gelöschten Nutzers → 401 (gleicher user_loader wie Flask-Login)
+def test_async_endpoints_use_user_loader(flask_app):
+    cookie = _session_cookie(flask_app)
+    with flask_app.app_context():
+        db.session.delete(db.session.get(User, 1))
+        db.session.commit()
+
+    async def run():
+        client = create_async_app(flask_app).test_client()
+        res = await client.post("/api/notarize/hash", json={"documentId": "d", "documentHash": "0x1234"},
+                                headers={"Cookie": f"session={cookie}"})
+        return res.status_code
+    assert asyncio.run(run()) == 401
+
+# Doppelte Hashes im Batch → ein Lookup, aber ein Ergebnis je Eingabe (sync und async)
+def test_batch_candidates_dedupe(flask_app):
+    doc_hash = "0x" + "11" * 32
+    # Ohne Prefilter: kein Aufbau im Hintergrund, alle gültigen Hashes sind Kandidaten
+    flask_app.config["PREFILTER_ENABLED"] = False
+    with flask_app.app_context():
+        items = hash_list_items({"hashes": [doc_hash, doc_hash, "x"]})
+        valid, candidates = batch_candidates(items)
+        result = batch_result(items, valid, dict.fromkeys(candidates, 0))
+    assert valid == [bytes.fromhex("11" * 32)]
+    assert result["total"] == 3
+    assert [r["verified"] for r in result["results"]] == [False, False, False]
@@ -0,0 +1,215 @@
+# tests/test_anchoring.py
+
+from types import SimpleNamespace
+
+import pytest
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.exceptions import ContractLogicError, TimeExhausted, TransactionNotFound
+
+from app import anchoring, create_app, db
+from app.anchoring import anchor_status, flush_anchor_batch, pending_count, recover_batches, submit_document
+from app.models import AnchorBatch, AnchoredDocument
+
+ORG = "0x" + "ab" * 20
+
+class FakeRootAnchored:
+    """contract.events.RootAnchored: Event-Objekt und Klasse in einem."""
+    def __init__(self, chain):
+        self.chain = chain
+
+    def __call__(self):
+        return self
+
+    def process_receipt(self, receipt):
+        return [SimpleNamespace(args=SimpleNamespace(timestamp=self.chain.timestamp))]
+
+    def get_logs(self, from_block, to_block, argument_filters):
+        self.chain.log_ranges.append((from_block, to_block))
+        mined = self.chain.anchored.get(argument_filters["root"])
+        if not mined or not from_block <= mined.blockNumber <= to_block:
+            return []
+        return [SimpleNamespace(transactionHash=mined.transactionHash, blockNumber=mined.blockNumber,
+                                args=SimpleNamespace(timestamp=self.chain.timestamp))]
+
+class FakeChain:
+    """Chain-Client mit steuerbarem anchorRoot: Revert, Verbindungsfehler oder Mining erst später."""
+    def __init__(self):
+        self.anchored = {}   # Root → Receipt
+        self.sent = {}       # Tx-Hash → Root (noch nicht gemined)
+        self.send_error = None
+        self.timestamp = 1_700_000_000
+        self.log_ranges = []  # (from_block, to_block) je RootAnchored.get_logs
+        self.contract = SimpleNamespace(
+            functions=SimpleNamespace(
+                anchorRoot=lambda root, count: root,
+                rootTimestamps=lambda root: SimpleNamespace(
+                    call=lambda: self.timestamp if root in self.anchored else 0)
+            ),
+            events=SimpleNamespace(RootAnchored=FakeRootAnchored(self))
+        )
+        self.sender_pool = SimpleNamespace(send=self.send)
+        self.w3 = SimpleNamespace(eth=SimpleNamespace(
+            block_number=20,
+            wait_for_transaction_receipt=self.wait_for_transaction_receipt,
+            get_transaction_receipt=self.get_transaction_receipt,
+            get_transaction=self.get_transaction
+        ))
+
+    def send(self, root, org_address=None):
+        if self.send_error:
+            raise self.send_error
+        tx_hash = HexBytes(Web3.keccak(root))
+        self.sent[tx_hash.hex()] = root
+        return tx_hash, "0xsender"
+
+    def mine(self):
+        self.w3.eth.block_number += 1
+        for tx_hex, root in self.sent.items():
+            self.anchored[root] = SimpleNamespace(status=1, transactionHash=HexBytes(tx_hex),
+                                                  blockNumber=self.w3.eth.block_number)
+        self.sent = {}
+
+    def get_transaction_receipt(self, tx_hash):
+        for receipt in self.anchored.values():
+            if receipt.transactionHash == HexBytes(tx_hash):
+                return receipt
+        raise TransactionNotFound("unbekannt")
+
+    def wait_for_transaction_receipt(self, tx_hash, timeout=None):
+        try:
+            return self.get_transaction_receipt(tx_hash)
+        except TransactionNotFound:
+            raise TimeExhausted("nicht gemined")
+
+    def get_transaction(self, tx_hash):
+        if HexBytes(tx_hash).hex() not in self.sent:
+            raise TransactionNotFound("unbekannt")
+        return {}
+
+@pytest.fixture
+def app():
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+        "AUTH_WORKERS": 0,
+        "ANCHOR_WINDOW_SECONDS": 0,
+        "ANCHOR_RECOVERY_SECONDS": 0,
+        "INDEX_LOG_CHUNK_BLOCKS": 4
+    })
+    app.extensions["chain"] = FakeChain()
+    with app.app_context():
+        db.create_all()
+        yield app
+    if anchoring._timer is not None:
+        anchoring._timer.cancel()
+    anchoring._timer, anchoring._failures = None, 0
+
+def submit(n=2):
+    return [submit_document(Web3.keccak(text=f"doc-{i}"), Web3.keccak(text=f"content-{i}"), ORG)[0]
+            for i in range(n)]
+
+# Dauerhafter Revert (z. B. "Nicht Org-Admin") → Dokumente geparkt statt erneut eingereiht
+def test_permanent_revert_parks_documents(app):
+    docs = submit()
+    app.extensions["chain"].send_error = ContractLogicError("execution reverted: Nicht Org-Admin")
+    assert flush_anchor_batch(ORG) is None
+    assert pending_count(ORG) == 0
+    assert AnchorBatch.query.count() == 0
+    assert anchor_status(docs[0])["status"] == "failed"
+
+    anchoring.schedule_flush(app)
+    assert anchoring._timer is None
+
+# Receipt-Timeout → Batch bleibt mit Tx-Hash beansprucht; recover_batches übernimmt ihn nach dem Mining
+def test_receipt_timeout_keeps_batch(app):
+    docs = submit()
+    assert flush_anchor_batch(ORG) is None
+    batch = AnchorBatch.query.one()
+    assert batch.tx_hash and batch.block_number is None
+    assert anchor_status(docs[0])["status"] == "pending"
+
+    # Noch im Mempool → weiter warten
+    assert recover_batches() == []
+    app.extensions["chain"].mine()
+    assert recover_batches() == [batch]
+    assert anchor_status(docs[0])["status"] == "anchored"
+
+# Absturz zwischen Beanspruchen und Senden → Dokumente wieder frei; schon gemined → übernommen
+def test_recover_batches_without_tx_hash(app):
+    submit()
+    app.extensions["chain"].send_error = KeyboardInterrupt()
+    with pytest.raises(KeyboardInterrupt):
+        flush_anchor_batch(ORG)
+    assert AnchorBatch.query.one().tx_hash is None
+    assert pending_count(ORG) == 0
+
+    assert recover_batches() == []
+    assert AnchorBatch.query.count() == 0
+    assert pending_count(ORG) == 2
+
+    # Der nächste Versuch revertiert mit "Root bereits verankert" → Event des ersten übernehmen
+    chain = app.extensions["chain"]
+    chain.send_error = None
+    flush_anchor_batch(ORG)
+    chain.mine()
+    chain.send_error = ContractLogicError("execution reverted: Root bereits verankert")
+    AnchorBatch.query.one().tx_hash = None
+    db.session.commit()
+    assert [b.block_number for b in recover_batches()] == [21]
+    # Gesucht wird nur ab dem Head beim Senden
+    assert chain.log_ranges == [(20, 21)]
+
+# "Root bereits verankert" ohne bekannten Sendeblock → Chunks vom Head rückwärts bis zum ersten Treffer
+def test_adopt_searches_backwards_in_chunks(app):
+    submit()
+    chain = app.extensions["chain"]
+    assert flush_anchor_batch(ORG) is None
+    chain.mine()
+    # Früherer Versuch gemined, der Batch aber verloren (z. B. Absturz)
+    db.session.delete(AnchorBatch.query.one())
+    AnchoredDocument.query.update({"batch_id": None, "proof": None, "leaf_index": None})
+    db.session.commit()
+    chain.w3.eth.block_number = 30
+
+    chain.send_error = ContractLogicError("execution reverted: Root bereits verankert")
+    batch = flush_anchor_batch(ORG)
+    assert batch.block_number == 21
+    assert chain.log_ranges == [(27, 30), (23, 26), (19, 22)]
+
+# Verbindungsfehler → Backoff wächst je Fehlschlag bis ANCHOR_RETRY_MAX_SECONDS
+def test_failed_flush_backs_off(app):
+    submit()
+    app.extensions["chain"].send_error = ConnectionError("Node nicht erreichbar")
+    app.config.update(ANCHOR_RETRY_BASE_SECONDS=5, ANCHOR_RETRY_MAX_SECONDS=12)
+    delays = []
+    for _ in range(3):
+        anchoring._run_scheduled_flush(app)
+        delays.append(anchoring._timer.interval)
+        anchoring._timer.cancel()
+        anchoring._timer = None
+    assert delays == [5, 10, 12]
+    assert pending_count(ORG) == 2
+
+# Volles Zählfenster: ein später fälliger Timer wird durch einen sofortigen ersetzt
+def test_schedule_flush_now_replaces_later_timer(app):
+    app.config.update(ANCHOR_WINDOW_SECONDS=3600, ANCHOR_BATCH_MAX_SIZE=2)
+    submit(1)
+    anchoring.schedule_flush(app)
+    later = anchoring._timer
+    assert later.interval > 3500
+
+    submit(2)  # doc-0 ist schon eingereicht, dazu doc-1
+    anchoring.schedule_flush(app, delay=0)
+    assert anchoring._timer is not later and not later.is_alive()
+    anchoring._timer.join()
+    assert AnchorBatch.query.one().tx_hash is not None
+    assert pending_count(ORG) == 0
+
+# Dieselbe ID mit anderem Hash (paralleler Request nach bestandener Vorprüfung) wird abgewiesen
+def test_submit_same_id_twice(app):
+    id_hash = Web3.keccak(text="doc-x")
+    assert submit_document(id_hash, Web3.keccak(text="v1"), ORG)[1] is None
+    assert submit_document(id_hash, Web3.keccak(text="v2"), ORG) == (None, "Dokument darf nicht geändert werden")
+    assert submit_document(id_hash, Web3.keccak(text="v1"), ORG) == (None, "Schon notariell hinterlegt")
+    assert pending_count(ORG) == 1
@@ -0,0 +1,52 @@
+# tests/test_cache.py
+import time
+from types import SimpleNamespace
+from app.cache import ContractReadCache
+
+class FakeContract:
+    """Zählt view-Calls; Werte kommen aus einem Dict."""
+    def __init__(self, values):
+        self.values = values
+        self.calls = 0
+        self.functions = self
+
+    def __getitem__(self, fn_name):
+        def fn(*args):
+            def call():
+                self.calls += 1
+                return self.values.get((fn_name, args), 0)
+            return SimpleNamespace(call=call)
+        return fn
+
+# Nicht-Null-Werte werden dauerhaft gecacht → wiederholte Verifies ohne RPC
+def test_positive_results_cached():
+    doc = b"\x01" * 32
+    contract = FakeContract({("fileTimestamps", (doc,)): 1745919683})
+    cache = ContractReadCache(max_entries=10, negative_ttl=60)
+    for _ in range(5):
+        assert cache.call(contract, "fileTimestamps", doc) == 1745919683
+    assert contract.calls == 1
+    assert cache.stats()["hits"] == 4 and cache.stats()["misses"] == 1
+
+# Null-Ergebnisse nur für negative_ttl, danach neuer Call
+def test_negative_results_expire():
+    contract = FakeContract({})
+    cache = ContractReadCache(max_entries=10, negative_ttl=0.05)
+    assert cache.call(contract, "fileTimestamps", b"\x02" * 32) == 0
+    assert cache.call(contract, "fileTimestamps", b"\x02" * 32) == 0
+    assert contract.calls == 1
+    time.sleep(0.06)
+    cache.call(contract, "fileTimestamps", b"\x02" * 32)
+    assert contract.calls == 2
+
+# LRU-Grenze und Invalidierung nach eigener Notarisierung
+def test_lru_bound_and_invalidate():
+    contract = FakeContract({("timestamps", (bytes([i]),)): i + 1 for i in range(5)})
+    cache = ContractReadCache(max_entries=3, negative_ttl=60)
+    for i in range(5):
+        cache.call(contract, "timestamps", bytes([i]))
+    assert cache.stats()["size"] == 3
+
+    cache.invalidate("timestamps", bytes([4]))
+    cache.call(contract, "timestamps", bytes([4]))
+    assert contract.calls == 6
@@ -0,0 +1,63 @@
+# tests/test_credentials.py
+
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+from types import SimpleNamespace
+
+import bcrypt
+import pyotp
+import pytest
+
+from app import credentials
+from app.credentials import LoginLimiter, check_login, hash_rounds, _check_login, _get_pool
+
+# Limits greifen getrennt je Account und je IP
+def test_limiter_per_account_and_ip():
+    limiter = LoginLimiter(window=60, per_account=2, per_ip=3)
+    assert limiter.allow("a@x.org", "1.1.1.1") == 0
+    assert limiter.allow("A@x.org", "2.2.2.2") == 0
+    assert limiter.allow("a@x.org", "3.3.3.3") > 0      # Account ausgeschöpft
+    assert limiter.allow("b@x.org", "1.1.1.1") == 0
+    assert limiter.allow("c@x.org", "1.1.1.1") == 0
+    assert limiter.allow("d@x.org", "1.1.1.1") > 0      # IP ausgeschöpft
+
+    limiter.reset("a@x.org")
+    assert limiter.allow("a@x.org", "4.4.4.4") == 0
+
+# Passwort, OTP und Rehash im Worker
+def test_check_login():
+    pw_hash = bcrypt.hashpw(b"Secret123", bcrypt.gensalt(4)).decode()
+    secret = pyotp.random_base32()
+    otp = pyotp.TOTP(secret).now()
+
+    assert _check_login(pw_hash, "falsch", None, None, 4) == (False, False, None)
+    assert _check_login(pw_hash, "Secret123", None, None, 4) == (True, True, None)
+    assert _check_login(pw_hash, "Secret123", secret, None, 4) == (True, False, None)
+
+    ok, otp_ok, new_hash = _check_login(pw_hash, "Secret123", secret, otp, 5)
+    assert ok and otp_ok and hash_rounds(new_hash) == 5
+    assert bcrypt.checkpw(b"Secret123", new_hash.encode())
+
+# Abgestürzter Worker → neuer Pool; Slots erst frei, wenn die Prüfung wirklich fertig ist
+def test_pool_recovers_from_broken_worker():
+    app = SimpleNamespace(config={"AUTH_WORKERS": 1, "AUTH_MAX_PENDING": 2, "AUTH_TIMEOUT": 60,
+                                  "BCRYPT_LOG_ROUNDS": 4})
+    user = SimpleNamespace(password_hash=bcrypt.hashpw(b"Secret123", bcrypt.gensalt(4)).decode(),
+                           otp_secret=None)
+    try:
+        broken, slots = _get_pool(app)
+        with pytest.raises(BrokenProcessPool):
+            broken.submit(os._exit, 1).result()
+
+        assert check_login(app, user, "Secret123", None) == (True, True, None)
+        assert credentials._pool is not broken
+
+        deadline = time.monotonic() + 5
+        while slots._value != 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert slots._value == 2
+    finally:
+        if credentials._pool is not None:
+            credentials._pool.shutdown()
+        credentials._pool = credentials._slots = None
@@ -0,0 +1,76 @@
+# tests/test_documents_endpoint.py
+
+from web3 import Web3
+
+# Notarisiertes Dokument taucht (über den Event-Index) in der Liste auf
+def test_documents_lists_notarized(client):
+    from tests.conftest import make_data
+    res = client.post("/api/notarize", data=make_data(b"ListMe", "workerList"),
+                      content_type="multipart/form-data")
+    assert res.status_code == 200
+
+    res_list = client.get("/api/documents")
+    assert res_list.status_code == 200
+    id_hashes = [d["idHash"] for d in res_list.get_json()["items"]]
+    assert Web3.keccak(text="workerList").hex() in id_hashes
+
+# Seiten schließen lückenlos über nextCursor aneinander an
+def test_documents_cursor_pagination(client):
+    from tests.conftest import make_data
+    for i in range(3):
+        res = client.post("/api/notarize", data=make_data(f"Page{i}".encode(), f"workerPage{i}"),
+                          content_type="multipart/form-data")
+        assert res.status_code == 200
+
+    everything = client.get("/api/documents?limit=1000").get_json()["items"]
+    pages, cursor = [], None
+    while True:
+        url = "/api/documents?limit=2" + (f"&cursor={cursor}" if cursor else "")
+        page = client.get(url).get_json()
+        assert len(page["items"]) <= 2
+        pages.extend(page["items"])
+        cursor = page["nextCursor"]
+        if cursor is None:
+            break
+    assert pages == everything
+
+# Ungültiger Cursor bzw. ungültiges Limit → 400
+def test_documents_invalid_cursor(client):
+    assert client.get("/api/documents?cursor=abc").status_code == 400
+    assert client.get("/api/documents?limit=0").status_code == 400
+
+# Statistik zählt neue Notarisierungen inkrementell mit
+def test_stats_counts_new_notarization(client):
+    from tests.conftest import make_data
+    before = client.get("/api/stats").get_json()["totalNotarizations"]
+
+    res = client.post("/api/notarize", data=make_data(b"CountMe", "workerStats"),
+                      content_type="multipart/form-data")
+    assert res.status_code == 200
+
+    stats = client.get("/api/stats").get_json()
+    assert stats["totalNotarizations"] == before + 1
+    assert stats["latestNotarization"]["documentHash"] == Web3.keccak(b"CountMe").hex()
+
+# Unbekannte ID → 404, nicht 403
+def test_get_document_unknown_id_not_found(client):
+    res = client.get("/api/documents/gibtsnicht")
+    assert res.status_code == 404
+
+# History einer fremden / unbekannten ID ist nicht einsehbar
+def test_history_unknown_id_forbidden(client):
+    res = client.get("/api/documents/gibtsnicht/history")
+    assert res.status_code == 403
+
+# Zeitreihe enthält die neue Notarisierung im aktuellen Tages-Bucket
+def test_stats_timeseries(client):
+    from tests.conftest import make_data
+    before = client.get("/api/stats/timeseries?granularity=day").get_json()["buckets"]
+
+    res = client.post("/api/notarize", data=make_data(b"SeriesMe", "workerSeries"),
+                      content_type="multipart/form-data")
+    assert res.status_code == 200
+
+    after = client.get("/api/stats/timeseries?granularity=day").get_json()["buckets"]
+    assert sum(b["count"] for b in after) == sum(b["count"] for b in before) + 1
+    assert client.get("/api/stats/timeseries?granularity=week").status_code == 400
@@ -0,0 +1,109 @@
+# tests/test_events.py
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import create_app, db
+from app.events import format_sse
+from app.models import NotarizationJob, NotarizedDocument, Organization
+
+@pytest.fixture
+def app(tmp_path):
+    # Datei-DB: der Follower-Thread nutzt eine eigene Verbindung
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'events.db'}",
+        "CHAIN_BACKEND": "memory",
+        "SSE_POLL_INTERVAL": 3600,
+        "SSE_MAX_CLIENTS": 3
+    })
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([Organization(id=1, name="A", chain_address="0xAA"),
+                            Organization(id=2, name="B", chain_address="0xbb")])
+        db.session.commit()
+        yield app
+
+def _doc(org, block):
+    return NotarizedDocument(id_hash=f"id{block}", document_hash=f"h{block}", org_address=org,
+                             timestamp=block, tx_hash=f"tx{block}", block_number=block, log_index=0)
+
+def _job(job_id, updated_at):
+    return NotarizationJob(id=job_id, organization_id=1, document_id="d", id_hash="i", document_hash="h",
+                           tx_hash="t", status="confirmed", updated_at=updated_at)
+
+def _drain(sub):
+    events = []
+    while not sub.queue.empty():
+        events.append(sub.queue.get_nowait())
+    return events
+
+# Ein Follower-Durchlauf verteilt neue Einträge nur an die Clients der jeweiligen Org
+def test_follower_fans_out_per_org(app):
+    db.session.add(_doc("0xaa", 1))
+    db.session.commit()
+
+    hub = app.extensions["event_hub"]
+    sub_a1 = hub.subscribe("0xAA", 1)
+    sub_a2 = hub.subscribe("0xaa", 1)
+    sub_b = hub.subscribe("0xbb", 2)
+    try:
+        # Historie vor dem Verbinden wird nicht erneut gesendet
+        db.session.add_all([_doc("0xaa", 2), _doc("0xbb", 3)])
+        db.session.add(NotarizationJob(id="job-1", organization_id=2, document_id="d", id_hash="i",
+                                       document_hash="h", tx_hash="t", status="confirmed"))
+        db.session.commit()
+        hub.poll_once()
+
+        for sub in (sub_a1, sub_a2):
+            assert [(event, data["blockNumber"]) for event, data in _drain(sub)] == [("document", 2)]
+        events_b = _drain(sub_b)
+        assert [event for event, _ in events_b] == ["document", "job"]
+        assert events_b[1][1]["status"] == "confirmed"
+
+        # Zweiter Durchlauf ohne neue Einträge → nichts
+        hub.poll_once()
+        assert _drain(sub_a1) == [] and _drain(sub_b) == []
+
+        # SSE_MAX_CLIENTS erreicht
+        assert hub.subscribe("0xaa", 1) is None
+    finally:
+        for sub in (sub_a1, sub_a2, sub_b):
+            hub.unsubscribe(sub)
+
+# Voller Puffer → Client wird als überlaufen markiert (Stream endet, Reconnect)
+def test_subscription_overflow(app):
+    app.config["SSE_QUEUE_SIZE"] = 1
+    hub = app.extensions["event_hub"]
+    sub = hub.subscribe("0xaa", 1)
+    try:
+        hub.publish("0xAA", "document", {"n": 1})
+        hub.publish("0xaa", "document", {"n": 2})
+        assert sub.overflowed
+        assert format_sse(*sub.queue.get_nowait()) == 'event: document\ndata: {"n": 1}\n\n'
+    finally:
+        hub.unsubscribe(sub)
+
+# Gleicher Zeitstempel an der Limit-Grenze und spät committete Updates gehen nicht verloren
+def test_job_cursor_ties_and_late_commits(app):
+    app.config["SSE_BATCH_LIMIT"] = 1
+    hub = app.extensions["event_hub"]
+    sub = hub.subscribe("0xaa", 1)
+    try:
+        now = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(seconds=10)
+        db.session.add_all([_job("job-a", now), _job("job-b", now)])
+        db.session.commit()
+        hub.poll_once()
+        hub.poll_once()
+        assert [data["jobId"] for _, data in _drain(sub)] == ["job-a", "job-b"]
+
+        # Commit nach dem Durchlauf, Zeitstempel aber vor dem Cursor
+        db.session.add(_job("job-late", now - timedelta(seconds=1)))
+        db.session.commit()
+        hub.poll_once()
+        assert [data["jobId"] for _, data in _drain(sub)] == ["job-late"]
+
+        hub.poll_once()
+        assert _drain(sub) == []
+    finally:
+        hub.unsubscribe(sub)
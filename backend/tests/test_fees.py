@@ -0,0 +1,68 @@
+# tests/test_fees.py
+from types import SimpleNamespace
+
+from web3 import Web3
+
+from app.fees import FeeOracle
+from app.senders import SenderPool
+
+class FakeEth:
+    def __init__(self, base_fee, tip=2):
+        self.base_fee = base_fee
+        self.tip = tip
+        self.block_calls = 0
+
+    def get_block(self, block):
+        self.block_calls += 1
+        return {"baseFeePerGas": self.base_fee} if self.base_fee is not None else {}
+
+    @property
+    def max_priority_fee(self):
+        return self.tip
+
+    @property
+    def gas_price(self):
+        return 7
+
+# EIP-1559: maxFee = 2 × Base-Fee + Tip; Vorschlag wird innerhalb der TTL wiederverwendet
+def test_fee_suggestion_is_cached():
+    eth = FakeEth(base_fee=100)
+    oracle = FeeOracle(SimpleNamespace(eth=eth), ttl=60, min_priority_fee=5)
+    assert oracle.suggest() == {"maxFeePerGas": 205, "maxPriorityFeePerGas": 5}
+    oracle.suggest()
+    assert eth.block_calls == 1
+    oracle.invalidate()
+    oracle.suggest()
+    assert eth.block_calls == 2
+
+# Chain ohne Base-Fee → Legacy-gasPrice
+def test_fee_suggestion_legacy_chain():
+    oracle = FeeOracle(SimpleNamespace(eth=FakeEth(base_fee=None)))
+    assert oracle.suggest() == {"gasPrice": 7}
+
+class FakeCall:
+    """Contract-Funktion als einfache Überweisung (ohne kompilierten Contract)."""
+    def __init__(self, to):
+        self.to = to
+
+    def estimate_gas(self, tx):
+        return 21_000
+
+    def build_transaction(self, tx):
+        return {**tx, "to": self.to, "value": 1}
+
+# Gaslimit aus eth_estimateGas × Marge, Gebühren aus dem FeeOracle
+def test_sender_pool_estimates_gas_and_fees():
+    w3 = Web3(Web3.EthereumTesterProvider())
+    contract = SimpleNamespace(functions=SimpleNamespace(
+        adminOf=lambda account: SimpleNamespace(call=lambda: "0x" + "00" * 20)
+    ))
+    sender = w3.eth.accounts[2]
+    pool = SenderPool(w3, contract, [sender], gas_margin=1.5)
+
+    tx_hash, used_sender = pool.send(FakeCall(w3.eth.accounts[3]))
+    tx = w3.eth.get_transaction(tx_hash)
+    assert used_sender == sender
+    assert tx["gas"] == 31_500
+    assert tx["maxFeePerGas"] == pool.fees.suggest()["maxFeePerGas"]
+    assert w3.eth.wait_for_transaction_receipt(tx_hash).status == 1
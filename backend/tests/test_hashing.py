@@ -0,0 +1,16 @@
+# tests/test_hashing.py
+import io
+from web3 import Web3
+from werkzeug.datastructures import FileStorage
+from app.hashing import keccak_file
+
+# Blockweises Hashen liefert denselben Hash wie w3.keccak über die ganzen Daten
+def test_streaming_hash_matches_keccak():
+    data = bytes(range(256)) * 1000
+    for chunk_size in (1, 4096, len(data), len(data) * 2):
+        file = FileStorage(io.BytesIO(data), "file.pdf")
+        assert keccak_file(file, chunk_size=chunk_size) == Web3.keccak(data)
+
+def test_streaming_hash_empty_file():
+    file = FileStorage(io.BytesIO(b""), "empty.pdf")
+    assert keccak_file(file, chunk_size=1024) == Web3.keccak(b"")
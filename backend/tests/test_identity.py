@@ -0,0 +1,47 @@
+# tests/test_identity.py
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app, db
+from app.models import Organization, User
+from app.web3utils import get_user_org_address
+
+@pytest.fixture
+def app():
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://", "BCRYPT_LOG_ROUNDS": 4})
+    with app.app_context():
+        db.create_all()
+        org = Organization(name="Org", chain_address="0x" + "11" * 20)
+        db.session.add(org)
+        db.session.flush()
+        user = User(email="id@example.org", organization_id=org.id)
+        user.set_password("secret")
+        db.session.add(user)
+        db.session.commit()
+        yield app
+
+def _count_queries():
+    statements = []
+    event.listen(db.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+# load_user + get_user_org_address + Profil: eine einzige Query
+def test_identity_single_query(app):
+    user_id = User.query.first().id
+    db.session.remove()
+
+    statements = _count_queries()
+    user = app.login_manager._user_callback(str(user_id))
+    assert get_user_org_address(user) == "0x" + "11" * 20
+    assert user.organization.name == "Org"
+    assert len(statements) == 1
+
+# Adresse kommt aus dem Cache und wird bei Änderungen der Org verworfen
+def test_org_address_cache_invalidation(app):
+    user = User.query.first()
+    assert get_user_org_address(user) == "0x" + "11" * 20
+
+    user.organization.chain_address = "0x" + "22" * 20
+    db.session.commit()
+    assert get_user_org_address(user) == "0x" + "22" * 20
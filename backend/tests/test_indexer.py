@@ -0,0 +1,69 @@
+# tests/test_indexer.py
+
+from types import SimpleNamespace
+
+import pytest
+from web3.exceptions import Web3RPCError
+
+from app import create_app, db
+from app.indexer import CHECKPOINT_NAME, fetch_logs, sync_document_index
+from app.models import IndexCheckpoint
+
+class FakeEvent:
+    """get_logs mit Limit: Bereiche über max_blocks werden wie bei Geth abgelehnt."""
+    def __init__(self, max_blocks):
+        self.max_blocks = max_blocks
+        self.ranges = []
+
+    def get_logs(self, from_block, to_block):
+        self.ranges.append((from_block, to_block))
+        if to_block - from_block + 1 > self.max_blocks:
+            raise Web3RPCError("query returned more than 10000 results")
+        return [from_block]
+
+# Bereich wird vollständig und lückenlos abgedeckt
+def test_fetch_logs_covers_range():
+    event = FakeEvent(max_blocks=1000)
+    chunks = list(fetch_logs(event, 0, 2499, 1000))
+    assert [end for end, _ in chunks] == [999, 1999, 2499]
+
+# Zu große Bereiche werden halbiert und danach wieder vergrößert
+def test_fetch_logs_shrinks_on_too_many_results():
+    event = FakeEvent(max_blocks=300)
+    chunks = list(fetch_logs(event, 0, 999, 1000))
+    starts = [logs[0] for _, logs in chunks]
+    ends = [end for end, _ in chunks]
+    assert starts[0] == 0 and ends[-1] == 999
+    assert all(s == e + 1 for s, e in zip(starts[1:], ends))
+    assert all(end - start + 1 <= 300 for start, end in zip(starts, ends))
+
+# Andere Fehler werden nicht verschluckt
+def test_fetch_logs_reraises_other_errors():
+    class Broken:
+        def get_logs(self, from_block, to_block):
+            raise Web3RPCError("execution reverted")
+    with pytest.raises(Web3RPCError):
+        list(fetch_logs(Broken(), 0, 10, 5))
+
+# Im Request nur max_chunks Chunks nachziehen; der nächste Chunk wird gar nicht erst abgefragt
+def test_sync_document_index_max_chunks():
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+        "AUTH_WORKERS": 0,
+        "INDEX_LOG_CHUNK_BLOCKS": 1000
+    })
+    event = FakeEvent(max_blocks=1000)
+    event.get_logs = lambda from_block, to_block: event.ranges.append((from_block, to_block)) or []
+    app.extensions["chain"] = SimpleNamespace(
+        w3=SimpleNamespace(eth=SimpleNamespace(block_number=2499)),
+        contract=SimpleNamespace(events=SimpleNamespace(DocumentNotarized=event))
+    )
+    with app.app_context():
+        db.create_all()
+        sync_document_index(max_chunks=2)
+        assert db.session.get(IndexCheckpoint, CHECKPOINT_NAME).last_block == 1999
+        assert event.ranges == [(0, 999), (1000, 1999)]
+
+        sync_document_index()
+        assert db.session.get(IndexCheckpoint, CHECKPOINT_NAME).last_block == 2499
@@ -0,0 +1,76 @@
+# tests/test_jobs.py
+
+import time
+from types import SimpleNamespace
+
+import pytest
+from hexbytes import HexBytes
+from web3.exceptions import TimeExhausted, TransactionNotFound
+
+from app import create_app, db
+from app.jobs import _wait_for_receipt, record_replacement, refresh_job
+from app.models import NotarizationJob, Organization
+
+OLD, NEW = HexBytes("33" * 32), HexBytes("44" * 32)
+
+class FakeChain:
+    """Receipts erst nach mine(tx_hash); der Sender-Pool kennt nur Ersetzungen."""
+    def __init__(self):
+        self.receipts = {}
+        self.replacements = {}
+        self.w3 = SimpleNamespace(eth=self)
+        self.sender_pool = SimpleNamespace(replacement_for=lambda h: self.replacements.get(HexBytes(h), HexBytes(h)))
+
+    def mine(self, tx_hash):
+        self.receipts[tx_hash] = SimpleNamespace(status=1, blockNumber=12, transactionHash=tx_hash)
+
+    def wait_for_transaction_receipt(self, tx_hash, timeout=None):
+        if HexBytes(tx_hash) not in self.receipts:
+            time.sleep(timeout)
+            raise TimeExhausted("nicht gemined")
+        return self.receipts[HexBytes(tx_hash)]
+
+    def get_transaction_receipt(self, tx_hash):
+        if HexBytes(tx_hash) not in self.receipts:
+            raise TransactionNotFound("unbekannt")
+        return self.receipts[HexBytes(tx_hash)]
+
+    def invalidate_document(self, id_hash, doc_hash):
+        pass
+
+@pytest.fixture
+def app():
+    app = create_app({"TESTING": True, "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:", "AUTH_WORKERS": 0,
+                      "RECEIPT_TIMEOUT": 0.2})
+    app.extensions["chain"] = FakeChain()
+    with app.app_context():
+        db.create_all()
+        db.session.add(Organization(id=1, name="TestOrg", chain_address="0x" + "ab" * 20))
+        db.session.add(NotarizationJob(id="job-1", organization_id=1, document_id="d", id_hash="11" * 32,
+                                       document_hash="22" * 32, tx_hash=OLD.hex()))
+        db.session.commit()
+        yield app
+
+# Receipt-Timeout → Job bleibt pending; nach dem Mining bestätigt ihn refresh_job
+def test_receipt_timeout_keeps_job_pending(app):
+    _wait_for_receipt(app, "job-1", OLD)
+    job = db.session.get(NotarizationJob, "job-1")
+    assert job.status == "pending"
+
+    app.extensions["chain"].mine(OLD)
+    assert refresh_job(job).status == "confirmed"
+    assert job.block_number == 12
+
+# Ersetzte Transaktion: Job-Zeile und Tracker folgen dem neuen Hash
+def test_replaced_transaction_confirms_job(app):
+    chain = app.extensions["chain"]
+    chain.replacements[OLD] = NEW
+    chain.mine(NEW)
+    record_replacement(app, OLD, NEW)
+    assert db.session.get(NotarizationJob, "job-1").tx_hash == NEW.hex()
+
+    # Tracker mit dem alten Hash gestartet
+    _wait_for_receipt(app, "job-1", OLD)
+    db.session.expire_all()
+    job = db.session.get(NotarizationJob, "job-1")
+    assert (job.status, job.tx_hash) == ("confirmed", NEW.hex())
@@ -12,13 +12,15 @@ def client():
         "TESTING": True,
         "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
         "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+        "BCRYPT_LOG_ROUNDS": 4,
+        "LOGIN_MAX_ATTEMPTS_PER_ACCOUNT": 3,
     }
     app = create_app(test_config)
 
     # 2) Tabellen erzeugen und Daten anlegen
     with app.app_context():
         db.create_all()
-        org = Organization(name="TestOrg")
+        org = Organization(name="TestOrg", chain_address="0x" + "ab" * 20)
         user = User(email="alice@test.org", organization=org)
         user.set_password("Secret123")
         user.generate_otp_secret()
@@ -50,3 +52,28 @@ def test_login_failure(client):
     })
     assert res.status_code == 401
     assert "error" in res.get_json()
+
+# Nach LOGIN_MAX_ATTEMPTS_PER_ACCOUNT Versuchen wird ohne Hash-Prüfung abgewiesen
+def test_login_throttled(client):
+    for _ in range(3):
+        res = client.post("/login", data={"email": "alice@test.org", "password": "WrongPassword"})
+        assert res.status_code == 401
+    res = client.post("/login", data={"email": "alice@test.org", "password": "Secret123"})
+    assert res.status_code == 429
+    assert int(res.headers["Retry-After"]) > 0
+
+# Geänderter Work-Faktor → Hash wird beim Login neu erzeugt
+def test_login_rehashes_on_changed_rounds(client):
+    from app.models import User
+    from app.credentials import hash_rounds
+    client.application.config["BCRYPT_LOG_ROUNDS"] = 5
+    with client.application.app_context():
+        user = User.query.filter_by(email="alice@test.org").first()
+        otp = pyotp.TOTP(user.otp_secret).now()
+
+    res = client.post("/login", data={"email": "alice@test.org", "password": "Secret123", "otp": otp})
+    assert res.status_code == 200
+    with client.application.app_context():
+        user = User.query.filter_by(email="alice@test.org").first()
+        assert hash_rounds(user.password_hash) == 5
+        assert user.check_password("Secret123")
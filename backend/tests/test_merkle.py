@@ -0,0 +1,23 @@
+# tests/test_merkle.py
+from web3 import Web3
+from app.merkle import leaf_hash, build_tree, get_proof, verify_proof
+
+def make_leaves(n):
+    return [leaf_hash(Web3.keccak(text=f"id{i}"), Web3.keccak(text=f"doc{i}")) for i in range(n)]
+
+# Jeder Proof führt zur Root – auch bei ungerader Blattanzahl
+def test_every_leaf_proves_against_root():
+    for n in (1, 2, 3, 7, 16):
+        leaves = make_leaves(n)
+        levels = build_tree(leaves)
+        root = levels[-1][0]
+        for i, leaf in enumerate(leaves):
+            assert verify_proof(leaf, get_proof(levels, i), root)
+
+# Fremdes Blatt / falsches Dokument wird abgelehnt
+def test_foreign_leaf_rejected():
+    leaves = make_leaves(5)
+    levels = build_tree(leaves)
+    root = levels[-1][0]
+    other = leaf_hash(Web3.keccak(text="id0"), Web3.keccak(text="geaendert"))
+    assert not verify_proof(other, get_proof(levels, 0), root)
@@ -0,0 +1,62 @@
+# tests/test_metrics.py
+
+from web3 import Web3
+
+from sqlalchemy import text
+
+from app import create_app, db
+from app.metrics import DB_QUERIES, RpcMetricsMiddleware, RPC_REQUESTS, PENDING_TRANSACTIONS
+
+TX_HASH = "0x" + "ab" * 32
+
+class FakeProvider(Web3.HTTPProvider):
+    """Antwortet lokal; Receipts gibt es erst nach dem Senden."""
+    def make_request(self, method, params):
+        if method == "eth_sendTransaction":
+            return {"jsonrpc": "2.0", "id": 1, "result": TX_HASH}
+        if method == "eth_getTransactionReceipt":
+            return {"jsonrpc": "2.0", "id": 1, "result": {"transactionHash": TX_HASH}}
+        return {"jsonrpc": "2.0", "id": 1, "result": "0x" + "00" * 32}
+
+    def make_batch_request(self, requests):
+        return [{"jsonrpc": "2.0", "id": i, "result": "0x" + "00" * 32} for i, _ in enumerate(requests)]
+
+def _value(metric):
+    return metric._value.get()
+
+# /metrics liefert das Prometheus-Textformat inkl. Route-Latenzen
+def test_metrics_endpoint():
+    client = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"}).test_client()
+    client.get("/api/documents")  # 302/401 ohne Login, wird trotzdem gemessen
+    res = client.get("/metrics")
+    assert res.status_code == 200
+    assert res.content_type.startswith("text/plain")
+    body = res.get_data(as_text=True)
+    assert 'notary_http_request_duration_seconds_count{method="GET",route="/api/documents"' in body
+
+# Middleware zählt Einzel- und Batch-Calls und führt den Pending-Gauge
+def test_rpc_middleware_counts_calls():
+    w3 = Web3(FakeProvider("http://node.invalid"))
+    w3.middleware_onion.add(RpcMetricsMiddleware, "rpc_metrics")
+    before = _value(RPC_REQUESTS.labels("eth_call"))
+
+    send_batch = w3.provider.batch_request_func(w3, w3.middleware_onion)
+    send_batch([("eth_call", [{"to": "0x" + "11" * 20, "data": "0x"}, "latest"])] * 3)
+    assert _value(RPC_REQUESTS.labels("eth_call")) == before + 3
+
+    make_request = RpcMetricsMiddleware(w3).wrap_make_request(w3.provider.make_request)
+    make_request("eth_sendTransaction", [{"from": "0x" + "22" * 20}])
+    pending = _value(PENDING_TRANSACTIONS)
+    make_request("eth_getTransactionReceipt", [TX_HASH])
+    assert _value(PENDING_TRANSACTIONS) == pending - 1
+
+# Query-Zähler nur an den Engines von Apps mit METRICS_ENABLED
+def test_query_counter_only_when_enabled():
+    def count_query(app):
+        with app.app_context():
+            before = _value(DB_QUERIES)
+            db.session.execute(text("SELECT 1"))
+            return _value(DB_QUERIES) - before
+
+    assert count_query(create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://", "METRICS_ENABLED": False})) == 0
+    assert count_query(create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"})) == 1
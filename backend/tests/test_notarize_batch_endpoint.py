@@ -0,0 +1,39 @@
+# tests/test_notarize_batch_endpoint.py
+import io
+
+def make_batch(*docs):
+    return {
+        "documentId": [doc_id for doc_id, _ in docs],
+        "file": [(io.BytesIO(content), f"{doc_id}.pdf") for doc_id, content in docs]
+    }
+
+# Kein File mitgegeben
+def test_batch_no_file(client):
+    res = client.post("/api/notarize/batch", data={"documentId": ["a"]},
+                      content_type="multipart/form-data")
+    assert res.status_code == 400
+
+# Mehrere neue Dokumente → alle notarisiert
+def test_batch_notarizes_all(client):
+    res = client.post("/api/notarize/batch",
+                      data=make_batch(("batch1", b"B1"), ("batch2", b"B2"), ("batch3", b"B3")),
+                      content_type="multipart/form-data")
+    assert res.status_code == 200
+    body = res.get_json()
+    assert body["notarized"] == 3
+    assert all(r["status"] == "notarized" and r["txHash"] for r in body["results"])
+
+# Ergebnis je Dokument: bereits notarisierte / geänderte Dokumente werden abgelehnt
+def test_batch_reports_per_document(client):
+    from tests.conftest import make_data
+    assert client.post("/api/notarize", data=make_data(b"Orig", "batchOld"),
+                       content_type="multipart/form-data").status_code == 200
+
+    res = client.post("/api/notarize/batch",
+                      data=make_batch(("batchOld", b"Orig"), ("batchOld", b"Mod"), ("batchNew", b"New")),
+                      content_type="multipart/form-data")
+    assert res.status_code == 200
+    results = res.get_json()["results"]
+    assert results[0]["error"] == "Schon notariell hinterlegt"
+    assert results[1]["error"] == "Dokument darf nicht geändert werden"
+    assert results[2]["status"] == "notarized"
@@ -49,3 +49,46 @@ def test_same_file_diff_id_allowed(client):
     data2 = make_data(b"Common", "workerB")
     assert client.post("/api/notarize", data=data1, content_type="multipart/form-data").status_code == 200
     assert client.post("/api/notarize", data=data2, content_type="multipart/form-data").status_code == 200
+
+# Job-Modus: sofort 202 mit Job-ID, Status über /api/jobs/<id>
+def test_notarize_async_job(client):
+    import time
+    from tests.conftest import make_data
+    res = client.post("/api/notarize?async=1", data=make_data(b"AsyncDoc", "workerAsync"),
+                      content_type="multipart/form-data")
+    assert res.status_code == 202
+    job_id = res.get_json()["jobId"]
+
+    for _ in range(50):
+        job = client.get(f"/api/jobs/{job_id}").get_json()
+        if job["status"] != "pending":
+            break
+        time.sleep(0.1)
+    assert job["status"] == "confirmed"
+    assert job["blockNumber"] > 0
+
+def test_unknown_job_not_found(client):
+    res = client.get("/api/jobs/gibtsnicht")
+    assert res.status_code == 404
+
+# Notarisierung per vorberechnetem Hash – gleiche Regeln wie beim Upload
+def test_notarize_by_hash(client):
+    from web3 import Web3
+    from tests.conftest import make_data
+    doc_hash = Web3.keccak(b"HashOnly").hex()
+    res = client.post("/api/notarize/hash", json={"documentId": "workerHash", "documentHash": doc_hash})
+    assert res.status_code == 200
+
+    # Dieselbe Datei per Upload → schon notarisiert; verifizierbar ohne Upload
+    res2 = client.post("/api/notarize", data=make_data(b"HashOnly", "workerHash"),
+                       content_type="multipart/form-data")
+    assert res2.get_json()["error"] == "Schon notariell hinterlegt"
+    res3 = client.post("/api/verify/batch", json={"hashes": [doc_hash]})
+    assert res3.get_json()["verified"] == 1
+
+def test_notarize_by_hash_invalid(client):
+    res = client.post("/api/notarize/hash", json={"documentId": "x", "documentHash": "0x1234"})
+    assert res.status_code == 400
+    assert res.get_json() == {"error": "Ungültiger Hash"}
+    res = client.post("/api/notarize/hash", json={"documentHash": "0x" + "ab" * 32})
+    assert res.get_json() == {"error": "No documentId provided"}
@@ -0,0 +1,124 @@
+# tests/test_prefilter.py
+
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+from web3 import Web3
+
+from app import create_app, db
+from app.models import IndexCheckpoint, NotarizedDocument
+from app.prefilter import DocumentPrefilter, ScalableBloomFilter
+
+def doc_hash(i):
+    return bytes(Web3.keccak(text=f"doc-{i}"))
+
+class FakeEvent:
+    """DocumentNotarized.get_logs über eine Liste (Block, Dateihash)."""
+    def __init__(self):
+        self.logs = []
+        self.ranges = []
+
+    def get_logs(self, from_block, to_block):
+        self.ranges.append((from_block, to_block))
+        return [SimpleNamespace(args=SimpleNamespace(documentHash=h))
+                for block, h in self.logs if from_block <= block <= to_block]
+
+class FakeChain:
+    def __init__(self, config):
+        self.config = config
+        self.event = FakeEvent()
+        self.w3 = SimpleNamespace(eth=SimpleNamespace(block_number=0))
+        self.contract = SimpleNamespace(address="0x" + "12" * 20,
+                                        events=SimpleNamespace(DocumentNotarized=self.event))
+
+    def notarize(self, block, h):
+        self.event.logs.append((block, h))
+        self.w3.eth.block_number = max(self.w3.eth.block_number, block)
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": "sqlite://",
+        "PREFILTER_REORG_DEPTH": 2,
+        "PREFILTER_SNAPSHOT_PATH": str(tmp_path / "prefilter.bin")
+    })
+    with app.app_context():
+        db.create_all()
+        yield app
+
+# Alle eingefügten Hashes werden gefunden; Fehlalarme bleiben unter der Fehlerrate, auch nach dem Wachsen
+def test_scalable_bloom_filter():
+    bloom = ScalableBloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(5000):
+        bloom.add(doc_hash(i))
+    assert len(bloom.layers) > 1
+    assert all(doc_hash(i) in bloom for i in range(5000))
+    false_positives = sum(doc_hash(i) in bloom for i in range(5000, 25000))
+    assert false_positives / 20000 < 0.01
+
+# Aufbau aus dem Event-Index, danach inkrementell aus neuen Blöcken
+def test_prefilter_follows_chain(app):
+    db.session.add_all([
+        NotarizedDocument(id_hash="aa", document_hash=doc_hash(1).hex(), org_address="0xaa",
+                          timestamp=1, tx_hash="t1", block_number=5, log_index=0),
+        IndexCheckpoint(name="DocumentNotarized", last_block=5)
+    ])
+    db.session.commit()
+    chain = FakeChain(app.config)
+    chain.w3.eth.block_number = 5
+    prefilter = DocumentPrefilter(chain)
+
+    # Aufbau läuft im Hintergrund; bis dahin gelten alle Hashes als Kandidaten
+    assert prefilter.candidates([doc_hash(1), doc_hash(2)]) == [doc_hash(1), doc_hash(2)]
+    prefilter._thread.join()
+    assert prefilter.candidates([doc_hash(1), doc_hash(2)]) == [doc_hash(1)]
+    # Index bis Block 5 aus der DB, per eth_getLogs nur die letzten Blöcke
+    assert chain.event.ranges == [(4, 5)]
+
+    # Neuer Block – bis PREFILTER_MAX_STALENESS gilt der Filter noch, danach wird nachgezogen
+    chain.notarize(7, doc_hash(2))
+    assert prefilter.candidates([doc_hash(2)]) == []
+    prefilter.refreshed_at = time.monotonic() - app.config["PREFILTER_MAX_STALENESS"] - 1
+    assert prefilter.candidates([doc_hash(2)]) == [doc_hash(2)]
+    prefilter._thread.join()
+    assert prefilter.candidates([doc_hash(2)]) == [doc_hash(2)]
+    assert chain.event.ranges[-1] == (4, 7)
+
+    # Eigene Notarisierungen zählen sofort
+    prefilter.add(doc_hash(3))
+    assert prefilter.candidates([doc_hash(3)]) == [doc_hash(3)]
+
+# Snapshot: Neustart ohne Index-Scan, nur Blöcke seit dem Snapshot
+def test_prefilter_snapshot(app):
+    chain = FakeChain(app.config)
+    for i in range(10):
+        chain.notarize(i + 1, doc_hash(i))
+    prefilter = DocumentPrefilter(chain)
+    prefilter.refresh()
+    prefilter.save_snapshot()
+    assert os.path.exists(app.config["PREFILTER_SNAPSHOT_PATH"])
+
+    chain.notarize(11, doc_hash(10))
+    chain.event.ranges.clear()
+    restarted = DocumentPrefilter(chain)
+    restarted.candidates([doc_hash(0)])
+    restarted._thread.join()
+    assert restarted.candidates([doc_hash(i) for i in range(12)]) == [doc_hash(i) for i in range(11)]
+    assert chain.event.ranges == [(9, 11)]
+
+    # Abgeschnittener Snapshot → Warnung und Neuaufbau statt IndexError beim Lookup
+    path = app.config["PREFILTER_SNAPSHOT_PATH"]
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 1)
+    truncated = DocumentPrefilter(chain)
+    truncated.refresh()
+    assert truncated.candidates([doc_hash(i) for i in range(12)]) == [doc_hash(i) for i in range(11)]
+    assert chain.event.ranges[-1] == (0, 11)
+
+    # Snapshot eines anderen Contracts wird ignoriert
+    chain.contract.address = "0x" + "34" * 20
+    other = DocumentPrefilter(chain)
+    other.refresh()
+    assert other.block == 11 and chain.event.ranges[-1] == (0, 11)
@@ -0,0 +1,71 @@
+# tests/test_profiling.py
+
+import pstats
+
+import pytest
+
+from app import create_app, db
+from app.models import Organization, User
+
+ORG_ADDRESS = "0x" + "ab" * 20
+
+def make_app(tmp_path, **config):
+    # Ohne Chain-Zugriff: /user/profile liest nur die DB
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+        "AUTH_WORKERS": 0,
+        "BCRYPT_LOG_ROUNDS": 4,
+        "PROFILING_DIR": str(tmp_path / "profiles"),
+        **config
+    })
+    with app.app_context():
+        db.create_all()
+        org = Organization(name="TestOrg", chain_address=ORG_ADDRESS)
+        user = User(email="alice@test.org", organization=org)
+        user.set_password("Secret123")
+        db.session.add_all([org, user])
+        db.session.commit()
+    return app
+
+@pytest.fixture
+def client(tmp_path):
+    app = make_app(tmp_path, PROFILING_ENABLED=True, PROFILING_TOKEN="geheim")
+    client = app.test_client()
+    assert client.post("/login", data={"email": "alice@test.org", "password": "Secret123"}).status_code == 200
+    return client
+
+def profiles(tmp_path):
+    return sorted(p.name for p in (tmp_path / "profiles").iterdir())
+
+# Ausgeschaltet: keine Hooks, kein Ausgabeverzeichnis
+def test_disabled_profiling_registers_nothing(tmp_path):
+    app = make_app(tmp_path, PROFILING_TOKEN="geheim")
+    hooks = [f.__name__ for f in app.before_request_funcs.get(None, [])]
+    assert "_start_profile" not in hooks
+    assert not (tmp_path / "profiles").exists()
+
+# Header mit Token → pstats + Collapsed Stacks, benannt nach Route und Org
+def test_header_triggers_profile(client, tmp_path):
+    assert client.get("/user/profile", headers={"X-Profile": "falsch"}).status_code == 200
+    assert client.get("/user/profile").status_code == 200
+    assert profiles(tmp_path) == []
+
+    assert client.get("/user/profile", headers={"X-Profile": "geheim"}).status_code == 200
+    names = profiles(tmp_path)
+    assert len(names) == 2
+    assert all(f"-user_profile-{ORG_ADDRESS}-" in name for name in names)
+
+    prof = next(tmp_path.joinpath("profiles", n) for n in names if n.endswith(".prof"))
+    functions = {func for _, _, func in pstats.Stats(str(prof)).stats}
+    assert "user_profile" in functions
+    collapsed = next(tmp_path.joinpath("profiles", n) for n in names if n.endswith(".collapsed"))
+    for line in collapsed.read_text().splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0 and stack
+
+# Sampling-Rate 1 profilt auch ohne Header (nicht eingeloggt → Org "anonymous")
+def test_sample_rate_profiles_without_header(tmp_path):
+    client = make_app(tmp_path, PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=1.0).test_client()
+    client.get("/user/profile")
+    assert any("-anonymous-" in name for name in profiles(tmp_path))
@@ -0,0 +1,123 @@
+# tests/test_rpc.py
+
+import time
+
+import pytest
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+from app.rpc import EndpointSet, MultiEndpointProvider
+
+class FakeNode:
+    """Provider eines Nodes: feste Latenz, optional Verbindungsfehler oder Timeout nach dem Senden."""
+    def __init__(self, name, latency=0.0, block=100):
+        self.name = name
+        self.latency = latency
+        self.block = block
+        self.down = False
+        self.stalled = False
+        self.calls = []
+
+    def make_request(self, method, params):
+        self.calls.append(method)
+        time.sleep(self.latency)
+        if self.down:
+            # So meldet requests einen abgelehnten Verbindungsaufbau
+            refused = NewConnectionError(None, f"{self.name} nicht erreichbar")
+            raise requests.ConnectionError(MaxRetryError(None, self.name, reason=refused))
+        if self.stalled:
+            raise requests.ReadTimeout(f"{self.name} antwortet nicht")
+        if method == "eth_blockNumber":
+            return {"jsonrpc": "2.0", "id": 1, "result": hex(self.block)}
+        return {"jsonrpc": "2.0", "id": 1, "result": self.name}
+
+def make_provider(*nodes, **routing):
+    provider = MultiEndpointProvider([node.name for node in nodes], health_interval=3600, **routing)
+    provider._providers = {node.name: node for node in nodes}
+    return provider
+
+def latency_of(provider, name):
+    return next(e for e in provider.endpoints if e.url == name).ewma
+
+# Reads gehen an den Node mit der kleinsten gemessenen Latenz
+def test_reads_prefer_fastest_node():
+    slow, fast = FakeNode("slow", latency=0.02), FakeNode("fast")
+    provider = make_provider(slow, fast)
+    for _ in range(10):
+        provider.make_request("eth_call", [])
+    assert latency_of(provider, "fast") < latency_of(provider, "slow")
+    assert provider.make_request("eth_call", [])["result"] == "fast"
+
+# Antwortet der beste Node langsamer als sein p95, beantwortet der zweite den Read
+def test_slow_read_is_hedged():
+    a, b = FakeNode("a", latency=0.001), FakeNode("b", latency=0.003)
+    provider = make_provider(a, b, hedge_min_delay=0.01)
+    for _ in range(30):
+        provider.make_request("eth_call", [])
+    assert provider.make_request("eth_call", [])["result"] == "a"
+
+    a.latency = 0.5
+    started = time.perf_counter()
+    assert provider.make_request("eth_call", [])["result"] == "b"
+    assert time.perf_counter() - started < 0.2
+
+# Transaktionen bleiben beim ersten Node; bei Ausfall Failover, Probe nimmt ihn wieder auf
+def test_failover_and_health_probe():
+    primary, backup = FakeNode("primary"), FakeNode("backup")
+    provider = make_provider(primary, backup)
+    assert provider.make_request("eth_sendTransaction", [])["result"] == "primary"
+
+    primary.down = True
+    assert provider.make_request("eth_sendTransaction", [])["result"] == "backup"
+    assert provider.make_request("eth_call", [])["result"] == "backup"
+
+    # Wieder erreichbar, aber zu weit hinter dem Head → bleibt ausgeschlossen
+    primary.down = False
+    primary.block = 90
+    provider.probe()
+    assert provider.make_request("eth_sendTransaction", [])["result"] == "backup"
+
+    primary.block = 100
+    provider.probe()
+    assert provider.make_request("eth_sendTransaction", [])["result"] == "primary"
+
+    backup.down = primary.down = True
+    with pytest.raises(requests.ConnectionError):
+        provider.make_request("eth_sendTransaction", [])
+
+# Timeout nach dem Senden: Transaktion nicht an einen zweiten Node (Doppel-Überweisung)
+def test_write_not_resent_after_timeout():
+    primary, backup = FakeNode("primary"), FakeNode("backup")
+    provider = make_provider(primary, backup)
+    primary.stalled = True
+    with pytest.raises(requests.ReadTimeout):
+        provider.make_request("eth_sendTransaction", [])
+    assert backup.calls == []
+
+    # Nonce-Abfragen und Reads dürfen wechseln
+    assert provider.make_request("eth_getTransactionCount", [])["result"] == "backup"
+
+# Nach einem Receipt lesen nur Nodes, die dessen Block kennen; nachhängende sind kein Hedge-Ziel
+def test_reads_after_write_pinned_to_current_nodes():
+    lagging, current = FakeNode("lagging", block=98), FakeNode("current", latency=0.005)
+    provider = make_provider(lagging, current)
+    provider.probe()
+    for _ in range(5):
+        provider.make_request("eth_call", [])
+    assert provider.make_request("eth_call", [])["result"] == "lagging"
+
+    endpoint = next(e for e in provider.endpoints if e.url == "current")
+    provider.endpoints.observe_response(endpoint, "eth_getTransactionReceipt",
+                                        {"result": {"blockNumber": hex(100)}})
+    ranked, hedgeable = provider.endpoints.ranked()
+    assert [e.url for e in ranked] == ["current", "lagging"] and hedgeable == 1
+    assert provider.make_request("eth_call", [])["result"] == "current"
+
+    lagging.block = 100
+    provider.probe()
+    assert provider.make_request("eth_call", [])["result"] == "lagging"
+
+# Metrik-Labels ohne Pfad, Query und Zugangsdaten
+def test_endpoint_labels_are_redacted():
+    endpoints = EndpointSet(["https://user:pw@mainnet.example.io/v3/SECRET?key=x", "http://node-b:8545"])
+    assert [e.label for e in endpoints] == ["0:https://mainnet.example.io", "1:http://node-b:8545"]
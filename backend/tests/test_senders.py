@@ -0,0 +1,115 @@
+# tests/test_senders.py
+import threading
+from types import SimpleNamespace
+
+import pytest
+from hexbytes import HexBytes
+
+from app.senders import NonceManager, NoSenderError, SenderPool
+
+class FakeEth:
+    def __init__(self, count):
+        self.count = count
+        self.calls = 0
+
+    def get_transaction_count(self, address, block="latest"):
+        self.calls += 1
+        return self.count
+
+def make_manager(count=5):
+    eth = FakeEth(count)
+    return NonceManager(SimpleNamespace(eth=eth), "0xabc", stuck_timeout=120), eth
+
+# Parallele Threads bekommen lückenlose, eindeutige Nonces – mit nur einem RPC-Call
+def test_concurrent_reservations_are_unique():
+    manager, eth = make_manager(count=5)
+    nonces = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(50):
+            nonce = manager.reserve()
+            with lock:
+                nonces.append(nonce)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(nonces) == list(range(5, 5 + 400))
+    assert eth.calls == 1
+
+# Nach einem Fehler wird die Nonce-Lücke über den Node-Stand wieder gefüllt
+def test_resync_fills_gap():
+    manager, eth = make_manager(count=0)
+    manager.sent(manager.reserve(), {}, b"")
+    assert manager.reserve() == 1   # Senden schlägt fehl → Nonce 1 nie beim Node
+    manager.resync(1)
+    eth.count = 1
+    assert manager.reserve() == 1
+
+# Solange andere Nonces reserviert sind, wird nicht neu gelesen – keine doppelte Nonce
+def test_resync_waits_for_open_reservations():
+    manager, eth = make_manager(count=0)
+    first = manager.reserve()        # anderer Thread, sendet noch
+    failed = manager.reserve()
+    manager.resync(failed)
+    assert manager.reserve() == 2
+    manager.sent(first, {}, b"")
+    manager.resync(2)
+    assert manager.reserve() == 1    # jetzt Node-Stand, Lücke wird gefüllt
+    assert eth.calls == 2
+
+# Ersetzen hängender Transaktionen: RPC-Calls ohne gehaltenen Lock
+def test_replace_stuck_sends_outside_lock():
+    manager, eth = make_manager(count=0)
+    manager.stuck_timeout = -1
+    locked = []
+
+    def send_transaction(tx):
+        locked.append(manager._lock.locked())
+        return HexBytes("02" * 32)
+    eth.send_transaction = send_transaction
+    manager.sent(manager.reserve(), {"maxFeePerGas": 8}, HexBytes("01" * 32))
+    manager.replace_stuck()
+    assert locked == [False]
+    assert manager._in_flight[0][:2] == ({"maxFeePerGas": 10}, HexBytes("02" * 32))
+
+ORG_A, ORG_B = "0x" + "aa" * 20, "0x" + "bb" * 20
+DEFAULT = "0x" + "cc" * 20
+
+def make_pool(admin_of, admin_ttl=300):
+    contract = SimpleNamespace(functions=SimpleNamespace(
+        adminOf=lambda account: SimpleNamespace(call=lambda: admin_of.get(account.lower(), "0x" + "00" * 20))
+    ))
+    w3 = SimpleNamespace(eth=SimpleNamespace(accounts=[DEFAULT]))
+    return SenderPool(w3, contract, [DEFAULT], fees=object(), admin_ttl=admin_ttl)
+
+# Ein Default-Account, der Admin einer anderen Org ist, sendet nie für diese Org
+def test_no_sender_for_foreign_org():
+    pool = make_pool({DEFAULT: ORG_B})
+    assert pool.account_for(ORG_B).lower() == DEFAULT
+    with pytest.raises(NoSenderError):
+        pool.account_for(ORG_A)
+
+# Ein später ernannter Admin greift nach Ablauf von admin_ttl
+def test_admin_of_is_refreshed():
+    admin_of = {}
+    pool = make_pool(admin_of, admin_ttl=0)
+    with pytest.raises(NoSenderError):
+        pool.account_for(ORG_A)
+    admin_of[DEFAULT] = ORG_A
+    assert pool.account_for(ORG_A).lower() == DEFAULT
+
+# Ersetzte Transaktionen: Kette alter → neuer Hash, Listener wird benachrichtigt
+def test_replacement_mapping():
+    pool = make_pool({})
+    seen = []
+    pool.on_replace = lambda old, new: seen.append((old, new))
+    pool._replaced(HexBytes("01" * 32), HexBytes("02" * 32))
+    pool._replaced(HexBytes("02" * 32), HexBytes("03" * 32))
+    assert pool.replacement_for("0x" + "01" * 32) == HexBytes("03" * 32)
+    assert pool.replacement_for(HexBytes("09" * 32)) == HexBytes("09" * 32)
+    assert len(seen) == 2
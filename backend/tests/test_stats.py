@@ -0,0 +1,40 @@
+# tests/test_stats.py
+
+import pytest
+
+from app import create_app, db
+from app.models import NotarizedDocument
+from app.stats import record_notarizations, get_org_stats, get_timeseries
+
+@pytest.fixture
+def app():
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"})
+    with app.app_context():
+        db.create_all()
+        yield app
+
+def _doc(org, doc_hash, timestamp, block):
+    return NotarizedDocument(id_hash=doc_hash, document_hash=doc_hash, org_address=org,
+                             timestamp=timestamp, tx_hash=f"tx{block}", block_number=block, log_index=0)
+
+# Aggregate werden über mehrere Index-Chunks fortgeschrieben
+def test_record_notarizations_accumulates(app):
+    record_notarizations([_doc("0xa", "h1", 3600, 1), _doc("0xb", "h2", 3700, 2)])
+    db.session.commit()
+    record_notarizations([_doc("0xa", "h3", 90000, 3), _doc("0xa", "h4", 7300, 4)])
+    db.session.commit()
+
+    stats = get_org_stats("0xa")
+    assert stats["totalNotarizations"] == 3
+    assert stats["latestNotarization"] == {"documentHash": "h3", "timestamp": 90000}
+    assert get_org_stats("0xb")["totalNotarizations"] == 1
+
+    assert get_timeseries("0xa", "day", 0, 2 * 86400) == [
+        {"start": 0, "count": 2}, {"start": 86400, "count": 1}
+    ]
+    hours = get_timeseries("0xa", "hour", 3600, 3 * 3600)
+    assert hours == [{"start": 3600, "count": 1}, {"start": 7200, "count": 1}]
+
+# Unbekannte Org: leere Kennzahlen
+def test_stats_unknown_org(app):
+    assert get_org_stats("0xnone") == {"totalNotarizations": 0, "latestNotarization": None}
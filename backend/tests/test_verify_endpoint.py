@@ -15,6 +15,20 @@ def test_verify_not_notarized(client):
     assert res.status_code == 404
     assert res.get_json() == {"verified": False}
 
+# Unbekannte Datei: der Prefilter beantwortet den Lookup ohne fileTimestamps-Call
+def test_verify_not_notarized_skips_chain(client):
+    from tests.conftest import make_data
+    from app.web3utils import get_chain
+    client.post("/api/verify", data={"file": make_data(b"Erster", "x")["file"]},
+                content_type="multipart/form-data")
+    with client.application.app_context():
+        misses = get_chain().read_cache.misses
+    res = client.post("/api/verify", data={"file": make_data(b"Nie notarisiert", "x")["file"]},
+                      content_type="multipart/form-data")
+    assert res.status_code == 404
+    with client.application.app_context():
+        assert get_chain().read_cache.misses == misses
+
 # Nach erfolgreicher Notarisierung verifizieren
 def test_verify_after_notarize(client):
     from tests.conftest import make_data
@@ -31,3 +45,29 @@ def test_verify_after_notarize(client):
     json_data = res_ver.get_json()
     assert json_data.get("verified") is True
     assert json_data.get("timestamp") > 0
+
+# Bulk-Verifikation über vorberechnete Hashes (JSON)
+def test_verify_batch_hashes(client):
+    from tests.conftest import make_data
+    from web3 import Web3
+    assert client.post("/api/notarize", data=make_data(b"BulkInhalt", "workerBulk"),
+                       content_type="multipart/form-data").status_code == 200
+
+    known = Web3.keccak(b"BulkInhalt").hex()
+    unknown = Web3.keccak(b"NieNotarisiert").hex()
+    res = client.post("/api/verify/batch", json={"hashes": [known, unknown, "kein-hash"]})
+    assert res.status_code == 200
+    body = res.get_json()
+    assert body["total"] == 3 and body["verified"] == 1
+    assert body["results"][0]["verified"] is True and body["results"][0]["timestamp"] > 0
+    assert body["results"][1]["verified"] is False
+    assert body["results"][2]["error"] == "Ungültiger Hash"
+
+# Bulk-Verifikation über mehrere Dateien
+def test_verify_batch_files(client):
+    import io
+    res = client.post("/api/verify/batch",
+                      data={"file": [(io.BytesIO(b"Unbekannt1"), "a.pdf"), (io.BytesIO(b"Unbekannt2"), "b.pdf")]},
+                      content_type="multipart/form-data")
+    assert res.status_code == 200
+    assert [r["input"] for r in res.get_json()["results"]] == ["a.pdf", "b.pdf"]
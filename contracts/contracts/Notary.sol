@@ -15,7 +15,12 @@ contract Notary {
     mapping(bytes32 => uint256) public timestamps;
     mapping(bytes32 => uint256) public fileTimestamps;
 
+    // Merkle-Anker: Root über viele Dokumente → Zeitstempel / verankernde Org
+    mapping(bytes32 => uint256) public rootTimestamps;
+    mapping(bytes32 => address) public rootOrg;
+
     event DocumentNotarized(bytes32 indexed idHash, bytes32 indexed documentHash, uint256 timestamp);
+    event RootAnchored(bytes32 indexed root, address indexed org, uint256 leafCount, uint256 timestamp);
 
     modifier onlyChainOwner() {
         require(msg.sender == chainOwner, "Nur Chain Owner");
@@ -55,6 +60,19 @@ contract Notary {
     }
 
     function storeDocumentHash(bytes32 idHash, bytes32 documentHash) external {
+        _storeDocumentHash(idHash, documentHash);
+    }
+
+    // Mehrere Dokumente in einer Transaktion; es gelten je Dokument dieselben
+    // Regeln wie bei storeDocumentHash (ein Verstoß revertiert den ganzen Batch)
+    function storeDocumentHashes(bytes32[] calldata idHashes, bytes32[] calldata documentHashes) external {
+        require(idHashes.length == documentHashes.length, "Laengen ungleich");
+        for (uint256 i = 0; i < idHashes.length; i++) {
+            _storeDocumentHash(idHashes[i], documentHashes[i]);
+        }
+    }
+
+    function _storeDocumentHash(bytes32 idHash, bytes32 documentHash) internal {
         address org = docOrg[idHash];
         if (org == address(0)) {
             // Erst-Notarisierung: msg.sender muss Org-Admin sein
@@ -80,4 +98,33 @@ contract Notary {
 
         emit DocumentNotarized(idHash, documentHash, block.timestamp);
     }
+
+    // Verankert nur die Merkle-Root eines Dokument-Batches; die Inclusion-Proofs
+    // hält das Backend. Blatt = keccak256(keccak256(idHash, documentHash))
+    function anchorRoot(bytes32 root, uint256 leafCount) external {
+        address org = adminOf[msg.sender];
+        require(org != address(0), "Nicht Org-Admin");
+        require(root != bytes32(0), "Leere Root");
+        require(rootTimestamps[root] == 0, "Root bereits verankert");
+
+        rootTimestamps[root] = block.timestamp;
+        rootOrg[root]        = org;
+
+        emit RootAnchored(root, org, leafCount, block.timestamp);
+    }
+
+    // Liefert den Anker-Zeitstempel, wenn leaf über proof in root enthalten ist, sonst 0
+    function verifyAnchored(bytes32 leaf, bytes32[] calldata proof, bytes32 root) external view returns (uint256) {
+        bytes32 computed = leaf;
+        for (uint256 i = 0; i < proof.length; i++) {
+            bytes32 sibling = proof[i];
+            computed = computed < sibling
+                ? keccak256(abi.encodePacked(computed, sibling))
+                : keccak256(abi.encodePacked(sibling, computed));
+        }
+        if (computed != root) {
+            return 0;
+        }
+        return rootTimestamps[root];
+    }
 }
@@ -0,0 +1,160 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+// Gas-optimierte Version von Notary mit denselben Regeln und Events.
+//
+// Eine documentId kann nach den Notary-Regeln genau einmal notarisiert werden
+// (gleicher Hash → "Schon notariell hinterlegt", anderer → "darf nicht
+// geaendert werden"). Der Zeitstempel je (idHash, documentHash) aus Notary
+// ist damit einer je idHash und liegt hier zusammen mit der verwaltenden Org
+// in einem Slot. Pro neuem Dokument: 3 statt 4 neue Storage-Slots und keine
+// zusätzlichen Lesezugriffe auf timestamps/originalHash im Erfolgsfall.
+contract NotaryV2 {
+    address public chainOwner;
+
+    mapping(address => bool) public isOrg;
+    mapping(address => mapping(address => bool)) public orgAdmins;
+    // Welcher Admin gehört zu welcher Org (ein Admin gehört genau einer Org)
+    mapping(address => address) public adminOf;
+
+    // Je idHash: verwaltende Org + Zeitstempel der Notarisierung (ein Slot)
+    struct Document {
+        address org;
+        uint64 timestamp;
+    }
+    mapping(bytes32 => Document) public documents;
+
+    mapping(bytes32 => bytes32) public originalHash;
+    mapping(bytes32 => uint256) public fileTimestamps;
+
+    // Merkle-Anker: Root → Zeitstempel + verankernde Org (ein Slot)
+    struct Anchor {
+        address org;
+        uint64 timestamp;
+    }
+    mapping(bytes32 => Anchor) private anchors;
+
+    event DocumentNotarized(bytes32 indexed idHash, bytes32 indexed documentHash, uint256 timestamp);
+    event RootAnchored(bytes32 indexed root, address indexed org, uint256 leafCount, uint256 timestamp);
+
+    modifier onlyChainOwner() {
+        require(msg.sender == chainOwner, "Nur Chain Owner");
+        _;
+    }
+
+    constructor() {
+        chainOwner = msg.sender;
+    }
+
+    function registerOrg(address orgAddress) external onlyChainOwner {
+        require(!isOrg[orgAddress], "Org existiert bereits");
+        isOrg[orgAddress] = true;
+        orgAdmins[orgAddress][orgAddress] = true;
+        adminOf[orgAddress] = orgAddress;
+    }
+
+    function addOrgAdmin(address orgAddress, address admin) external {
+        require(isOrg[orgAddress], "Org existiert nicht");
+        require(
+            msg.sender == orgAddress || orgAdmins[orgAddress][msg.sender],
+            "Nicht Org-Admin"
+        );
+        orgAdmins[orgAddress][admin] = true;
+        adminOf[admin] = orgAddress;
+    }
+
+    function removeOrgAdmin(address orgAddress, address admin) external {
+        require(isOrg[orgAddress], "Org existiert nicht");
+        require(msg.sender == orgAddress, "Nur Org Owner");
+        orgAdmins[orgAddress][admin] = false;
+        adminOf[admin] = address(0);
+    }
+
+    // Kompatibel zu Notary (Backend-Indexer, Frontend)
+    function docOrg(bytes32 idHash) external view returns (address) {
+        return documents[idHash].org;
+    }
+
+    function getDocOrg(bytes32 idHash) external view returns (address) {
+        return documents[idHash].org;
+    }
+
+    // Entspricht Notary.timestamps(keccak256(idHash, documentHash))
+    function documentTimestamp(bytes32 idHash, bytes32 documentHash) external view returns (uint256) {
+        if (originalHash[idHash] != documentHash) {
+            return 0;
+        }
+        return documents[idHash].timestamp;
+    }
+
+    function rootTimestamps(bytes32 root) external view returns (uint256) {
+        return anchors[root].timestamp;
+    }
+
+    function rootOrg(bytes32 root) external view returns (address) {
+        return anchors[root].org;
+    }
+
+    function storeDocumentHash(bytes32 idHash, bytes32 documentHash) external {
+        _storeDocumentHash(adminOf[msg.sender], idHash, documentHash);
+    }
+
+    // Mehrere Dokumente in einer Transaktion; es gelten je Dokument dieselben
+    // Regeln wie bei storeDocumentHash (ein Verstoß revertiert den ganzen Batch)
+    function storeDocumentHashes(bytes32[] calldata idHashes, bytes32[] calldata documentHashes) external {
+        require(idHashes.length == documentHashes.length, "Laengen ungleich");
+        // adminOf nur einmal je Batch lesen
+        address adminOrg = adminOf[msg.sender];
+        for (uint256 i = 0; i < idHashes.length; ) {
+            _storeDocumentHash(adminOrg, idHashes[i], documentHashes[i]);
+            unchecked { ++i; }
+        }
+    }
+
+    function _storeDocumentHash(address adminOrg, bytes32 idHash, bytes32 documentHash) internal {
+        address org = documents[idHash].org;
+        if (org != address(0)) {
+            // Bereits notarisiert: gleiche Fehler (und Reihenfolge) wie Notary
+            require(orgAdmins[org][msg.sender], "Nicht Org-Admin");
+            require(originalHash[idHash] == documentHash, "Dokument darf nicht geaendert werden");
+            revert("Schon notariell hinterlegt");
+        }
+        // Erst-Notarisierung: msg.sender muss Org-Admin sein
+        require(adminOrg != address(0), "Nicht Org-Admin");
+
+        documents[idHash]            = Document(adminOrg, uint64(block.timestamp));
+        originalHash[idHash]         = documentHash;
+        fileTimestamps[documentHash] = block.timestamp;
+
+        emit DocumentNotarized(idHash, documentHash, block.timestamp);
+    }
+
+    // Verankert nur die Merkle-Root eines Dokument-Batches; die Inclusion-Proofs
+    // hält das Backend. Blatt = keccak256(keccak256(idHash, documentHash))
+    function anchorRoot(bytes32 root, uint256 leafCount) external {
+        address org = adminOf[msg.sender];
+        require(org != address(0), "Nicht Org-Admin");
+        require(root != bytes32(0), "Leere Root");
+        require(anchors[root].timestamp == 0, "Root bereits verankert");
+
+        anchors[root] = Anchor(org, uint64(block.timestamp));
+
+        emit RootAnchored(root, org, leafCount, block.timestamp);
+    }
+
+    // Liefert den Anker-Zeitstempel, wenn leaf über proof in root enthalten ist, sonst 0
+    function verifyAnchored(bytes32 leaf, bytes32[] calldata proof, bytes32 root) external view returns (uint256) {
+        bytes32 computed = leaf;
+        for (uint256 i = 0; i < proof.length; ) {
+            bytes32 sibling = proof[i];
+            computed = computed < sibling
+                ? keccak256(abi.encodePacked(computed, sibling))
+                : keccak256(abi.encodePacked(sibling, computed));
+            unchecked { ++i; }
+        }
+        if (computed != root) {
+            return 0;
+        }
+        return anchors[root].timestamp;
+    }
+}
@@ -3,4 +3,9 @@ require("@nomicfoundation/hardhat-toolbox");
 /** @type import('hardhat/config').HardhatUserConfig */
 module.exports = {
   solidity: "0.8.28",
+  // Gas je Funktion/Deployment für Notary und NotaryV2: REPORT_GAS=1 npx hardhat test
+  gasReporter: {
+    enabled: !!process.env.REPORT_GAS,
+    currency: "EUR",
+  },
 };
@@ -3,10 +3,12 @@ const hre = require("hardhat");
 
 async function main() {
   const [chainOwner, orgWallet, orgAdmin] = await hre.ethers.getSigners();
-  const Notary = await hre.ethers.getContractFactory("Notary");
+  // NOTARY_CONTRACT=NotaryV2 für die gas-optimierte Version (Backend: gleicher Wert)
+  const contractName = process.env.NOTARY_CONTRACT || "Notary";
+  const Notary = await hre.ethers.getContractFactory(contractName);
   const notary = await Notary.connect(chainOwner).deploy();
   await notary.waitForDeployment();
-  console.log("✅ Notary deployed to:", await notary.getAddress());
+  console.log(`✅ ${contractName} deployed to:`, await notary.getAddress());
 
   // 1) Org registrieren (chainOwner -> registerOrg)
   await notary.connect(chainOwner).registerOrg(orgWallet.address);
@@ -0,0 +1,70 @@
+const { expect } = require("chai");
+const { ethers } = require("hardhat");
+
+// Gas-Vergleich Notary (v1) ↔ NotaryV2 für die Notarisierungs-Pfade.
+// Ausgabe als Tabelle; zusätzlich per `REPORT_GAS=1 npx hardhat test`
+// den Report von hardhat-gas-reporter je Funktion.
+describe("Gas report Notary vs. NotaryV2", function () {
+  const results = {};
+
+  const idHash = (name) => ethers.keccak256(ethers.toUtf8Bytes(name));
+
+  async function deploy(contractName) {
+    const [chainOwner, orgA, adminA1] = await ethers.getSigners();
+    const factory = await ethers.getContractFactory(contractName);
+    const notary = await factory.connect(chainOwner).deploy();
+    await notary.waitForDeployment();
+    await notary.connect(chainOwner).registerOrg(orgA.address);
+    await notary.connect(orgA).addOrgAdmin(orgA.address, adminA1.address);
+    return { notary, admin: adminA1 };
+  }
+
+  async function gasUsed(txPromise) {
+    const receipt = await (await txPromise).wait();
+    return receipt.gasUsed;
+  }
+
+  for (const contractName of ["Notary", "NotaryV2"]) {
+    it(`measures ${contractName}`, async () => {
+      const { notary, admin } = await deploy(contractName);
+      const gas = {};
+
+      gas["storeDocumentHash (neu)"] = await gasUsed(
+        notary.connect(admin).storeDocumentHash(idHash("single"), idHash("docSingle"))
+      );
+      // Gleiche Datei unter anderer ID: fileTimestamps-Slot existiert schon
+      gas["storeDocumentHash (bekannte Datei)"] = await gasUsed(
+        notary.connect(admin).storeDocumentHash(idHash("single-copy"), idHash("docSingle"))
+      );
+
+      for (const size of [10, 100]) {
+        const ids = [...Array(size).keys()].map((i) => idHash(`batch-${size}-${i}`));
+        const docs = [...Array(size).keys()].map((i) => idHash(`doc-${size}-${i}`));
+        const used = await gasUsed(notary.connect(admin).storeDocumentHashes(ids, docs));
+        gas[`storeDocumentHashes (${size}) je Dokument`] = used / BigInt(size);
+      }
+
+      gas["anchorRoot"] = await gasUsed(notary.connect(admin).anchorRoot(idHash("root"), 100));
+      results[contractName] = gas;
+    });
+  }
+
+  after(function () {
+    if (!results.Notary || !results.NotaryV2) {
+      return;
+    }
+    const rows = Object.keys(results.Notary).map((name) => {
+      const v1 = results.Notary[name];
+      const v2 = results.NotaryV2[name];
+      const saving = Number((v1 - v2) * 1000n / v1) / 10;
+      return { Vorgang: name, Notary: Number(v1), NotaryV2: Number(v2), "Ersparnis %": saving };
+    });
+    console.table(rows);
+  });
+
+  it("NotaryV2 is cheaper on every notarization path", async function () {
+    for (const name of Object.keys(results.Notary)) {
+      expect(results.NotaryV2[name], name).to.be.lt(results.Notary[name]);
+    }
+  });
+});
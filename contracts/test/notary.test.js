@@ -1,67 +1,131 @@
 const { expect } = require("chai");
 const { ethers } = require("hardhat");
 
-describe("Notary with org-based access control", function () {
-  let Notary, notary;
-  let chainOwner, orgA, adminA1, adminA2, outsider;
-
-  beforeEach(async () => {
-    [chainOwner, orgA, adminA1, adminA2, outsider] = await ethers.getSigners();
-    Notary = await ethers.getContractFactory("Notary");
-    notary = await Notary.connect(chainOwner).deploy();
-    await notary.waitForDeployment();
-
-    // Org A registrieren, Org-Wallet wird automatisch Admin seiner selbst
-    await notary.connect(chainOwner).registerOrg(orgA.address);
-    // Zwei weitere Admins hinzufügen
-    await notary.connect(orgA).addOrgAdmin(orgA.address, adminA1.address);
-    await notary.connect(orgA).addOrgAdmin(orgA.address, adminA2.address);
-  });
+// Beide Contract-Versionen müssen dieselben Regeln erfüllen
+for (const contractName of ["Notary", "NotaryV2"]) {
+  describe(`${contractName} with org-based access control`, function () {
+    let Notary, notary;
+    let chainOwner, orgA, adminA1, adminA2, outsider;
 
-  it("allows any org admin to notarize under the org", async () => {
-    const idHash = ethers.keccak256(ethers.toUtf8Bytes("id1"));
-    const docHash = ethers.keccak256(ethers.toUtf8Bytes("docA"));
+    beforeEach(async () => {
+      [chainOwner, orgA, adminA1, adminA2, outsider] = await ethers.getSigners();
+      Notary = await ethers.getContractFactory(contractName);
+      notary = await Notary.connect(chainOwner).deploy();
+      await notary.waitForDeployment();
 
-    // Erst-Notarisierung durch adminA1 → OK
-    await expect(
-      notary.connect(adminA1).storeDocumentHash(idHash, docHash)
-    ).to.emit(notary, "DocumentNotarized");
+      // Org A registrieren, Org-Wallet wird automatisch Admin seiner selbst
+      await notary.connect(chainOwner).registerOrg(orgA.address);
+      // Zwei weitere Admins hinzufügen
+      await notary.connect(orgA).addOrgAdmin(orgA.address, adminA1.address);
+      await notary.connect(orgA).addOrgAdmin(orgA.address, adminA2.address);
+    });
 
-    // Zweiter Versuch derselben Kombination → revert wegen Schon notariell hinterlegt
-    await expect(
-      notary.connect(adminA1).storeDocumentHash(idHash, docHash)
-    ).to.be.revertedWith("Schon notariell hinterlegt");
-  });
+    it("allows any org admin to notarize under the org", async () => {
+      const idHash = ethers.keccak256(ethers.toUtf8Bytes("id1"));
+      const docHash = ethers.keccak256(ethers.toUtf8Bytes("docA"));
 
-  it("prevents outsider from notarizing for the org", async () => {
-    const idHash = ethers.keccak256(ethers.toUtf8Bytes("id2"));
-    const docHash = ethers.keccak256(ethers.toUtf8Bytes("docB"));
+      // Erst-Notarisierung durch adminA1 → OK
+      await expect(
+        notary.connect(adminA1).storeDocumentHash(idHash, docHash)
+      ).to.emit(notary, "DocumentNotarized");
 
-    await expect(
-      notary.connect(outsider).storeDocumentHash(idHash, docHash)
-    ).to.be.revertedWith("Nicht Org-Admin");
-  });
+      // Zweiter Versuch derselben Kombination → revert wegen Schon notariell hinterlegt
+      await expect(
+        notary.connect(adminA1).storeDocumentHash(idHash, docHash)
+      ).to.be.revertedWith("Schon notariell hinterlegt");
+    });
 
-  it("prevents admins of other orgs from accessing", async () => {
-    // Org B registrieren (outsider wird Org-Wallet und Admin)
-    await notary.connect(chainOwner).registerOrg(outsider.address);
+    it("prevents outsider from notarizing for the org", async () => {
+      const idHash = ethers.keccak256(ethers.toUtf8Bytes("id2"));
+      const docHash = ethers.keccak256(ethers.toUtf8Bytes("docB"));
 
-    const idHashA = ethers.keccak256(ethers.toUtf8Bytes("sharedId"));
-    const docHashA = ethers.keccak256(ethers.toUtf8Bytes("docA"));
-    // Org A Admin notariert
-    await notary.connect(adminA1).storeDocumentHash(idHashA, docHashA);
+      await expect(
+        notary.connect(outsider).storeDocumentHash(idHash, docHash)
+      ).to.be.revertedWith("Nicht Org-Admin");
+    });
 
-    // Org B Admin (outsider) versucht für dieselbe ID → revert
-    await expect(
-      notary.connect(outsider).storeDocumentHash(idHashA, docHashA)
-    ).to.be.revertedWith("Nicht Org-Admin");
-  });
+    it("prevents admins of other orgs from accessing", async () => {
+      // Org B registrieren (outsider wird Org-Wallet und Admin)
+      await notary.connect(chainOwner).registerOrg(outsider.address);
+
+      const idHashA = ethers.keccak256(ethers.toUtf8Bytes("sharedId"));
+      const docHashA = ethers.keccak256(ethers.toUtf8Bytes("docA"));
+      // Org A Admin notariert
+      await notary.connect(adminA1).storeDocumentHash(idHashA, docHashA);
+
+      // Org B Admin (outsider) versucht für dieselbe ID → revert
+      await expect(
+        notary.connect(outsider).storeDocumentHash(idHashA, docHashA)
+      ).to.be.revertedWith("Nicht Org-Admin");
+    });
+
+    it("correctly reports docOrg mapping", async () => {
+      const idHash = ethers.keccak256(ethers.toUtf8Bytes("id3"));
+      const docHash = ethers.keccak256(ethers.toUtf8Bytes("docC"));
+
+      await notary.connect(adminA2).storeDocumentHash(idHash, docHash);
+      expect(await notary.getDocOrg(idHash)).to.equal(orgA.address);
+    });
+
+    it("notarizes several documents in one batch transaction", async () => {
+      const idHashes = ["b1", "b2", "b3"].map((id) => ethers.keccak256(ethers.toUtf8Bytes(id)));
+      const docHashes = ["docB1", "docB2", "docB3"].map((d) => ethers.keccak256(ethers.toUtf8Bytes(d)));
+
+      const tx = await notary.connect(adminA1).storeDocumentHashes(idHashes, docHashes);
+      const receipt = await tx.wait();
+      const events = receipt.logs.filter((log) => log.fragment && log.fragment.name === "DocumentNotarized");
+      expect(events.length).to.equal(3);
+
+      for (let i = 0; i < idHashes.length; i++) {
+        expect(await notary.getDocOrg(idHashes[i])).to.equal(orgA.address);
+        expect(await notary.originalHash(idHashes[i])).to.equal(docHashes[i]);
+        expect(await notary.fileTimestamps(docHashes[i])).to.be.gt(0);
+      }
+    });
+
+    it("reverts the whole batch if one document breaks the rules", async () => {
+      const idHash = ethers.keccak256(ethers.toUtf8Bytes("b4"));
+      const docHash = ethers.keccak256(ethers.toUtf8Bytes("docB4"));
+      const otherHash = ethers.keccak256(ethers.toUtf8Bytes("docB4-mod"));
+
+      await notary.connect(adminA1).storeDocumentHash(idHash, docHash);
+      await expect(
+        notary.connect(adminA1).storeDocumentHashes([idHash], [otherHash])
+      ).to.be.revertedWith("Dokument darf nicht geaendert werden");
+
+      await expect(
+        notary.connect(adminA1).storeDocumentHashes([idHash], [])
+      ).to.be.revertedWith("Laengen ungleich");
+    });
+
+    it("anchors a Merkle root and verifies inclusion proofs", async () => {
+      const leaf = (id, doc) =>
+        ethers.keccak256(ethers.keccak256(ethers.solidityPacked(
+          ["bytes32", "bytes32"],
+          [ethers.keccak256(ethers.toUtf8Bytes(id)), ethers.keccak256(ethers.toUtf8Bytes(doc))]
+        )));
+      const hashPair = (a, b) =>
+        BigInt(a) < BigInt(b)
+          ? ethers.keccak256(ethers.concat([a, b]))
+          : ethers.keccak256(ethers.concat([b, a]));
+
+      const leafA = leaf("m1", "docM1");
+      const leafB = leaf("m2", "docM2");
+      const root = hashPair(leafA, leafB);
+
+      await expect(notary.connect(adminA1).anchorRoot(root, 2))
+        .to.emit(notary, "RootAnchored");
+      expect(await notary.rootOrg(root)).to.equal(orgA.address);
 
-  it("correctly reports docOrg mapping", async () => {
-    const idHash = ethers.keccak256(ethers.toUtf8Bytes("id3"));
-    const docHash = ethers.keccak256(ethers.toUtf8Bytes("docC"));
+      const ts = await notary.rootTimestamps(root);
+      expect(await notary.verifyAnchored(leafA, [leafB], root)).to.equal(ts);
+      expect(await notary.verifyAnchored(leafB, [leafA], root)).to.equal(ts);
+      expect(await notary.verifyAnchored(leaf("m3", "docM3"), [leafB], root)).to.equal(0);
 
-    await notary.connect(adminA2).storeDocumentHash(idHash, docHash);
-    expect(await notary.getDocOrg(idHash)).to.equal(orgA.address);
+      await expect(notary.connect(adminA1).anchorRoot(root, 2))
+        .to.be.revertedWith("Root bereits verankert");
+      await expect(notary.connect(outsider).anchorRoot(leafA, 1))
+        .to.be.revertedWith("Nicht Org-Admin");
+    });
   });
-});
+}
@@ -0,0 +1,16 @@
+import { keccak_256 } from '@noble/hashes/sha3'
+import { bytesToHex } from '@noble/hashes/utils'
+
+// Keccak-256 einer Datei wie im Backend (Web3.keccak über den Dateiinhalt),
+// blockweise aus file.stream() – auch große PDFs liegen nie ganz im Speicher.
+// Liefert den Hash als "0x…" (32 Bytes).
+export async function keccakFile(file) {
+  const hasher = keccak_256.create()
+  const reader = file.stream().getReader()
+  for (;;) {
+    const { done, value } = await reader.read()
+    if (done) break
+    hasher.update(value)
+  }
+  return '0x' + bytesToHex(hasher.digest())
+}